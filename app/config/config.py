@@ -21,6 +21,159 @@ class Settings(BaseSettings):
     # Fraud detection settings
     FRAUD_THRESHOLD: float = float(os.getenv("FRAUD_THRESHOLD", 0.5))
     
+    # Transaction write path: "insert_then_update" (insert pending, then one update)
+    # or "score_then_persist" (score first, then a single insert with the final status)
+    TRANSACTION_WRITE_MODE: str = os.getenv("TRANSACTION_WRITE_MODE", "insert_then_update")
+    
+    # Notification outbox settings (flagged transactions are notified by background workers)
+    NOTIFICATION_OUTBOX_ENABLED: bool = os.getenv("NOTIFICATION_OUTBOX_ENABLED", "true").lower() == "true"
+    NOTIFICATION_WORKERS: int = int(os.getenv("NOTIFICATION_WORKERS", 4))
+    NOTIFICATION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", 20))
+    NOTIFICATION_MAX_ATTEMPTS: int = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 8))
+    NOTIFICATION_BACKOFF_BASE: float = float(os.getenv("NOTIFICATION_BACKOFF_BASE", 1.0))
+    NOTIFICATION_BACKOFF_MAX: float = float(os.getenv("NOTIFICATION_BACKOFF_MAX", 300.0))
+    NOTIFICATION_POLL_INTERVAL: float = float(os.getenv("NOTIFICATION_POLL_INTERVAL", 1.0))
+    NOTIFICATION_LEASE_SECONDS: float = float(os.getenv("NOTIFICATION_LEASE_SECONDS", 120.0))
+    
+    # Asynchronous scoring: creates sent with "Prefer: respond-async" are stored as pending,
+    # answered with 202 and scored by background workers that claim them from Mongo
+    ASYNC_SCORING_ENABLED: bool = os.getenv("ASYNC_SCORING_ENABLED", "false").lower() == "true"
+    SCORING_WORKERS: int = int(os.getenv("SCORING_WORKERS", 8))
+    SCORING_BATCH_SIZE: int = int(os.getenv("SCORING_BATCH_SIZE", 20))
+    SCORING_MAX_ATTEMPTS: int = int(os.getenv("SCORING_MAX_ATTEMPTS", 5))
+    SCORING_BACKOFF_BASE: float = float(os.getenv("SCORING_BACKOFF_BASE", 1.0))
+    SCORING_BACKOFF_MAX: float = float(os.getenv("SCORING_BACKOFF_MAX", 60.0))
+    SCORING_POLL_INTERVAL: float = float(os.getenv("SCORING_POLL_INTERVAL", 1.0))
+    SCORING_LEASE_SECONDS: float = float(os.getenv("SCORING_LEASE_SECONDS", 120.0))
+    SCORING_CALLBACK_TIMEOUT: float = float(os.getenv("SCORING_CALLBACK_TIMEOUT", 10.0))
+    SCORING_CALLBACK_MAX_ATTEMPTS: int = int(os.getenv("SCORING_CALLBACK_MAX_ATTEMPTS", 3))
+    SCORING_CALLBACK_ALLOWED_HOSTS: str = os.getenv("SCORING_CALLBACK_ALLOWED_HOSTS", "")  # comma-separated, empty disables callbacks
+    
+    # Fraud API timeouts: the adaptive timeout is a multiple of recent latency, capped at FRAUD_TIMEOUT_SECONDS
+    FRAUD_TIMEOUT_SECONDS: float = float(os.getenv("FRAUD_TIMEOUT_SECONDS", 60.0))
+    FRAUD_TIMEOUT_MIN_SECONDS: float = float(os.getenv("FRAUD_TIMEOUT_MIN_SECONDS", 0.5))
+    FRAUD_TIMEOUT_PERCENTILE: float = float(os.getenv("FRAUD_TIMEOUT_PERCENTILE", 99.0))
+    FRAUD_TIMEOUT_MULTIPLIER: float = float(os.getenv("FRAUD_TIMEOUT_MULTIPLIER", 3.0))
+    FRAUD_LATENCY_WINDOW: int = int(os.getenv("FRAUD_LATENCY_WINDOW", 1000))
+    FRAUD_LATENCY_MIN_SAMPLES: int = int(os.getenv("FRAUD_LATENCY_MIN_SAMPLES", 50))
+    
+    # Fraud API circuit breaker settings
+    FRAUD_BREAKER_ENABLED: bool = os.getenv("FRAUD_BREAKER_ENABLED", "true").lower() == "true"
+    FRAUD_BREAKER_WINDOW_SECONDS: float = float(os.getenv("FRAUD_BREAKER_WINDOW_SECONDS", 30.0))
+    FRAUD_BREAKER_MIN_REQUESTS: int = int(os.getenv("FRAUD_BREAKER_MIN_REQUESTS", 20))
+    FRAUD_BREAKER_ERROR_RATE: float = float(os.getenv("FRAUD_BREAKER_ERROR_RATE", 0.5))
+    FRAUD_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("FRAUD_BREAKER_SLOW_CALL_SECONDS", 5.0))
+    FRAUD_BREAKER_SLOW_CALL_RATE: float = float(os.getenv("FRAUD_BREAKER_SLOW_CALL_RATE", 0.8))
+    FRAUD_BREAKER_OPEN_SECONDS: float = float(os.getenv("FRAUD_BREAKER_OPEN_SECONDS", 15.0))
+    FRAUD_BREAKER_HALF_OPEN_CALLS: int = int(os.getenv("FRAUD_BREAKER_HALF_OPEN_CALLS", 3))
+    
+    # Hedged requests: send a duplicate /predict call once the first exceeds this latency percentile
+    FRAUD_HEDGING_ENABLED: bool = os.getenv("FRAUD_HEDGING_ENABLED", "false").lower() == "true"
+    FRAUD_HEDGE_PERCENTILE: float = float(os.getenv("FRAUD_HEDGE_PERCENTILE", 95.0))
+    
+    # Status given to transactions whose fraud check failed: "approve", "pending" or "decline"
+    FRAUD_FALLBACK_POLICY: str = os.getenv("FRAUD_FALLBACK_POLICY", "approve")
+    
+    # Local fast-path scorer: scores below APPROVE_BELOW are approved locally, scores at or above
+    # FLAG_ABOVE are flagged locally (values above 1 disable local flagging), the rest go to the fraud API
+    LOCAL_SCORER_MODEL_PATH: str = os.getenv("LOCAL_SCORER_MODEL_PATH", "")
+    LOCAL_SCORER_APPROVE_BELOW: float = float(os.getenv("LOCAL_SCORER_APPROVE_BELOW", 0.05))
+    LOCAL_SCORER_FLAG_ABOVE: float = float(os.getenv("LOCAL_SCORER_FLAG_ABOVE", 1.01))
+    LOCAL_SCORER_FALLBACK: bool = os.getenv("LOCAL_SCORER_FALLBACK", "true").lower() == "true"
+    
+    # Persistence mode: "direct" (one write per call) or "group_commit" (concurrent writes are
+    # buffered and flushed together every GROUP_COMMIT_INTERVAL_MS or GROUP_COMMIT_MAX_OPS operations)
+    PERSISTENCE_MODE: str = os.getenv("PERSISTENCE_MODE", "direct")
+    GROUP_COMMIT_INTERVAL_MS: float = float(os.getenv("GROUP_COMMIT_INTERVAL_MS", 2.0))
+    GROUP_COMMIT_MAX_OPS: int = int(os.getenv("GROUP_COMMIT_MAX_OPS", 500))
+    
+    # Recently completed creates kept in memory to answer retries without a Mongo read
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 50000))
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_CACHE_TTL_SECONDS", 600.0))
+    
+    # Fraud API micro-batching settings
+    FRAUD_BATCHING_ENABLED: bool = os.getenv("FRAUD_BATCHING_ENABLED", "false").lower() == "true"
+    FRAUD_BATCH_WINDOW_MS: float = float(os.getenv("FRAUD_BATCH_WINDOW_MS", 5.0))
+    FRAUD_BATCH_MAX_SIZE: int = int(os.getenv("FRAUD_BATCH_MAX_SIZE", 64))
+    FRAUD_BATCH_PATH: str = os.getenv("FRAUD_BATCH_PATH", "/predict/batch")
+    FRAUD_BATCH_FALLBACK: bool = os.getenv("FRAUD_BATCH_FALLBACK", "true").lower() == "true"
+    
+    # Admission control in front of the create path; requests beyond max concurrency wait in a
+    # bounded queue and are shed with 429 (queue full) or 503 (queue timeout) and Retry-After
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 256))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", 1024))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", 2.0))
+    ADMISSION_PRIORITY_AMOUNT: float = float(os.getenv("ADMISSION_PRIORITY_AMOUNT", 0.0))  # 0 disables priority
+    
+    # Bulkheads around downstream dependencies
+    FRAUD_BULKHEAD_MAX_CONCURRENCY: int = int(os.getenv("FRAUD_BULKHEAD_MAX_CONCURRENCY", 128))
+    FRAUD_BULKHEAD_MAX_QUEUE: int = int(os.getenv("FRAUD_BULKHEAD_MAX_QUEUE", 512))
+    FRAUD_BULKHEAD_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("FRAUD_BULKHEAD_QUEUE_TIMEOUT_SECONDS", 1.0))
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", 100))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 2000))
+    
+    # Batch ingestion settings
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", 5000))
+    BATCH_FRAUD_CONCURRENCY: int = int(os.getenv("BATCH_FRAUD_CONCURRENCY", 50))
+    BATCH_NOTIFICATION_CONCURRENCY: int = int(os.getenv("BATCH_NOTIFICATION_CONCURRENCY", 20))
+    
+    # Batch lookup settings
+    LOOKUP_MAX_IDS: int = int(os.getenv("LOOKUP_MAX_IDS", 500))
+    LOOKUP_NOTIFICATION_CONCURRENCY: int = int(os.getenv("LOOKUP_NOTIFICATION_CONCURRENCY", 20))
+    
+    # Largest skip allowed for page-based listing, deeper pages must use the cursor
+    PAGINATION_MAX_OFFSET: int = int(os.getenv("PAGINATION_MAX_OFFSET", 10000))
+    
+    # Transaction read cache settings ("memory" or "redis" backend)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_SIZE: int = int(os.getenv("CACHE_MAX_SIZE", 10000))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", 30.0))
+    NOTIFICATION_STATUS_CACHE_TTL_SECONDS: float = float(os.getenv("NOTIFICATION_STATUS_CACHE_TTL_SECONDS", 5.0))
+    
+    # Default cursor batch size for streaming exports
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+    
+    # Sliding-window velocity features added to the /predict payload
+    VELOCITY_FEATURES_ENABLED: bool = os.getenv("VELOCITY_FEATURES_ENABLED", "false").lower() == "true"
+    VELOCITY_WINDOWS: str = os.getenv("VELOCITY_WINDOWS", "60,300,3600")  # Window lengths in seconds
+    VELOCITY_BUCKETS: int = int(os.getenv("VELOCITY_BUCKETS", 12))  # Time buckets per window
+    VELOCITY_MAX_KEYS: int = int(os.getenv("VELOCITY_MAX_KEYS", 10000))  # Keys kept per dimension
+    
+    # Analytics rollups, maintained incrementally when a transaction's final status is written
+    ANALYTICS_ROLLUPS_ENABLED: bool = os.getenv("ANALYTICS_ROLLUPS_ENABLED", "true").lower() == "true"
+    ANALYTICS_MAX_BUCKETS: int = int(os.getenv("ANALYTICS_MAX_BUCKETS", 1440))
+    
+    # Push feed of transaction status changes: "local" (published by this instance's writes)
+    # or "change_stream" (read from Mongo, sees writes from every instance; needs a replica set)
+    EVENT_FEED_SOURCE: str = os.getenv("EVENT_FEED_SOURCE", "local")
+    EVENT_FEED_MAX_SUBSCRIBERS: int = int(os.getenv("EVENT_FEED_MAX_SUBSCRIBERS", 100))
+    EVENT_FEED_QUEUE_SIZE: int = int(os.getenv("EVENT_FEED_QUEUE_SIZE", 256))
+    EVENT_FEED_OVERFLOW_POLICY: str = os.getenv("EVENT_FEED_OVERFLOW_POLICY", "drop_oldest")  # drop_oldest | drop_newest | disconnect
+    EVENT_FEED_HEARTBEAT_SECONDS: float = float(os.getenv("EVENT_FEED_HEARTBEAT_SECONDS", 15.0))
+    
+    # Serialize read responses with orjson directly from Mongo documents, skipping response_model validation
+    FAST_SERIALIZATION_ENABLED: bool = os.getenv("FAST_SERIALIZATION_ENABLED", "false").lower() == "true"
+    
+    # Logging: records go through a bounded queue to a background writer thread.
+    # LOG_SAMPLING keeps a fraction of below-WARNING records per logger, e.g.
+    # "app.services.fraud_service=0.01,app.services.notification_service=0.1"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # text | json
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "app.services.fraud_service=0.1,app.services.notification_service=0.1")
+    
+    # Add a Server-Timing header with per-stage timings to every response
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    
+    # Outbound HTTP connection pool settings (one pool per downstream service)
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", 100))
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", 20))
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", 30.0))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    
     model_config = {  # Updated from Config class
         "env_file": ".env"
     }
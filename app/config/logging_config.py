@@ -0,0 +1,172 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from app.config.config import settings
+
+# Correlation id of the request being handled, stamped on every log record
+correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "correlation_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["NonBlockingQueueHandler"] = None
+_sampler: Optional["SamplingFilter"] = None
+
+
+class CorrelationIdFilter(logging.Filter):
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+# Keep a fraction of below-WARNING records for loggers with a sampling rate (dotted prefixes apply)
+class SamplingFilter(logging.Filter):
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        if random.random() < self._rate(record.name):
+            return True
+        self.sampled_out += 1
+        return False
+
+
+# Queue handler that never blocks the caller: records are handed over unformatted and
+# dropped (and counted) if the writer thread falls behind and the queue is full.
+# Messages are formatted lazily on the writer thread, so do not mutate logged args.
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Listener whose stop() waits for room in a full queue instead of failing
+class _QueueListener(logging.handlers.QueueListener):
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+# One JSON object per line, including any fields passed through `extra`
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-")
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _parse_sampling(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+# Route all logging through the queue and start the writer thread
+def setup_logging() -> None:
+    global _listener, _handler, _sampler
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(formatter)
+
+    _sampler = SamplingFilter(_parse_sampling(settings.LOG_SAMPLING))
+    _handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _handler.addFilter(_sampler)
+    _handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # uvicorn writes through its own stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = _QueueListener(_handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+# Flush queued records, stop the writer thread and write later records directly
+# (shutdown of other services, scripts) instead of queueing them with no reader
+def stop_logging() -> None:
+    global _listener
+    if _listener is None:
+        return
+
+    root = logging.getLogger()
+    root.removeHandler(_handler)
+    _listener.stop()
+    for stream in _listener.handlers:
+        for record_filter in _handler.filters:
+            stream.addFilter(record_filter)
+        root.addHandler(stream)
+    _listener = None
+
+
+def logging_stats() -> Dict[str, Any]:
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "sampled_out": _sampler.sampled_out if _sampler else 0
+    }
@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.db.analytics import GRANULARITIES, DIMENSIONS, bucket_size, query_rollups
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Read precomputed rollups for a time range; the raw transactions are never scanned
+async def get_rollups(granularity: str = "hour", dimension: str = "all",
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      value: Optional[str] = None) -> Dict[str, Any]:
+    if granularity not in GRANULARITIES:
+        return {
+            "success": False,
+            "error": f"Invalid granularity. Must be one of: {', '.join(GRANULARITIES)}",
+            "status_code": 400
+        }
+    if dimension not in DIMENSIONS:
+        return {
+            "success": False,
+            "error": f"Invalid dimension. Must be one of: {', '.join(DIMENSIONS)}",
+            "status_code": 400
+        }
+
+    # Default to the last 24 buckets
+    end = end or datetime.now()
+    start = start or end - 24 * bucket_size(granularity)
+    if start >= end:
+        return {"success": False, "error": "start must be before end", "status_code": 400}
+    if (end - start) / bucket_size(granularity) > settings.ANALYTICS_MAX_BUCKETS:
+        return {
+            "success": False,
+            "error": f"Range spans more than {settings.ANALYTICS_MAX_BUCKETS} {granularity} buckets",
+            "status_code": 400
+        }
+
+    try:
+        buckets = await query_rollups(granularity, dimension, start, end, value)
+        return {
+            "success": True,
+            "granularity": granularity,
+            "dimension": dimension,
+            "start": start,
+            "end": end,
+            "buckets": buckets
+        }
+    except Exception as e:
+        logger.error("Error reading analytics rollups: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
@@ -1,113 +1,436 @@
+import asyncio
+import csv
+import io
+import json
 import logging 
 import uuid
 from datetime import datetime 
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple
+
+from pymongo.errors import DuplicateKeyError
 
 from app.db.transactions import (
     save_transaction,
+    save_transactions_bulk,
     get_transaction_by_id,
+    get_transactions_by_ids,
+    get_transaction_by_idempotency_key,
     update_transaction,
-    list_transactions
+    bulk_update_transactions,
+    mark_needs_rescore,
+    list_transactions,
+    stream_transactions,
+    decode_cursor
 )
 
+from app.db.outbox import enqueue_notification, enqueue_notifications_bulk
+from app.db.analytics import record_transaction_rollups
+from app.db.scoring_queue import scoring_fields, scoring_done_fields
 from app.services.fraud_service import fraud_service
 from app.services.notification_service import notification_service
+from app.services.notification_worker import notification_worker
+from app.services.metrics import stage, record_decision
+from app.services.idempotency import idempotency_index
+from app.services.event_hub import event_hub, Subscription
+from app.services.velocity import velocity_engine
+from app.config.config import settings
 from app.models.schemas import TransactionStatus
+from app.models.serializers import transaction_detail_dict
+
+logger = logging.getLogger(__name__)
+
+
+# Columns written by the CSV export, in order
+EXPORT_CSV_FIELDS = [
+    "_id", "transaction_number", "status", "created_at", "updated_at", "transaction_amount",
+    "is_nighttime", "category", "transaction_location", "job", "state", "is_fraud",
+    "fraud_probability", "notification_sent"
+]
+
+
+# Status applied when the fraud check could not be completed
+FALLBACK_STATUSES = {
+    "approve": TransactionStatus.APPROVED,
+    "pending": TransactionStatus.PENDING,
+    "decline": TransactionStatus.DECLINED
+}
+
+
+# Build the fields written back once the fraud result is known
+def _build_fraud_update(fraud_result: Dict[str, Any]) -> Dict[str, Any]:
+    is_fraud = fraud_result.get("is_fraud", False)
+    update = {
+        "fraud_check_result": fraud_result,
+        "is_fraud": is_fraud,
+        "fraud_probability": fraud_result.get("fraud_probability", 0.0),
+        "status": TransactionStatus.FLAGGED if is_fraud else TransactionStatus.APPROVED
+    }
+    
+    # Decisions taken by the local scorer during an outage are re-scored later
+    if fraud_result.get("degraded", False):
+        update["needs_rescore"] = True
+    
+    # Failed checks follow the fallback policy and are marked for re-scoring
+    if not fraud_result.get("success", False):
+        update["status"] = FALLBACK_STATUSES.get(settings.FRAUD_FALLBACK_POLICY, TransactionStatus.APPROVED)
+        update["needs_rescore"] = True
+    
+    return update
+
+
+# Build the create response from an in-memory transaction document
+def _build_transaction_response(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    created_at = transaction.get("created_at")
+    response = {
+        "transaction_number": transaction.get("transaction_number"),
+        "status": transaction.get("status", TransactionStatus.PENDING),
+        "created_at": created_at.isoformat() if created_at else None,
+        "is_fraud": transaction.get("is_fraud", False),
+        "fraud_probability": transaction.get("fraud_probability", 0.0),
+        "notification_sent": transaction.get("notification_sent", False)
+    }
+
+    for field in ["category", "merchant_name", "transaction_amount", "transaction_location"]:
+        if field in transaction:
+            response[field] = transaction[field]
+
+    return response
 
 
-# Process new transaction with fraud detection and notification
-async def process_transaction(transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+# Process new transaction with fraud detection and notification.
+# Retries with the same Idempotency-Key or transaction_number replay the stored result
+# instead of running the pipeline again. With async_scoring the transaction is only
+# stored as pending and scored later by the background scoring workers.
+async def process_transaction(transaction_data: Dict[str, Any],
+                              idempotency_key: Optional[str] = None,
+                              async_scoring: bool = False) -> Dict[str, Any]:
+    # Generate transaction_number if not provided
+    if "transaction_number" not in transaction_data:
+        transaction_number = f"txn_{uuid.uuid4().hex[:8]}"
+        transaction_data["transaction_number"] = transaction_number
+    
+    if idempotency_key:
+        transaction_data["idempotency_key"] = idempotency_key
+    key = f"key:{idempotency_key}" if idempotency_key else f"txn:{transaction_data['transaction_number']}"
+    
+    # Answer recent retries from memory
+    remembered = idempotency_index.get(key)
+    if remembered is not None:
+        idempotency_index.memory_replays += 1
+        return {"success": True, "transaction": remembered, "replayed": True}
+    
+    # Wait for an identical create that is still running
+    in_flight = idempotency_index.in_flight(key)
+    if in_flight is not None:
+        idempotency_index.in_flight_replays += 1
+        result = await asyncio.shield(in_flight)
+        return {**result, "replayed": True} if result["success"] else result
+    
+    future = idempotency_index.begin(key)
+    result = {"success": False, "error": "Transaction processing did not complete"}
+    
+    # Velocity features are taken at arrival and stored with the transaction, so the
+    # background scoring workers send the same features as the inline path
+    if velocity_engine.enabled:
+        transaction_data["velocity_features"] = velocity_engine.observe(transaction_data)
     try:
-        # Generate transaction_number if not provided
-        if "transaction_number" not in transaction_data:
-            transaction_number = f"txn_{uuid.uuid4().hex[:8]}"
-            transaction_data["transaction_number"] = transaction_number
-        
-        # Set initial status to pending
-        transaction_data["status"] = TransactionStatus.PENDING
-        transaction_data["created_at"] = datetime.now()
-        
-        # Save transaction with pending status
-        saved_transaction = await save_transaction(transaction_data)
-        
-        # Call fraud detection service
+        if async_scoring:
+            result = await _accept_for_scoring(transaction_data)
+        else:
+            result = await _process_new_transaction(transaction_data)
+    except DuplicateKeyError:
+        # Already stored by an earlier attempt, possibly on another instance
+        result = await _replay_stored_transaction(transaction_data, idempotency_key)
+    except Exception as e:
+        logger.exception("Error processing transaction: %s", e)
+        result = {
+            "success": False,
+            "error": str(e)
+        }
+    finally:
+        # A pending response (202 Accepted, or a check left for re-scoring) would go stale
+        # once the transaction is scored; retries of those are answered from the stored document
+        if result["success"] and result["transaction"].get("status") != TransactionStatus.PENDING:
+            idempotency_index.remember(key, result["transaction"])
+        idempotency_index.finish(key, future, result)
+    
+    return result
+
+
+# Build the response for a transaction stored by an earlier attempt
+async def _replay_stored_transaction(transaction_data: Dict[str, Any],
+                                     idempotency_key: Optional[str]) -> Dict[str, Any]:
+    stored = None
+    if idempotency_key:
+        stored = await get_transaction_by_idempotency_key(idempotency_key)
+    if stored is None:
+        stored = await get_transaction_by_id(transaction_data["transaction_number"])
+    
+    if stored is None:
+        return {
+            "success": False,
+            "error": f"Duplicate transaction {transaction_data['transaction_number']} could not be loaded"
+        }
+    
+    idempotency_index.stored_replays += 1
+    return {
+        "success": True,
+        "transaction": _build_transaction_response(stored),
+        "replayed": True
+    }
+
+
+# Run the create pipeline for a transaction that has not been stored yet
+async def _process_new_transaction(transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+    # Set initial status to pending
+    transaction_data["status"] = TransactionStatus.PENDING
+    transaction_data["created_at"] = datetime.now()
+    
+    # In score-then-persist mode the transaction is written once with its final status
+    score_first = settings.TRANSACTION_WRITE_MODE == "score_then_persist"
+    
+    # Save transaction with pending status
+    if not score_first:
+        with stage("persist_pending"):
+            saved_transaction = await save_transaction(transaction_data)
+    
+    # Call fraud detection service
+    with stage("fraud_check"):
         fraud_result = await fraud_service.check_transaction(transaction_data)
+    
+    # Process fraud detection result
+    update_data, use_outbox = await _build_result_update(transaction_data, fraud_result)
+    
+    if score_first and not use_outbox:
+        transaction_data.update(update_data)
+        with stage("persist_result"):
+            await save_transaction(transaction_data)
+        if settings.ANALYTICS_ROLLUPS_ENABLED:
+            with stage("rollups"):
+                await record_transaction_rollups([transaction_data])
+    else:
+        # A flagged transaction is stored as pending even in score-then-persist mode,
+        # so its outbox entry is written before the final status
+        if score_first:
+            with stage("persist_pending"):
+                saved_transaction = await save_transaction(transaction_data)
+        if update_data:
+            await _persist_pending_result(saved_transaction, update_data, fraud_result, use_outbox)
+    
+    if use_outbox:
+        notification_worker.notify()
+    record_decision(transaction_data["status"])
+    
+    # Build the response from in-memory state instead of re-reading the document
+    return {
+        "success": True,
+        "transaction": _build_transaction_response(transaction_data)
+    }
+
+
+# Build the result update for a fraud result, sending the notification inline when the
+# outbox is disabled. Also returns whether the notification goes through the outbox.
+async def _build_result_update(transaction_data: Dict[str, Any],
+                               fraud_result: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    update_data = {}
+    if isinstance(fraud_result, dict):
+        update_data = _build_fraud_update(fraud_result)
         
-        # Initialize variables
-        fraud_detected = False
-        notification_result = {"notification_sent": False}
-        transaction_status = TransactionStatus.APPROVED
-        
-        # Process fraud detection result
-        if isinstance(fraud_result, dict):
-            # Update transaction with fraud detection results
-            update_data = {
-                "fraud_check_result": fraud_result,
-                "is_fraud": fraud_result.get("is_fraud", False),
-                "fraud_probability": fraud_result.get("fraud_probability", 0.0)
-            }
-            
-            # Update status based on fraud result
-            if fraud_result.get("is_fraud", False):
-                fraud_detected = True
-                transaction_status = TransactionStatus.FLAGGED
-                
-                # Send fraud notification
+        # Send fraud notification inline when the outbox is disabled
+        if update_data["status"] == TransactionStatus.FLAGGED and not settings.NOTIFICATION_OUTBOX_ENABLED:
+            with stage("notification"):
                 notification_result = await notification_service.send_fraud_notification(
                     transaction_data, fraud_result
                 )
-                
-                if isinstance(notification_result, dict):  # Make sure it's a dict
-                    update_data["notification_result"] = notification_result
-                    update_data["notification_sent"] = notification_result.get("notification_sent", False)
-            else:
-                transaction_status = TransactionStatus.APPROVED
-                
-            update_data["status"] = transaction_status
             
-            # THIS IS IMPORTANT - call update_transaction as a function
-            await update_transaction(saved_transaction["_id"], update_data)
-            
-        # Get the updated transaction - THIS IS IMPORTANT
-        updated_transaction = await get_transaction_by_id(saved_transaction["_id"])
+            if isinstance(notification_result, dict):  # Make sure it's a dict
+                update_data["notification_result"] = notification_result
+                update_data["notification_sent"] = notification_result.get("notification_sent", False)
+    
+    # Flagged transactions are handed to the notification outbox. notification_sent is
+    # left to the outbox worker: it may already have recorded the delivery by the time
+    # the status is written, and a missing field reads as not sent.
+    use_outbox = (
+        settings.NOTIFICATION_OUTBOX_ENABLED
+        and update_data.get("status") == TransactionStatus.FLAGGED
+    )
+    
+    return update_data, use_outbox
+
+
+# Write the result of a stored pending transaction and apply it to the in-memory copy
+async def _persist_pending_result(transaction_data: Dict[str, Any], update_data: Dict[str, Any],
+                                  fraud_result: Dict[str, Any], use_outbox: bool) -> bool:
+    # Write the outbox entry before the final status so a crash cannot lose the notification
+    if use_outbox:
+        with stage("outbox_enqueue"):
+            await enqueue_notification(transaction_data["_id"], transaction_data, fraud_result)
+    
+    # Only reflect the new status in the response once it has been persisted
+    with stage("persist_result"):
+        persisted = await update_transaction(transaction_data["_id"], update_data,
+                                             previous_status=TransactionStatus.PENDING,
+                                             document=transaction_data)
+    if persisted:
+        transaction_data.update(update_data)
+        if settings.ANALYTICS_ROLLUPS_ENABLED:
+            with stage("rollups"):
+                await record_transaction_rollups([transaction_data])
+    else:
+        logger.error("Failed to persist fraud result for transaction %s", transaction_data['transaction_number'])
+    
+    return persisted
+
+
+# Store a transaction as pending for the background scoring workers (202 Accepted mode)
+async def _accept_for_scoring(transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+    transaction_data["status"] = TransactionStatus.PENDING
+    transaction_data["created_at"] = datetime.now()
+    transaction_data.update(scoring_fields(transaction_data["created_at"]))
+    
+    with stage("persist_pending"):
+        await save_transaction(transaction_data)
+    
+    return {
+        "success": True,
+        "transaction": _build_transaction_response(transaction_data)
+    }
+
+
+# Write the final status of a transaction scored by a background worker.
+# Returns the create response, or None if another worker already finished it.
+async def complete_scored_transaction(transaction: Dict[str, Any],
+                                      fraud_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    update_data, use_outbox = await _build_result_update(transaction, fraud_result)
+    update_data.update(scoring_done_fields())
+    
+    if not await _persist_pending_result(transaction, update_data, fraud_result, use_outbox):
+        return None
+    
+    if use_outbox:
+        notification_worker.notify()
+    record_decision(transaction["status"])
+    return _build_transaction_response(transaction)
+
+
+# Process a batch of transactions with bulk writes and concurrent scoring
+async def process_transaction_batch(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    saved = []
+    try:
+        now = datetime.now()
+        for transaction_data in transactions:
+            if "transaction_number" not in transaction_data:
+                transaction_data["transaction_number"] = f"txn_{uuid.uuid4().hex[:8]}"
+            transaction_data["status"] = TransactionStatus.PENDING
+            transaction_data["created_at"] = now
+            if velocity_engine.enabled:
+                transaction_data["velocity_features"] = velocity_engine.observe(transaction_data)
+
+        # Insert every transaction as pending with one insert_many
+        with stage("batch_persist_pending"):
+            save_results = await save_transactions_bulk(transactions)
+        saved = [result["transaction"] for result in save_results if result["success"]]
+
+        # Score every inserted transaction
+        with stage("batch_fraud_check"):
+            fraud_results = await fraud_service.check_transactions(saved)
+
+        updates = []
+        flagged = []
+        for transaction, fraud_result in zip(saved, fraud_results):
+            if not isinstance(fraud_result, dict):
+                continue
+            update_data = _build_fraud_update(fraud_result)
+            updates.append((transaction["_id"], update_data))
+            if update_data["status"] == TransactionStatus.FLAGGED:
+                flagged.append((transaction, fraud_result, update_data))
+
+        # Hand flagged transactions to the notification outbox (which owns notification_sent)
+        if settings.NOTIFICATION_OUTBOX_ENABLED:
+            with stage("batch_outbox_enqueue"):
+                await enqueue_notifications_bulk([
+                    (transaction["_id"], transaction, fraud_result)
+                    for transaction, fraud_result, _ in flagged
+                ])
+            flagged = []
+
+        # Otherwise send fraud notifications concurrently
+        semaphore = asyncio.Semaphore(settings.BATCH_NOTIFICATION_CONCURRENCY)
+
+        async def notify(transaction: Dict[str, Any], fraud_result: Dict[str, Any], update_data: Dict[str, Any]):
+            async with semaphore:
+                notification_result = await notification_service.send_fraud_notification(transaction, fraud_result)
+            if isinstance(notification_result, dict):
+                update_data["notification_result"] = notification_result
+                update_data["notification_sent"] = notification_result.get("notification_sent", False)
+
+        if flagged:
+            with stage("batch_notification"):
+                await asyncio.gather(*(notify(*item) for item in flagged))
+
+        # Apply every status update with one bulk_write
+        saved_by_id = {transaction["_id"]: transaction for transaction in saved}
+        with stage("batch_persist_result"):
+            applied = await bulk_update_transactions(updates, previous_status=TransactionStatus.PENDING,
+                                                     documents=saved_by_id)
+        if settings.NOTIFICATION_OUTBOX_ENABLED:
+            notification_worker.notify()
         
-        # Prepare response using the updated_transaction dictionary
-        response = {}
-        if updated_transaction:
-            response = {
-                "transaction_number": updated_transaction.get("transaction_number"),
-                "status": updated_transaction.get("status", str(transaction_status)),
-                "created_at": updated_transaction.get("created_at").isoformat() if updated_transaction.get("created_at") else None,
-                "is_fraud": updated_transaction.get("is_fraud", fraud_detected),
-                "fraud_probability": updated_transaction.get("fraud_probability", 
-                                     fraud_result.get("fraud_probability", 0.0) if isinstance(fraud_result, dict) else 0.0),
-                "notification_sent": updated_transaction.get("notification_sent", False)
+        # Only reflect, count and roll up the results that were persisted
+        written = []
+        for (transaction_id, update_data), was_applied in zip(updates, applied):
+            if not was_applied:
+                logger.error("Failed to persist fraud result for transaction %s",
+                             saved_by_id[transaction_id]["transaction_number"])
+                continue
+            saved_by_id[transaction_id].update(update_data)
+            record_decision(update_data["status"])
+            written.append(saved_by_id[transaction_id])
+        if settings.ANALYTICS_ROLLUPS_ENABLED and written:
+            with stage("batch_rollups"):
+                await record_transaction_rollups(written)
+
+        # Build per-item results in request order
+        results = []
+        for index, (transaction_data, save_result) in enumerate(zip(transactions, save_results)):
+            item = {
+                "index": index,
+                "transaction_number": transaction_data.get("transaction_number"),
+                "success": save_result["success"]
             }
-            
-            # Add other fields from updated_transaction
-            for field in ["category", "merchant_name", "transaction_amount", "transaction_location"]:
-                if field in updated_transaction:
-                    response[field] = updated_transaction[field]
-                    
-        # Return success response
+            if save_result["success"]:
+                item["transaction"] = _build_transaction_response(save_result["transaction"])
+            else:
+                item["error"] = save_result["error"]
+            results.append(item)
+
+        succeeded = sum(1 for item in results if item["success"])
         return {
             "success": True,
-            "transaction": response
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
         }
     except Exception as e:
-        import traceback
-        logging.error(f"Error processing transaction: {e}")
-        logging.error(traceback.format_exc())  # Print full stack trace
+        logger.exception("Error processing transaction batch: %s", e)
+        # Inserted transactions still pending would otherwise never be scored: a retry of
+        # the batch only gets duplicates back, so leave them for the re-scoring command
+        if saved:
+            try:
+                await mark_needs_rescore([transaction["_id"] for transaction in saved])
+            except Exception as mark_error:
+                logger.error("Failed to mark batch transactions for re-scoring: %s", mark_error)
         return {
             "success": False,
             "error": str(e)
         }
-    
 
-async def get_transaction(id: str) -> Dict[str, Any]:
+
+async def get_transaction(id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """Get a transaction by ID or transaction_id"""
     try:
-        transaction = await get_transaction_by_id(id)
+        transaction = await get_transaction_by_id(id, fields)
         
         if not transaction:
             return {
@@ -116,9 +439,10 @@ async def get_transaction(id: str) -> Dict[str, Any]:
             }
             
         # Check notification status if transaction was flagged as fraud
-        if transaction.get("is_fraud", False) and transaction.get("notification_sent", False):
+        # (sparse fieldset reads never return it, so skip the lookup)
+        if fields is None and transaction.get("is_fraud", False) and transaction.get("notification_sent", False):
             notification_status = await notification_service.check_notification_status(
-                transaction["transaction_id"]
+                transaction["transaction_number"]
             )
             
             if notification_status["success"] and notification_status.get("notification"):
@@ -130,13 +454,68 @@ async def get_transaction(id: str) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logging.error(f"Error getting transaction: {e}")
+        logger.error("Error getting transaction: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+# Resolve many transactions with one query and fetch their notification statuses concurrently
+async def lookup_transactions(ids: List[str]) -> Dict[str, Any]:
+    try:
+        unique_ids = list(dict.fromkeys(ids))
+        with stage("lookup_find"):
+            transactions = await get_transactions_by_ids(unique_ids)
+        
+        # One status call per notified transaction, bounded like the batch notifications
+        notified = {
+            transaction["transaction_number"]
+            for transaction in transactions.values()
+            if transaction.get("is_fraud", False) and transaction.get("notification_sent", False)
+            and transaction.get("transaction_number")
+        }
+        semaphore = asyncio.Semaphore(settings.LOOKUP_NOTIFICATION_CONCURRENCY)
+        
+        async def check_status(transaction_number: str):
+            async with semaphore:
+                return transaction_number, await notification_service.check_notification_status(transaction_number)
+        
+        statuses = {}
+        if notified:
+            with stage("lookup_notification_status"):
+                for transaction_number, status in await asyncio.gather(*(check_status(n) for n in notified)):
+                    if status["success"] and status.get("notification"):
+                        statuses[transaction_number] = status["notification"]
+        
+        results = []
+        for id in ids:
+            transaction = transactions.get(id)
+            item = {"id": id, "found": transaction is not None}
+            if transaction is not None:
+                detail = transaction_detail_dict(transaction)
+                if transaction.get("transaction_number") in statuses:
+                    detail["notification_status"] = statuses[transaction["transaction_number"]]
+                item["transaction"] = detail
+            results.append(item)
+        
+        found = sum(1 for item in results if item["found"])
+        return {
+            "success": True,
+            "found": found,
+            "missing": len(results) - found,
+            "results": results
+        }
+    except Exception as e:
+        logger.error("Error looking up transactions: %s", e)
         return {
             "success": False,
             "error": str(e)
         }
 
-async def get_transactions(page: int = 1, limit: int = 10, status: Optional[str] = None) -> Dict[str, Any]:
+async def get_transactions(page: int = 1, limit: int = 10, status: Optional[str] = None,
+                           cursor: Optional[str] = None, include_total: bool = True,
+                           exact_total: bool = False, raw: bool = False,
+                           fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """Get a list of transactions with optional filtering"""
     try:
         filters = {}
@@ -144,13 +523,104 @@ async def get_transactions(page: int = 1, limit: int = 10, status: Optional[str]
         # Apply status filter if provided
         if status:
             filters["status"] = status
+        
+        # Decode the keyset cursor if provided
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "status_code": 400
+                }
             
-        result = await list_transactions(page, limit, filters)
+        result = await list_transactions(page, limit, filters, after, include_total, exact_total, raw, fields)
         return result
         
     except Exception as e:
-        logging.error(f"Error getting transactions: {e}")
+        logger.error("Error getting transactions: %s", e)
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+# Serialize values Mongo returns that json does not handle
+def _export_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _export_csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+# Stream matching transactions as NDJSON or CSV chunks
+async def export_transactions(format: str = "ndjson", status: Optional[str] = None,
+                              created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                              batch_size: int = 1000) -> AsyncIterator[bytes]:
+    filters = {}
+    if status:
+        filters["status"] = status
+    if created_from or created_to:
+        filters["created_at"] = {}
+        if created_from:
+            filters["created_at"]["$gte"] = created_from
+        if created_to:
+            filters["created_at"]["$lt"] = created_to
+    
+    # Rows are buffered and flushed once per cursor batch to keep writes large
+    buffer = io.StringIO()
+    writer = None
+    if format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    
+    rows = 0
+    try:
+        async for transaction in stream_transactions(filters, batch_size):
+            if writer is not None:
+                writer.writerow({field: _export_csv_value(transaction.get(field)) for field in EXPORT_CSV_FIELDS})
+            else:
+                buffer.write(json.dumps(transaction, default=_export_default))
+                buffer.write("\n")
+            
+            rows += 1
+            if rows % batch_size == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+    except Exception as e:
+        # Headers are already sent, so abort the response: the client must see a broken
+        # transfer rather than a normal end of stream that looks like a complete export
+        logger.error("Error exporting transactions after %s rows: %s", rows, e)
+        raise
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# Stream status change events for one subscription as Server-Sent Events
+async def stream_transaction_events(subscription: Subscription,
+                                    is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+    try:
+        # Tell the client how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while not await is_disconnected():
+            event = await subscription.next(settings.EVENT_FEED_HEARTBEAT_SECONDS)
+            if event is not None:
+                yield f"id: {event.get('sequence', '')}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            elif subscription.closed:
+                # Disconnected by the overflow policy; the client reconnects and re-syncs
+                yield "event: overflow\ndata: {}\n\n"
+                break
+            else:
+                # Keep idle connections open through proxies
+                yield ": keepalive\n\n"
+    finally:
+        event_hub.unsubscribe(subscription)
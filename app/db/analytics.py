@@ -0,0 +1,162 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.db.transactions import get_database
+from app.services.metrics import dependency
+
+logger = logging.getLogger(__name__)
+
+# Pre-aggregated transaction analytics, kept up to date with $inc upserts when a
+# transaction's final status is written. One document per (granularity, bucket,
+# dimension, value), e.g.
+# {"_id": "hour|2024-01-01T10:00:00|category|shopping_pos", "count": 12, "amount": 830.5,
+#  "fraud_count": 1, "fraud_amount": 120.0, "statuses": {"approved": 11, "flagged": 1}}
+ROLLUPS_COLLECTION = "transaction_rollups"
+
+GRANULARITIES = ("minute", "hour", "day")
+DIMENSIONS = ("all", "category", "state")
+
+
+# Start of the bucket a timestamp falls into
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_size(granularity: str) -> timedelta:
+    return {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}[granularity]
+
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+
+# Rollup keys a transaction contributes to: every granularity x every dimension
+def _rollup_keys(transaction: Dict[str, Any]) -> Iterable[Tuple[str, datetime, str, str]]:
+    created_at = transaction.get("created_at")
+    if not isinstance(created_at, datetime):
+        return
+    for granularity in GRANULARITIES:
+        bucket = bucket_start(created_at, granularity)
+        yield granularity, bucket, "all", "all"
+        for dimension in ("category", "state"):
+            yield granularity, bucket, dimension, str(transaction.get(dimension) or "unknown")
+
+
+# Merge the increments of many transactions so each rollup document gets one update
+def _accumulate(transactions: Iterable[Dict[str, Any]], sign: int = 1) -> Dict[Tuple, Dict[str, float]]:
+    increments: Dict[Tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    for transaction in transactions:
+        amount = float(transaction.get("transaction_amount") or 0.0)
+        is_fraud = bool(transaction.get("is_fraud", False))
+        status = _status_value(transaction.get("status")) or "unknown"
+        for key in _rollup_keys(transaction):
+            inc = increments[key]
+            inc["count"] += sign
+            inc["amount"] += sign * amount
+            inc[f"statuses.{status}"] += sign
+            if is_fraud:
+                inc["fraud_count"] += sign
+                inc["fraud_amount"] += sign * amount
+    return increments
+
+
+def _rollup_updates(increments: Dict[Tuple, Dict[str, float]]) -> List[UpdateOne]:
+    updates = []
+    for (granularity, bucket, dimension, value), inc in increments.items():
+        updates.append(UpdateOne(
+            {"_id": f"{granularity}|{bucket.isoformat()}|{dimension}|{value}"},
+            {
+                "$inc": dict(inc),
+                "$setOnInsert": {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "dimension": dimension,
+                    "value": value
+                }
+            },
+            upsert=True
+        ))
+    return updates
+
+
+# Add finalized transactions to the rollups (sign=-1 removes them, e.g. before a status change)
+async def record_transaction_rollups(transactions: List[Dict[str, Any]], sign: int = 1) -> None:
+    updates = _rollup_updates(_accumulate(transactions, sign))
+    if not updates:
+        return
+
+    db = await get_database()
+    try:
+        with dependency("mongo", "rollup_bulk_write"):
+            await db[ROLLUPS_COLLECTION].bulk_write(updates, ordered=False)
+    except Exception as e:
+        logger.error("Error updating transaction rollups: %s", e)
+
+
+# Read rollup buckets in [start, end) for one granularity and dimension
+async def query_rollups(granularity: str, dimension: str, start: datetime, end: datetime,
+                        value: Optional[str] = None) -> List[Dict[str, Any]]:
+    db = await get_database()
+    query = {
+        "granularity": granularity,
+        "dimension": dimension,
+        "bucket": {"$gte": bucket_start(start, granularity), "$lt": end}
+    }
+    if value is not None:
+        query["value"] = value
+
+    with dependency("mongo", "find"):
+        documents = await db[ROLLUPS_COLLECTION].find(query, {"_id": 0}) \
+            .sort([("bucket", 1), ("value", 1)]) \
+            .to_list(length=None)
+
+    for document in documents:
+        count = document.get("count", 0)
+        document["fraud_rate"] = document.get("fraud_count", 0) / count if count else 0.0
+    return documents
+
+
+# Recompute rollups from the transactions collection, optionally only for buckets from `since` on.
+# Run while writers are quiet: transactions finalized during the rebuild may be counted twice.
+async def rebuild_rollups(since: Optional[datetime] = None, batch_size: int = 1000) -> Dict[str, int]:
+    db = await get_database()
+
+    # Only transactions whose fraud result was written (pending ones are still in flight,
+    # unless the fallback policy left them pending after a failed check)
+    filters: Dict[str, Any] = {"$or": [{"status": {"$ne": "pending"}}, {"fraud_check_result": {"$exists": True}}]}
+
+    # Buckets are cleared from the start of the day so every granularity is rebuilt whole
+    rollup_filter: Dict[str, Any] = {}
+    if since is not None:
+        since = bucket_start(since, "day")
+        filters["created_at"] = {"$gte": since}
+        rollup_filter["bucket"] = {"$gte": since}
+
+    await db[ROLLUPS_COLLECTION].delete_many(rollup_filter)
+
+    projection = {field: 1 for field in ["created_at", "transaction_amount", "is_fraud", "status", "category", "state"]}
+    cursor = db.transactions.find(filters, projection).batch_size(batch_size)
+    processed = 0
+    chunk: List[Dict[str, Any]] = []
+    async for transaction in cursor:
+        chunk.append(transaction)
+        if len(chunk) >= batch_size:
+            await db[ROLLUPS_COLLECTION].bulk_write(_rollup_updates(_accumulate(chunk)), ordered=False)
+            processed += len(chunk)
+            chunk = []
+    if chunk:
+        await db[ROLLUPS_COLLECTION].bulk_write(_rollup_updates(_accumulate(chunk)), ordered=False)
+        processed += len(chunk)
+
+    buckets = await db[ROLLUPS_COLLECTION].count_documents(rollup_filter)
+    logger.info("Rebuilt transaction rollups from %s transactions into %s buckets", processed, buckets)
+    return {"transactions": processed, "buckets": buckets}
@@ -0,0 +1,74 @@
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-status transaction counts kept up to date incrementally by the write path,
+# so list totals do not need a count_documents scan. All statuses live in one
+# document, {"_id": "status_counts", "counts": {"approved": 123, ...}}, so a
+# rebuild replaces every count in a single atomic write.
+COUNTERS_COLLECTION = "transaction_counters"
+STATUS_COUNTS_ID = "status_counts"
+
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+
+# Apply per-status deltas, e.g. {"pending": -1, "approved": 1}
+async def increment_status_counts(db, deltas: Dict[str, int]) -> None:
+    merged = Counter()
+    for status, delta in deltas.items():
+        if status is not None:
+            merged[_status_value(status)] += delta
+    deltas = {status: delta for status, delta in merged.items() if delta}
+    if not deltas:
+        return
+
+    try:
+        await db[COUNTERS_COLLECTION].update_one(
+            {"_id": STATUS_COUNTS_ID},
+            {"$inc": {f"counts.{status}": delta for status, delta in deltas.items()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error("Error updating status counters: %s", e)
+
+
+# Count inserted documents by status
+def count_statuses(transactions: Iterable[Dict]) -> Dict[str, int]:
+    return dict(Counter(_status_value(transaction.get("status")) for transaction in transactions))
+
+
+# Read the maintained count for one status, None if the counters were never seeded
+async def get_status_count(db, status) -> Optional[int]:
+    status = _status_value(status)
+    counter = await db[COUNTERS_COLLECTION].find_one({"_id": STATUS_COUNTS_ID}, {f"counts.{status}": 1})
+    if counter is None:
+        return None
+    return max(counter.get("counts", {}).get(status, 0), 0)
+
+
+# Recompute every status counter from the transactions collection. This scans the whole
+# collection, so it only runs at startup (first seed) and from the offline repair script;
+# $inc updates made while the aggregation runs are not reflected, run it while writers are quiet.
+async def rebuild_status_counts(db) -> Dict[str, int]:
+    counts = {}
+    async for row in db.transactions.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        if row["_id"] is not None:
+            counts[_status_value(row["_id"])] = row["count"]
+
+    await db[COUNTERS_COLLECTION].replace_one({"_id": STATUS_COUNTS_ID}, {"counts": counts}, upsert=True)
+
+    # Per-status documents written by earlier versions are no longer read
+    await db[COUNTERS_COLLECTION].delete_many({"_id": {"$regex": "^status:"}})
+
+    logger.info("Rebuilt transaction status counters: %s", counts)
+    return counts
+
+
+# Seed the counters on first start against an existing collection
+async def ensure_status_counts(db) -> None:
+    if await db[COUNTERS_COLLECTION].find_one({"_id": STATUS_COUNTS_ID}) is None:
+        await rebuild_status_counts(db)
@@ -0,0 +1,126 @@
+import logging
+import uuid
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from typing import Any, Dict, List, Tuple
+
+from app.db.transactions import get_database
+
+logger = logging.getLogger(__name__)
+
+
+# Outbox entry states
+OUTBOX_PENDING = "pending"
+OUTBOX_PROCESSING = "processing"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+
+# Build the filter and upsert document that create an outbox entry once per transaction
+def _enqueue_update(transaction_id: str, transaction_data: Dict[str, Any],
+                    fraud_result: Dict[str, Any]) -> Tuple[Dict, Dict]:
+    now = datetime.now()
+    payload = {
+        field: transaction_data.get(field)
+        for field in ["transaction_number", "transaction_amount", "is_nighttime", "category",
+                      "transaction_location", "job", "state"]
+    }
+    return (
+        {"transaction_id": transaction_id},
+        {"$setOnInsert": {
+            "transaction_id": transaction_id,
+            "transaction_number": transaction_data.get("transaction_number"),
+            "transaction": payload,
+            "fraud_result": {
+                "is_fraud": fraud_result.get("is_fraud", False),
+                "fraud_probability": fraud_result.get("fraud_probability", 0.0)
+            },
+            "status": OUTBOX_PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        }}
+    )
+
+
+# Write a notification outbox entry for a flagged transaction
+async def enqueue_notification(transaction_id: str, transaction_data: Dict[str, Any],
+                               fraud_result: Dict[str, Any]) -> None:
+    db = await get_database()
+    filter, update = _enqueue_update(transaction_id, transaction_data, fraud_result)
+    await db.notification_outbox.update_one(filter, update, upsert=True)
+
+
+# Write outbox entries for many flagged transactions with one bulk_write
+async def enqueue_notifications_bulk(entries: List[tuple]) -> None:
+    """entries are (transaction_id, transaction_data, fraud_result) tuples"""
+    if not entries:
+        return
+
+    db = await get_database()
+    await db.notification_outbox.bulk_write(
+        [UpdateOne(*_enqueue_update(*entry), upsert=True) for entry in entries],
+        ordered=False
+    )
+
+
+# Lease up to batch_size due entries, including ones whose previous lease expired
+async def claim_notifications(batch_size: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    db = await get_database()
+    now = datetime.now()
+    due = {"$or": [
+        {"status": OUTBOX_PENDING, "next_attempt_at": {"$lte": now}},
+        {"status": OUTBOX_PROCESSING, "locked_until": {"$lte": now}}
+    ]}
+
+    candidates = await db.notification_outbox.find(due, {"_id": 1}) \
+        .sort("next_attempt_at", 1).limit(batch_size).to_list(length=batch_size)
+    if not candidates:
+        return []
+
+    # Re-check the due filter so entries claimed concurrently by another worker are skipped
+    lease_id = uuid.uuid4().hex
+    await db.notification_outbox.update_many(
+        {"_id": {"$in": [entry["_id"] for entry in candidates]}, **due},
+        {"$set": {
+            "status": OUTBOX_PROCESSING,
+            "lease_id": lease_id,
+            "locked_until": now + timedelta(seconds=lease_seconds),
+            "updated_at": now
+        }}
+    )
+
+    return await db.notification_outbox.find({"lease_id": lease_id}).to_list(length=batch_size)
+
+
+# Mark an entry as delivered
+async def mark_notification_sent(entry_id: ObjectId) -> None:
+    db = await get_database()
+    await db.notification_outbox.update_one(
+        {"_id": entry_id},
+        {"$set": {"status": OUTBOX_SENT, "updated_at": datetime.now()},
+         "$inc": {"attempts": 1},
+         "$unset": {"lease_id": "", "locked_until": ""}}
+    )
+
+
+# Schedule another attempt, or give up once attempts are exhausted
+async def mark_notification_retry(entry_id: ObjectId, error: str, next_attempt_at: datetime,
+                                  give_up: bool = False) -> None:
+    db = await get_database()
+    try:
+        await db.notification_outbox.update_one(
+            {"_id": entry_id},
+            {"$set": {
+                "status": OUTBOX_FAILED if give_up else OUTBOX_PENDING,
+                "last_error": error,
+                "next_attempt_at": next_attempt_at,
+                "updated_at": datetime.now()
+            },
+             "$inc": {"attempts": 1},
+             "$unset": {"lease_id": "", "locked_until": ""}}
+        )
+    except Exception as e:
+        logger.error("Error rescheduling notification outbox entry %s: %s", entry_id, e)
+
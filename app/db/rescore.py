@@ -0,0 +1,138 @@
+import logging
+from bson import ObjectId
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.config import settings
+from app.db.analytics import record_transaction_rollups
+from app.db.counters import increment_status_counts
+from app.db.scoring_queue import SCORING_PROCESSING, SCORING_QUEUED
+from app.db.transactions import bulk_update_applied, get_database
+from app.services.cache import transaction_cache
+from app.services.event_hub import event_hub
+from app.services.metrics import dependency
+
+logger = logging.getLogger(__name__)
+
+# Progress of re-scoring jobs, one document per job name, so an interrupted run
+# continues after the last transaction it wrote back
+RESCORE_CHECKPOINTS_COLLECTION = "rescore_checkpoints"
+
+# Which transactions a re-scoring run picks up
+RESCORE_SELECTIONS = ("needs_rescore", "pending", "all")
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+# Query for the transactions of one selection. Pending transactions younger than
+# min_age_seconds, or still queued for the background scoring workers, are left alone
+# because a create request is still working on them.
+def rescore_filters(selection: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    min_age_seconds: float = 300.0) -> Dict[str, Any]:
+    if selection not in RESCORE_SELECTIONS:
+        raise ValueError(f"Unknown selection: {selection}")
+
+    filters: Dict[str, Any] = {"scoring_state": {"$nin": [SCORING_QUEUED, SCORING_PROCESSING]}}
+    if selection == "needs_rescore":
+        filters["needs_rescore"] = True
+    elif selection == "pending":
+        filters["status"] = "pending"
+
+    filters["created_at"] = {"$lte": datetime.now() - timedelta(seconds=min_age_seconds)}
+    if since is not None:
+        filters["created_at"]["$gte"] = since
+    if until is not None:
+        filters["created_at"]["$lt"] = until
+    return filters
+
+
+# Next batch of matching transactions in _id order after `after_id`. Each batch is its
+# own short query, so a slow, rate-limited run never holds a cursor open long enough
+# for the server to time it out, and the last _id is all a checkpoint needs.
+async def fetch_rescore_batch(filters: Dict[str, Any], after_id: Optional[str],
+                              batch_size: int) -> List[Dict[str, Any]]:
+    db = await get_database()
+    query = dict(filters)
+    if after_id is not None:
+        query["_id"] = {"$gt": ObjectId(after_id)}
+
+    with dependency("mongo", "find"):
+        return await db.transactions.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+
+
+async def load_checkpoint(job: str) -> Optional[Dict[str, Any]]:
+    db = await get_database()
+    return await db[RESCORE_CHECKPOINTS_COLLECTION].find_one({"_id": job})
+
+
+async def save_checkpoint(job: str, checkpoint: Dict[str, Any]) -> None:
+    db = await get_database()
+    await db[RESCORE_CHECKPOINTS_COLLECTION].update_one(
+        {"_id": job},
+        {"$set": {**checkpoint, "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+
+async def delete_checkpoint(job: str) -> None:
+    db = await get_database()
+    await db[RESCORE_CHECKPOINTS_COLLECTION].delete_one({"_id": job})
+
+
+# Whether a transaction is included in the analytics rollups (see rebuild_rollups)
+def _in_rollups(transaction: Dict[str, Any]) -> bool:
+    return _status_value(transaction.get("status")) != "pending" or "fraud_check_result" in transaction
+
+
+# Write re-scored results with one unordered bulk_write and return the number applied.
+# `changes` are (stored transaction, update) pairs; each update only applies if the
+# transaction still has the status it was scored with. Status counters, rollups and the
+# event feed are moved from the old to the new result for exactly the updates that applied.
+async def apply_rescore_updates(changes: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> int:
+    if not changes:
+        return 0
+
+    db = await get_database()
+    now = datetime.now()
+    operations = []
+    for transaction, update in changes:
+        update["updated_at"] = now
+        update["rescored_at"] = now
+        operations.append((
+            str(transaction["_id"]),
+            {"_id": transaction["_id"], "status": _status_value(transaction.get("status"))},
+            {"$set": update, "$unset": {"needs_rescore": ""}}
+        ))
+
+    applied = await bulk_update_applied(operations)
+
+    deltas: Dict[str, int] = {}
+    written = []
+    for (transaction, update), was_applied in zip(changes, applied):
+        id = str(transaction["_id"])
+        await transaction_cache.invalidate(id)
+        if not was_applied:
+            continue
+        written.append((transaction, update))
+        old_status = _status_value(transaction.get("status"))
+        new_status = _status_value(update["status"])
+        if old_status != new_status:
+            deltas[old_status] = deltas.get(old_status, 0) - 1
+            deltas[new_status] = deltas.get(new_status, 0) + 1
+            event_hub.publish_status_change(id, {**transaction, **update}, transaction.get("status"))
+
+    if len(written) < len(changes):
+        logger.warning("%s of %s re-scored transactions changed concurrently and were skipped",
+                       len(changes) - len(written), len(changes))
+
+    if deltas:
+        await increment_status_counts(db, deltas)
+    if settings.ANALYTICS_ROLLUPS_ENABLED and written:
+        await record_transaction_rollups(
+            [transaction for transaction, _ in written if _in_rollups(transaction)], sign=-1
+        )
+        await record_transaction_rollups([{**transaction, **update} for transaction, update in written])
+
+    return len(written)
@@ -0,0 +1,87 @@
+import logging
+import uuid
+from bson import ObjectId
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.db.transactions import get_database
+from app.services.metrics import dependency
+
+logger = logging.getLogger(__name__)
+
+# Transactions accepted with 202 carry their own scoring state, so the pending
+# document and its queue entry are written by the same insert and survive restarts.
+SCORING_QUEUED = "queued"
+SCORING_PROCESSING = "processing"
+SCORING_DONE = "done"
+
+
+# Fields added to a transaction queued for background scoring
+def scoring_fields(now: datetime) -> Dict[str, Any]:
+    return {
+        "scoring_state": SCORING_QUEUED,
+        "scoring_attempts": 0,
+        "scoring_next_attempt_at": now
+    }
+
+
+# Fields written together with the final status once scoring is done
+def scoring_done_fields() -> Dict[str, Any]:
+    return {
+        "scoring_state": SCORING_DONE,
+        "scoring_lease_id": None,
+        "scoring_locked_until": None
+    }
+
+
+# Lease up to batch_size due transactions, including ones whose previous lease expired
+async def claim_scoring(batch_size: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    db = await get_database()
+    now = datetime.now()
+    due = {"$or": [
+        {"scoring_state": SCORING_QUEUED, "scoring_next_attempt_at": {"$lte": now}},
+        {"scoring_state": SCORING_PROCESSING, "scoring_locked_until": {"$lte": now}}
+    ]}
+
+    with dependency("mongo", "find"):
+        candidates = await db.transactions.find(due, {"_id": 1}) \
+            .sort("scoring_next_attempt_at", 1).limit(batch_size).to_list(length=batch_size)
+    if not candidates:
+        return []
+
+    # Re-check the due filter so transactions claimed concurrently by another worker are skipped
+    lease_id = uuid.uuid4().hex
+    with dependency("mongo", "update_many"):
+        await db.transactions.update_many(
+            {"_id": {"$in": [candidate["_id"] for candidate in candidates]}, **due},
+            {"$set": {
+                "scoring_state": SCORING_PROCESSING,
+                "scoring_lease_id": lease_id,
+                "scoring_locked_until": now + timedelta(seconds=lease_seconds)
+            }}
+        )
+
+    with dependency("mongo", "find"):
+        transactions = await db.transactions.find({"scoring_lease_id": lease_id}).to_list(length=batch_size)
+    for transaction in transactions:
+        transaction["_id"] = str(transaction["_id"])
+    return transactions
+
+
+# Put a transaction back in the queue after a failed scoring attempt
+async def mark_scoring_retry(transaction: Dict[str, Any], error: str, next_attempt_at: datetime) -> None:
+    db = await get_database()
+    try:
+        await db.transactions.update_one(
+            {"_id": ObjectId(transaction["_id"]), "scoring_lease_id": transaction.get("scoring_lease_id")},
+            {"$set": {
+                "scoring_state": SCORING_QUEUED,
+                "scoring_next_attempt_at": next_attempt_at,
+                "scoring_last_error": error,
+                "scoring_lease_id": None,
+                "scoring_locked_until": None
+            },
+             "$inc": {"scoring_attempts": 1}}
+        )
+    except Exception as e:
+        logger.error("Error rescheduling scoring for transaction %s: %s", transaction.get('transaction_number'), e)
@@ -1,40 +1,281 @@
+import asyncio
+import base64
+import json
 import logging 
+import uuid
 import motor.motor_asyncio
 from bson import ObjectId
 from datetime import datetime
-from typing import Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from app.config.config import settings
+from app.services.cache import transaction_cache
+from app.services.event_hub import event_hub, EVENT_FIELDS
+from app.services.metrics import dependency
+from app.db.counters import (
+    count_statuses,
+    ensure_status_counts,
+    get_status_count,
+    increment_status_counts
+)
+
+logger = logging.getLogger(__name__)
 
 # Global database client 
 client = None
 db = None
 
+
+# Apply (id, filter, update document) updates with unordered bulk_writes and report, per
+# update, whether it matched and modified its document. Each update also sets a unique
+# write_token; when the totals show some updates missed (e.g. a status-guarded filter
+# matched nothing), the tokens are read back to find out which ones applied. Updates
+# to the same id are sent in separate rounds so a token is never overwritten within one.
+async def bulk_update_applied(updates: List[Tuple[str, Dict, Dict]]) -> List[bool]:
+    applied = [False] * len(updates)
+    pending = list(range(len(updates)))
+    while pending:
+        round_indexes, seen, deferred = [], set(), []
+        for index in pending:
+            id = updates[index][0]
+            (deferred if id in seen else round_indexes).append(index)
+            seen.add(id)
+        pending = deferred
+
+        prefix = uuid.uuid4().hex
+        operations = []
+        for index in round_indexes:
+            _, filter, update = updates[index]
+            token = {"write_token": f"{prefix}:{index}"}
+            operations.append(UpdateOne(filter, {**update, "$set": {**update.get("$set", {}), **token}}))
+
+        write_errors = set()
+        try:
+            with dependency("mongo", "bulk_write"):
+                result = await db.transactions.bulk_write(operations, ordered=False)
+            modified = result.modified_count
+        except BulkWriteError as e:
+            logger.error("Error bulk updating transactions: %s", e.details.get("writeErrors"))
+            write_errors = {round_indexes[error["index"]] for error in e.details.get("writeErrors", [])}
+            modified = e.details.get("nModified", 0)
+
+        if modified == len(operations):
+            for index in round_indexes:
+                applied[index] = True
+            continue
+
+        tokens = [f"{prefix}:{index}" for index in round_indexes]
+        with dependency("mongo", "find"):
+            matched = await db.transactions.find(
+                {"_id": {"$in": [ObjectId(updates[index][0]) for index in round_indexes]},
+                 "write_token": {"$in": tokens}},
+                {"write_token": 1}
+            ).to_list(length=None)
+        applied_tokens = {document["write_token"] for document in matched}
+        for index in round_indexes:
+            applied[index] = f"{prefix}:{index}" in applied_tokens and index not in write_errors
+
+    return applied
+
+
+# Write-behind buffer that groups concurrent single-document writes into one
+# insert_many / bulk_write. Callers still await until their batch is acknowledged,
+# so the durability they observe is unchanged.
+class GroupCommitBuffer:
+
+    def __init__(self, max_ops: int, interval_ms: float):
+        self.max_ops = max_ops
+        self.interval = interval_ms / 1000.0
+        self._inserts: List[tuple] = []  # (document, future)
+        self._updates: List[tuple] = []  # (id, filter, $set fields, status deltas, future)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        # Group commit counters
+        self.flushes = 0
+        self.operations = 0
+        self.max_group = 0
+
+    # Queue an insert and wait for its _id once the group is committed
+    async def insert(self, document: Dict) -> ObjectId:
+        future = asyncio.get_running_loop().create_future()
+        self._inserts.append((document, future))
+        self._schedule()
+        return await future
+
+    # Queue an update and wait until the group is committed; False if it matched nothing
+    async def update(self, id: str, filter: Dict, updates: Dict, deltas: Dict[str, int]) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self._updates.append((id, filter, updates, deltas, future))
+        self._schedule()
+        return await future
+
+    def _schedule(self) -> None:
+        if len(self._inserts) + len(self._updates) >= self.max_ops:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        inserts, self._inserts = self._inserts, []
+        updates, self._updates = self._updates, []
+        if not inserts and not updates:
+            return
+
+        task = asyncio.ensure_future(self._commit(inserts, updates))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _commit(self, inserts: List[tuple], updates: List[tuple]) -> None:
+        self.flushes += 1
+        self.operations += len(inserts) + len(updates)
+        self.max_group = max(self.max_group, len(inserts) + len(updates))
+
+        # Inserts go first so an update queued right after its insert always finds the document
+        if inserts:
+            await self._commit_inserts(inserts)
+        if updates:
+            await self._commit_updates(updates)
+
+    async def _commit_inserts(self, inserts: List[tuple]) -> None:
+        documents = [document for document, _ in inserts]
+        write_errors = {}
+        try:
+            with dependency("mongo", "insert_many"):
+                await db.transactions.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                write_errors[error["index"]] = error
+        except Exception as e:
+            for _, future in inserts:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        inserted = [document for index, document in enumerate(documents) if index not in write_errors]
+        await increment_status_counts(db, count_statuses(inserted))
+
+        for index, (document, future) in enumerate(inserts):
+            if future.done():
+                continue
+            error = write_errors.get(index)
+            if error is None:
+                future.set_result(document["_id"])
+            elif error.get("code") == 11000:
+                future.set_exception(DuplicateKeyError(error.get("errmsg", "Duplicate key"), 11000, error))
+            else:
+                future.set_exception(WriteError(error.get("errmsg", "Write error"), error.get("code"), error))
+
+    async def _commit_updates(self, updates: List[tuple]) -> None:
+        try:
+            applied = await bulk_update_applied([(id, filter, {"$set": fields}) for id, filter, fields, _, _ in updates])
+        except Exception as e:
+            for _, _, _, _, future in updates:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Counters only move for the updates that actually applied
+        deltas = {}
+        for (_, _, _, update_deltas, _), was_applied in zip(updates, applied):
+            if was_applied:
+                for status, delta in update_deltas.items():
+                    deltas[status] = deltas.get(status, 0) + delta
+        if deltas:
+            await increment_status_counts(db, deltas)
+
+        for (id, _, _, _, future), was_applied in zip(updates, applied):
+            await transaction_cache.invalidate(id)
+            if not future.done():
+                future.set_result(was_applied)
+
+    # Commit everything still buffered (called before the connection is closed)
+    async def drain(self) -> None:
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "flushes": self.flushes,
+            "operations": self.operations,
+            "avg_group_size": self.operations / self.flushes if self.flushes else 0.0,
+            "max_group_size": self.max_group,
+            "queued": len(self._inserts) + len(self._updates)
+        }
+
+
+write_buffer = GroupCommitBuffer(settings.GROUP_COMMIT_MAX_OPS, settings.GROUP_COMMIT_INTERVAL_MS)
+
+
+def _group_commit_enabled() -> bool:
+    return settings.PERSISTENCE_MODE == "group_commit"
+
 # Connect to MongoDB and initialize collections 
 async def connect_to_mongodb():
     global client, db
 
     try:
-        client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URI)
+        # "mongomock://" selects an in-memory database, used by the benchmark suite
+        if settings.MONGODB_URI.startswith("mongomock://"):
+            from mongomock_motor import AsyncMongoMockClient  # Optional dependency
+            client = AsyncMongoMockClient()
+        else:
+            # Bounded pool with a wait deadline, so a Mongo slowdown sheds load instead of queueing forever
+            client = motor.motor_asyncio.AsyncIOMotorClient(
+                settings.MONGODB_URI,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+            )
         db = client[settings.MONGODB_DB]
         
         # Create indexes 
         await db.transactions.create_index("transaction_number", unique=True)
+        await db.transactions.create_index([("created_at", -1), ("_id", -1)])
+        await db.transactions.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+        await db.transactions.create_index("needs_rescore", sparse=True)
+        await db.transactions.create_index("idempotency_key", unique=True, sparse=True)
+        await db.transactions.create_index([("scoring_state", 1), ("scoring_next_attempt_at", 1)], sparse=True)
+        await db.transactions.create_index("scoring_lease_id", sparse=True)
+        await db.notification_outbox.create_index("transaction_id", unique=True)
+        await db.notification_outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+        await db.transaction_rollups.create_index([("granularity", 1), ("dimension", 1), ("bucket", 1), ("value", 1)])
+        
+        # Seed the per-status counters used for list totals
+        await ensure_status_counts(db)
 
-        logging.info("Connected to MongoDB successfully")
+        logger.info("Connected to MongoDB successfully")
     
     except Exception as e:
-        logging.error(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise e
     
 
+# Get the database handle, connecting first if needed
+async def get_database():
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    return db
+
+
 # Close MongoDB connection
 async def close_mongodb_connection():
     global client 
 
+    await write_buffer.drain()
+
     if client:
         client.close()
-        logging.info("MongoDB connection closed")
+        logger.info("MongoDB connection closed")
 
 
 # Save tranasaction to the database 
@@ -49,45 +290,191 @@ async def save_transaction(transaction: Dict) -> Dict:
         transaction["created_at"] = datetime.now()
 
     # Insert the transaction into the database
-    result = await db.transactions.insert_one(transaction)
-    transaction["_id"] = str(result.inserted_id)
+    if _group_commit_enabled():
+        transaction["_id"] = str(await write_buffer.insert(transaction))
+    else:
+        with dependency("mongo", "insert_one"):
+            result = await db.transactions.insert_one(transaction)
+        transaction["_id"] = str(result.inserted_id)
+        await increment_status_counts(db, count_statuses([transaction]))
+
+    # Transactions written straight with their final status (score-then-persist)
+    if transaction.get("status", "pending") != "pending":
+        event_hub.publish_status_change(transaction["_id"], transaction)
 
     return transaction
 
 
+# Save many transactions with a single insert_many
+async def save_transactions_bulk(transactions: List[Dict]) -> List[Dict]:
+    """Insert transactions unordered and return a per-item result in input order"""
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    now = datetime.now()
+    for transaction in transactions:
+        if "created_at" not in transaction:
+            transaction["created_at"] = now
+
+    if not transactions:
+        return []
+
+    # insert_many assigns _id to every document client-side before sending
+    write_errors = {}
+    try:
+        with dependency("mongo", "insert_many"):
+            await db.transactions.insert_many(transactions, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            write_errors[error["index"]] = error
+
+    inserted = [transaction for index, transaction in enumerate(transactions) if index not in write_errors]
+    await increment_status_counts(db, count_statuses(inserted))
+
+    results = []
+    for index, transaction in enumerate(transactions):
+        error = write_errors.get(index)
+        if error is None:
+            transaction["_id"] = str(transaction["_id"])
+            results.append({"success": True, "transaction": transaction})
+        elif error.get("code") == 11000:
+            results.append({
+                "success": False,
+                "error": f"Duplicate transaction_number: {transaction.get('transaction_number')}"
+            })
+        else:
+            results.append({"success": False, "error": error.get("errmsg", "Unknown write error")})
+
+    return results
+
+
+# Mongo projection for a sparse fieldset; created_at is kept for the cursor sort key
+def _projection(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    if not fields:
+        return None
+    projection = {name: 1 for name in fields}
+    projection["created_at"] = 1
+    return projection
+
+
 # Get a transaction by its ID
-async def get_transaction_by_id(id: str) -> Optional[Dict]:
+async def get_transaction_by_id(id: str, fields: Optional[List[str]] = None) -> Optional[Dict]:
+    """Get a transaction by its _id or transaction_number.
+
+    With `fields`, only those fields (plus _id and created_at) are read from Mongo;
+    partial documents are not cached.
+    """
     global db
 
     if db is None:
         await connect_to_mongodb()
 
-    transaction = None
+    projection = _projection(fields)
+    transaction = await transaction_cache.get(id)
+    if transaction is not None:
+        if projection is not None:
+            return {name: transaction[name] for name in ["_id", *projection] if name in transaction}
+        return transaction
 
+    token = transaction_cache.read_token()
     try:
-        # First try to find by MongoDB ObjectId
-        if len(id) == 24:  # MongoDB ObjectId is 24 hex chars
-            try:
-                transaction = await db.transactions.find_one({"_id": ObjectId(id)})
-            except:
-                pass
+        # A 24 hex char id may be either a MongoDB ObjectId or a transaction number,
+        # so match both in a single query
+        query = {"transaction_number": id}
+        if ObjectId.is_valid(id):
+            query = {"$or": [{"_id": ObjectId(id)}, {"transaction_number": id}]}
         
-        # If not found or not a valid ObjectId, try by transaction_id
-        if not transaction:
-            transaction = await db.transactions.find_one({"transaction_number": id})
+        with dependency("mongo", "find_one"):
+            transaction = await db.transactions.find_one(query, projection)
         
         # Convert ObjectId to string for easier handling
         if transaction:
             transaction["_id"] = str(transaction["_id"])
+            if projection is None:
+                await transaction_cache.put(transaction, token)
         
         return transaction
     except Exception as e:
-        logging.error(f"Error getting transaction: {e}")
+        logger.error("Error getting transaction: %s", e)
+        return None
+    
+
+# Resolve many ids or transaction numbers with one $in query
+async def get_transactions_by_ids(ids: List[str]) -> Dict[str, Dict]:
+    """Map each requested id or transaction number to its transaction; missing ids are absent"""
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    found: Dict[str, Dict] = {}
+    for id in ids:
+        transaction = await transaction_cache.get(id)
+        if transaction is not None:
+            found[id] = transaction
+
+    missing = [id for id in ids if id not in found]
+    if not missing:
+        return found
+
+    token = transaction_cache.read_token()
+    try:
+        query = {"transaction_number": {"$in": missing}}
+        object_ids = [ObjectId(id) for id in missing if ObjectId.is_valid(id)]
+        if object_ids:
+            query = {"$or": [{"_id": {"$in": object_ids}}, query]}
+
+        with dependency("mongo", "find"):
+            transactions = await db.transactions.find(query).to_list(length=None)
+
+        by_key: Dict[str, Dict] = {}
+        for transaction in transactions:
+            transaction["_id"] = str(transaction["_id"])
+            await transaction_cache.put(transaction, token)
+            by_key[transaction["_id"]] = transaction
+            by_key[transaction.get("transaction_number")] = transaction
+
+        for id in missing:
+            if id in by_key:
+                found[id] = dict(by_key[id])
+    except Exception as e:
+        logger.error("Error looking up transactions: %s", e)
+        raise
+
+    return found
+    
+
+# Get a transaction by the Idempotency-Key it was created with
+async def get_transaction_by_idempotency_key(key: str) -> Optional[Dict]:
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    try:
+        with dependency("mongo", "find_one"):
+            transaction = await db.transactions.find_one({"idempotency_key": key})
+        
+        if transaction:
+            transaction["_id"] = str(transaction["_id"])
+        
+        return transaction
+    except Exception as e:
+        logger.error("Error getting transaction by idempotency key: %s", e)
         return None
     
 
 # Update transaction data
-async def update_transaction(id: str, updates: Dict) -> bool:
+async def update_transaction(id: str, updates: Dict, previous_status: Optional[str] = None,
+                             document: Optional[Dict] = None) -> bool:
+    """Update a transaction, keeping the status counters in step when the status changes.
+
+    Pass `previous_status` when the caller already knows it, which saves reading the
+    old document back to find out. `document` is the caller's copy of the transaction,
+    used to describe status changes on the event feed.
+    """
     global db
 
     if db is None:
@@ -97,21 +484,178 @@ async def update_transaction(id: str, updates: Dict) -> bool:
         # Add updated_at timestamp
         updates["updated_at"] = datetime.now()
         
+        # Status changes need the old status to move the counters
+        if "status" in updates and previous_status is None:
+            with dependency("mongo", "find_one_and_update"):
+                before = await db.transactions.find_one_and_update(
+                    {"_id": ObjectId(id)},
+                    {"$set": updates},
+                    projection={field: 1 for field in ["status", *EVENT_FIELDS]},
+                    return_document=ReturnDocument.BEFORE
+                )
+            if before is None:
+                return False
+            if before.get("status") != updates["status"]:
+                await increment_status_counts(db, {before.get("status"): -1, updates["status"]: 1})
+            event_hub.publish_status_change(id, {**before, **updates}, before.get("status"))
+            return True
+        
         # Update the transaction
-        result = await db.transactions.update_one(
-            {"_id": ObjectId(id)},
-            {"$set": updates}
-        )
+        filter = {"_id": ObjectId(id)}
+        if "status" in updates:
+            filter["status"] = previous_status
+        
+        if _group_commit_enabled():
+            deltas = {}
+            if "status" in updates and previous_status != updates["status"]:
+                deltas = {previous_status: -1, updates["status"]: 1}
+            updated = await write_buffer.update(id, filter, updates, deltas)
+        else:
+            with dependency("mongo", "update_one"):
+                result = await db.transactions.update_one(filter, {"$set": updates})
+            updated = result.modified_count > 0
+            
+            if "status" in updates and updated and previous_status != updates["status"]:
+                await increment_status_counts(db, {previous_status: -1, updates["status"]: 1})
         
-        return result.modified_count > 0
+        if "status" in updates and updated:
+            event_hub.publish_status_change(id, {**(document or {}), **updates}, previous_status)
+        
+        return updated
     except Exception as e:
-        logging.error(f"Error updating transaction: {e}")
+        logger.error("Error updating transaction: %s", e)
         return False
+    finally:
+        # Drop the cached copy once the write has been applied
+        await transaction_cache.invalidate(id)
     
 
+# Apply many transaction updates with a single bulk_write
+async def bulk_update_transactions(updates: List[Tuple[str, Dict]], previous_status: Optional[str] = None,
+                                   documents: Optional[Dict[str, Dict]] = None) -> List[bool]:
+    """Apply (id, updates) pairs unordered and return, per pair, whether it was written.
+
+    With `previous_status`, status updates only apply to documents still in that status,
+    and the counters and event feed only see the updates that applied. `documents` maps
+    ids to the caller's copies of the transactions, used to describe status changes.
+    """
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    if not updates:
+        return []
+
+    now = datetime.now()
+    operations = []
+    for id, update in updates:
+        update["updated_at"] = now
+        filter = {"_id": ObjectId(id)}
+        if previous_status is not None and "status" in update:
+            filter["status"] = previous_status
+        operations.append((id, filter, {"$set": update}))
+
+    applied = await bulk_update_applied(operations)
+
+    deltas = {}
+    for (id, update), was_applied in zip(updates, applied):
+        await transaction_cache.invalidate(id)
+        if not was_applied or "status" not in update:
+            continue
+        if previous_status is not None:
+            deltas[previous_status] = deltas.get(previous_status, 0) - 1
+            deltas[update["status"]] = deltas.get(update["status"], 0) + 1
+        event_hub.publish_status_change(id, {**(documents or {}).get(id, {}), **update}, previous_status)
+
+    if deltas:
+        await increment_status_counts(db, deltas)
+
+    return applied
+    
+
+# Flag transactions that are still pending for the re-scoring command
+async def mark_needs_rescore(ids: List[str]) -> int:
+    global db
+
+    if db is None:
+        await connect_to_mongodb()
+
+    with dependency("mongo", "update_many"):
+        result = await db.transactions.update_many(
+            {"_id": {"$in": [ObjectId(id) for id in ids]}, "status": "pending"},
+            {"$set": {"needs_rescore": True, "updated_at": datetime.now()}}
+        )
+    for id in ids:
+        await transaction_cache.invalidate(id)
+    return result.modified_count
+
+
+# Stream every matching transaction from a batched cursor, oldest first
+async def stream_transactions(filters: Dict = None, batch_size: int = 1000) -> AsyncIterator[Dict]:
+    """Yield transactions one at a time; memory use is bounded by batch_size"""
+    global db
+    if db is None:
+        await connect_to_mongodb()
+    
+    cursor = db.transactions.find(filters or {}) \
+        .sort([("created_at", 1), ("_id", 1)]) \
+        .batch_size(batch_size)
+    
+    try:
+        async for transaction in cursor:
+            transaction["_id"] = str(transaction["_id"])
+            yield transaction
+    finally:
+        await cursor.close()
+
+
+# Encode the sort key of the last document on a page as an opaque cursor
+def encode_cursor(created_at: datetime, id: str) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# Decode a cursor back into its (created_at, _id) sort key
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(raw["c"]), ObjectId(raw["i"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+# Count transactions matching the filters, returning (total, is_exact)
+async def _count_transactions(filters: Dict, exact: bool = False) -> Tuple[int, bool]:
+    if not exact:
+        # Unfiltered totals come from collection metadata
+        if not filters:
+            with dependency("mongo", "estimated_document_count"):
+                return await db.transactions.estimated_document_count(), False
+        
+        # Status-only filters come from the incrementally maintained counters
+        if set(filters) == {"status"}:
+            count = await get_status_count(db, filters["status"])
+            if count is not None:
+                return count, False
+    
+    with dependency("mongo", "count_documents"):
+        return await db.transactions.count_documents(filters), True
+
+
 # List all transactions
-async def list_transactions(page: int = 1, limit: int = 10, filters: Dict = None) -> Dict:
-    """List transactions with pagination and optional filters"""
+async def list_transactions(page: int = 1, limit: int = 10, filters: Dict = None,
+                            after: Optional[Tuple[datetime, ObjectId]] = None,
+                            include_total: bool = True, exact_total: bool = False,
+                            raw: bool = False, fields: Optional[List[str]] = None) -> Dict:
+    """List transactions with pagination and optional filters.
+
+    When `after` (a decoded cursor) is given, keyset pagination on (created_at, _id)
+    is used instead of skip, so deep pages cost the same as the first one.
+    With `raw`, documents are returned exactly as Mongo decoded them.
+    With `fields`, only those fields (plus _id and created_at) are read.
+    """
     global db
     if db is None:
         await connect_to_mongodb()
@@ -119,15 +663,31 @@ async def list_transactions(page: int = 1, limit: int = 10, filters: Dict = None
     if filters is None:
         filters = {}
     
+    query = filters
     skip = (page - 1) * limit
+    if after is not None:
+        created_at, last_id = after
+        query = {"$and": [filters, {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]}]}
+        skip = 0
     
     try:
         # Get paginated transactions
-        cursor = db.transactions.find(filters).sort("created_at", -1).skip(skip).limit(limit)
-        transactions = await cursor.to_list(length=limit)
+        cursor = db.transactions.find(query, _projection(fields)).sort([("created_at", -1), ("_id", -1)]).skip(skip).limit(limit)
+        with dependency("mongo", "find"):
+            transactions = await cursor.to_list(length=limit)
+        
+        # A full page means there may be more results after the last document
+        next_cursor = None
+        if len(transactions) == limit and transactions[-1].get("created_at"):
+            last = transactions[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
         
         # Convert ObjectId to string for each transaction
-        for transaction in transactions:
+        # (raw callers build their response dicts directly and skip this pass)
+        for transaction in transactions if not raw else []:
             transaction["_id"] = str(transaction["_id"])
            
             # Convert is_nighttime from int to string - FIX FOR VALIDATION ERROR
@@ -135,7 +695,9 @@ async def list_transactions(page: int = 1, limit: int = 10, filters: Dict = None
                 transaction["is_nighttime"] = str(transaction["is_nighttime"])        
         
         # Get total count for pagination
-        total = await db.transactions.count_documents(filters)
+        total, total_exact = None, None
+        if include_total:
+            total, total_exact = await _count_transactions(filters, exact_total)
         
         return {
             "success": True,
@@ -143,11 +705,13 @@ async def list_transactions(page: int = 1, limit: int = 10, filters: Dict = None
             "page": page,
             "limit": limit,
             "total": total,
-            "pages": (total + limit - 1) // limit  # Ceiling division
+            "pages": (total + limit - 1) // limit if total is not None else None,  # Ceiling division
+            "total_exact": total_exact,
+            "next_cursor": next_cursor
         }
     except Exception as e:
-        logging.error(f"Error listing transactions: {e}")
+        logger.error("Error listing transactions: %s", e)
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
@@ -1,16 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
 import logging
+import time
+import uuid
 from datetime import datetime
-from app.db.transactions import connect_to_mongodb, close_mongodb_connection
-from app.routers import transaction_routes
+from app.db.transactions import connect_to_mongodb, close_mongodb_connection, write_buffer
+from app.routers import transaction_routes, analytics_routes
+from app.services.fraud_service import fraud_service
+from app.services.notification_service import notification_service
+from app.services.notification_worker import notification_worker
+from app.services.scoring_worker import scoring_worker
+from app.services.cache import transaction_cache, notification_status_cache
+from app.services import metrics
+from app.services.idempotency import idempotency_index
+from app.services.event_hub import event_hub
+from app.services.admission import create_admission, fraud_bulkhead
+from app.services.velocity import velocity_engine
+from app.config.config import settings
+from app.config.logging_config import setup_logging, stop_logging, correlation_id, logging_stats
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
+
+# Configure logging (queued, written by a background thread)
+setup_logging()
 
 # Create FastAPI application
 app = FastAPI(
@@ -30,20 +44,66 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+@app.middleware("http")
+async def assign_correlation_id(request: Request, call_next):
+    """Tag log records of this request with its X-Request-ID (generated if absent)"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = correlation_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        correlation_id.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency and add a Server-Timing header with per-stage timings"""
+    started = time.perf_counter()
+    timings = metrics.start_request_timing()
+    metrics.http_requests_in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        metrics.http_requests_in_flight.dec()
+        elapsed = time.perf_counter() - started
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.http_request_duration.observe(elapsed, method=request.method, route=route, status=status)
+    
+    if settings.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
+    return response
+
 # Include routers
 app.include_router(transaction_routes.router)
+app.include_router(analytics_routes.router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Connect to database when app starts"""
+    """Connect to database and open downstream HTTP pools when app starts"""
     await connect_to_mongodb()
-    logging.info("Transaction Service started")
+    await fraud_service.start()
+    await notification_service.start()
+    if settings.NOTIFICATION_OUTBOX_ENABLED:
+        await notification_worker.start()
+    if settings.ASYNC_SCORING_ENABLED:
+        await scoring_worker.start()
+    await event_hub.start()
+    logger.info("Transaction Service started")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connection when app shuts down"""
+    """Close database connection and downstream HTTP pools when app shuts down"""
+    await event_hub.stop()
+    await scoring_worker.stop()
+    await notification_worker.stop()
+    await fraud_service.close()
+    await notification_service.close()
     await close_mongodb_connection()
-    logging.info("Transaction Service shutdown")
+    logger.info("Transaction Service shutdown")
+    stop_logging()
 
 @app.get("/")
 async def root():
@@ -57,6 +117,10 @@ async def root():
             "create_transaction": "/transactions/create",
             "get_transaction": "/transactions/{id}",
             "list_transactions": "/transactions/",
+            "transaction_events": "/transactions/stream",
+            "analytics_rollups": "/analytics/rollups",
+            "stats": "/stats",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -66,6 +130,36 @@ async def health_check():
     """Health check endpoint for monitoring"""
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def service_stats():
+    """Runtime statistics used to size connection pools"""
+    return {
+        "http_pools": {
+            "fraud": fraud_service.client.stats(),
+            "notification": notification_service.client.stats()
+        },
+        "fraud": fraud_service.stats(),
+        "notification_outbox": notification_worker.stats(),
+        "async_scoring": scoring_worker.stats(),
+        "group_commit": {"mode": settings.PERSISTENCE_MODE, **write_buffer.stats()},
+        "idempotency": idempotency_index.stats(),
+        "event_feed": event_hub.stats(),
+        "velocity": velocity_engine.stats(),
+        "logging": logging_stats(),
+        "admission": {
+            "create": create_admission.stats(),
+            "fraud_bulkhead": fraud_bulkhead.stats()
+        },
+        "cache": {
+            "transactions": transaction_cache.stats(),
+            "notification_status": notification_status_cache.stats()
+        }
+    }
+
 if __name__ == "__main__":
-    from app.config.config import settings
     uvicorn.run("app.main:app", host="0.0.0.0", port=settings.PORT, reload=True)
\ No newline at end of file
@@ -18,6 +18,7 @@ class TransactionRequest(BaseModel):
     job: str = Field(..., description="Job of the cardholder")
     state: str = Field(..., description="State where the transaction occurred")
     transaction_number: str = Field(..., description="Unique identifier for the transaction")
+    callback_url: Optional[str] = Field(None, description="URL the final result is POSTed to when scored asynchronously")
 
     model_config = {  # Updated to use model_config instead of Config class
         "json_schema_extra": {  # Changed from schema_extra to json_schema_extra
@@ -87,5 +88,84 @@ class PaginatedTransactions(BaseModel):
     transactions: List[TransactionDetailResponse] = Field(..., description="List of transactions")
     page: int = Field(..., description="Current page number")
     limit: int = Field(..., description="Number of items per page")
-    total: int = Field(..., description="Total number of transactions")
-    pages: int = Field(..., description="Total number of pages")
\ No newline at end of file
+    total: Optional[int] = Field(None, description="Total number of transactions, omitted when include_total=false")
+    pages: Optional[int] = Field(None, description="Total number of pages, omitted when include_total=false")
+    total_exact: Optional[bool] = Field(None, description="Whether total is an exact count or an approximation")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there may be one")
+
+# Subset of TransactionDetailResponse returned when `fields=` is given
+class TransactionPartialResponse(BaseModel):
+    transaction_number: Optional[str] = Field(None, description="Unique identifier for the transaction")
+    status: Optional[TransactionStatus] = Field(None, description="Status of the transaction")
+    created_at: Optional[datetime] = Field(None, description="When the transaction was created")
+    is_fraud: Optional[bool] = Field(None, description="Whether the transaction is fraudulent")
+    fraud_probability: Optional[float] = Field(None, description="Probability of fraud")
+    notification_sent: Optional[bool] = Field(None, description="Whether a notification was sent")
+    category: Optional[str] = Field(None, description="Merchant category")
+    transaction_amount: Optional[float] = Field(None, description="Amount of the transaction")
+    transaction_location: Optional[str] = Field(None, description="Location of the transaction")
+    job: Optional[str] = Field(None, description="Job of the cardholder")
+    state: Optional[str] = Field(None, description="State where the transaction occurred")
+    is_nighttime: Optional[str] = Field(None, description="1 if the transaction is made at night, 0 otherwise")
+
+
+class PaginatedPartialTransactions(PaginatedTransactions):
+    transactions: List[TransactionPartialResponse] = Field(..., description="List of partial transactions")
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the transaction in the request")
+    transaction_number: Optional[str] = Field(None, description="Unique identifier for the transaction")
+    success: bool = Field(..., description="Whether the transaction was processed")
+    error: Optional[str] = Field(None, description="Why the transaction failed, if it did")
+    transaction: Optional[TransactionCreateResponse] = Field(None, description="Processed transaction")
+
+
+class BatchTransactionResponse(BaseModel):
+    success: bool = Field(..., description="Whether the batch was processed")
+    total: int = Field(..., description="Number of transactions in the batch")
+    succeeded: int = Field(..., description="Number of transactions processed successfully")
+    failed: int = Field(..., description="Number of transactions that failed")
+    results: List[BatchItemResult] = Field(..., description="Per-transaction results in request order")
+
+
+class TransactionLookupRequest(BaseModel):
+    ids: List[str] = Field(..., description="Transaction ids or transaction numbers to resolve")
+
+
+class TransactionLookupDetail(TransactionDetailResponse):
+    notification_status: Optional[Dict[str, Any]] = Field(None, description="Fraud notification, if one was sent")
+
+
+class TransactionLookupItem(BaseModel):
+    id: str = Field(..., description="Requested id or transaction number")
+    found: bool = Field(..., description="Whether a transaction matched")
+    transaction: Optional[TransactionLookupDetail] = Field(None, description="Matched transaction")
+
+
+class TransactionLookupResponse(BaseModel):
+    success: bool = Field(..., description="Whether the lookup was processed")
+    found: int = Field(..., description="Number of ids that matched a transaction")
+    missing: int = Field(..., description="Number of ids that did not match")
+    results: List[TransactionLookupItem] = Field(..., description="Per-id results in request order")
+
+
+class RollupBucket(BaseModel):
+    bucket: datetime = Field(..., description="Start of the time bucket")
+    granularity: str = Field(..., description="Bucket size: minute, hour or day")
+    dimension: str = Field(..., description="Grouping dimension: all, category or state")
+    value: str = Field(..., description="Dimension value, 'all' for the overall rollup")
+    count: int = Field(0, description="Number of transactions")
+    amount: float = Field(0.0, description="Total transaction amount")
+    fraud_count: int = Field(0, description="Number of transactions predicted as fraud")
+    fraud_amount: float = Field(0.0, description="Total amount of transactions predicted as fraud")
+    fraud_rate: float = Field(0.0, description="fraud_count / count")
+    statuses: Dict[str, int] = Field(default_factory=dict, description="Transaction counts by final status")
+
+
+class AnalyticsResponse(BaseModel):
+    success: bool = Field(..., description="Whether the request was successful")
+    granularity: str = Field(..., description="Bucket size: minute, hour or day")
+    dimension: str = Field(..., description="Grouping dimension: all, category or state")
+    start: datetime = Field(..., description="Start of the requested range")
+    end: datetime = Field(..., description="End of the requested range (exclusive)")
+    buckets: List[RollupBucket] = Field(..., description="Rollup buckets ordered by time")
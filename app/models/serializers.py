@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Optional
+
+# Fields of TransactionDetailResponse, in response order
+TRANSACTION_DETAIL_FIELDS = [
+    "transaction_number", "status", "created_at", "is_fraud", "fraud_probability", "notification_sent",
+    "category", "transaction_amount", "transaction_location", "job", "state", "is_nighttime"
+]
+
+
+# Parse a `fields=` query value into the list of fields to return (None means all)
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in TRANSACTION_DETAIL_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Must be among: {', '.join(TRANSACTION_DETAIL_FIELDS)}"
+        )
+    return requested or None
+
+
+# Build a TransactionDetailResponse-shaped dict straight from a Mongo document,
+# skipping Pydantic validation for trusted data we wrote ourselves.
+# With `fields`, only those fields present on the document are included.
+def transaction_detail_dict(transaction: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    status = transaction.get("status")
+    is_nighttime = transaction.get("is_nighttime")
+    detail = {
+        "transaction_number": transaction.get("transaction_number"),
+        "status": getattr(status, "value", status),
+        "created_at": transaction.get("created_at"),
+        "is_fraud": transaction.get("is_fraud"),
+        "fraud_probability": transaction.get("fraud_probability"),
+        "notification_sent": transaction.get("notification_sent"),
+        "category": transaction.get("category"),
+        "transaction_amount": transaction.get("transaction_amount"),
+        "transaction_location": transaction.get("transaction_location"),
+        "job": transaction.get("job"),
+        "state": transaction.get("state"),
+        "is_nighttime": str(is_nighttime) if is_nighttime is not None else None
+    }
+    if fields is None:
+        return detail
+    return {name: detail[name] for name in fields if name in transaction}
+
+
+# Build a PaginatedTransactions-shaped dict from a list_transactions result
+def paginated_dict(result: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    return {
+        "success": result["success"],
+        "transactions": [transaction_detail_dict(transaction, fields) for transaction in result["transactions"]],
+        "page": result["page"],
+        "limit": result["limit"],
+        "total": result.get("total"),
+        "pages": result.get("pages"),
+        "total_exact": result.get("total_exact"),
+        "next_cursor": result.get("next_cursor")
+    }
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from typing import Optional
+
+from app.models.schemas import AnalyticsResponse
+from app.controllers.analytics_controller import get_rollups
+
+# Create Router
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"]
+)
+
+@router.get("/rollups", response_model=AnalyticsResponse)
+async def transaction_rollups(
+    granularity: str = Query("hour", description="Bucket size: minute, hour or day"),
+    dimension: str = Query("all", description="Group by: all, category or state"),
+    start: Optional[datetime] = Query(None, description="Start of the range, defaults to 24 buckets before end"),
+    end: Optional[datetime] = Query(None, description="End of the range (exclusive), defaults to now"),
+    value: Optional[str] = Query(None, description="Only return this category or state")
+):
+    """
+    Transaction counts, amounts and fraud rates per time bucket, served from precomputed rollups
+    """
+    result = await get_rollups(granularity, dimension, start, end, value)
+    
+    if not result["success"]:
+        raise HTTPException(status_code=result.get("status_code", 500), detail=result["error"])
+    
+    return result
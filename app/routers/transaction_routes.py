@@ -1,17 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query, Path, Depends
+from fastapi import APIRouter, HTTPException, Query, Path, Header, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from datetime import datetime
 from typing import Optional, List
 
+from app.config.config import settings
+from app.models.serializers import transaction_detail_dict, paginated_dict, parse_fields
+from app.services.event_hub import event_hub
+from app.services.admission import AdmissionRejected, create_admission, transaction_priority
+from app.services.callbacks import check_callback_url
+from app.services.scoring_worker import scoring_worker
+
 from app.models.schemas import (
     TransactionRequest,
     TransactionCreateResponse,
     TransactionDetailResponse,
     PaginatedTransactions,
+    PaginatedPartialTransactions,
+    TransactionPartialResponse,
+    BatchTransactionResponse,
+    TransactionLookupRequest,
+    TransactionLookupResponse,
     TransactionStatus
 )
 from app.controllers.transaction_controller import (
     process_transaction,
+    process_transaction_batch,
+    lookup_transactions,
     get_transaction,
-    get_transactions
+    get_transactions,
+    export_transactions,
+    stream_transaction_events
 )
 
 # Create Router
@@ -20,35 +38,203 @@ router = APIRouter(
     tags=["Transactions"]
 )
 
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. transaction_number,status,transaction_amount"
+
+
+# Validate a fields= query value, rejecting unknown field names
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Validate a callback URL against the allowed hosts and the addresses it resolves to
+async def _validate_callback_url(url: str) -> None:
+    error = await check_callback_url(url)
+    if error is not None:
+        raise HTTPException(status_code=400, detail=error)
+
 @router.post("/create", response_model=TransactionCreateResponse)
-async def create_transaction(request: TransactionRequest):
+async def create_transaction(
+    request: TransactionRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None, description="'respond-async' stores the transaction and scores it in the background")
+):
     """
-    Process a new credit card transaction, check for fraud, and send notification if needed
+    Process a new credit card transaction, check for fraud, and send notification if needed.
+    Retries with the same transaction_number or Idempotency-Key return the stored result.
+    With `Prefer: respond-async` (when enabled) the transaction is stored as pending and
+    202 Accepted is returned; poll GET /transactions/{id} or pass a callback_url for the result.
     """
-    result = await process_transaction(request.dict())
+    transaction_data = request.dict(exclude_none=True)
+    async_scoring = settings.ASYNC_SCORING_ENABLED and "respond-async" in (prefer or "").lower()
+    if "callback_url" in transaction_data:
+        await _validate_callback_url(transaction_data["callback_url"])
+    
+    try:
+        async with create_admission.admit(transaction_priority(transaction_data)):
+            result = await process_transaction(transaction_data, idempotency_key, async_scoring)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    if result.get("replayed"):
+        response.headers["Idempotent-Replayed"] = "true"
+    
+    if async_scoring:
+        scoring_worker.notify()
+        response.headers["Preference-Applied"] = "respond-async"
+        if result["transaction"]["status"] == TransactionStatus.PENDING:
+            response.status_code = 202
+            response.headers["Location"] = f"/transactions/{result['transaction']['transaction_number']}"
+    
     return result["transaction"]
 
+@router.post("/batch", response_model=BatchTransactionResponse)
+async def create_transactions_batch(requests: List[TransactionRequest]):
+    """
+    Process a batch of transactions with bulk writes, returning a result for each item
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one transaction")
+
+    if len(requests) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large. Maximum size is {settings.BATCH_MAX_SIZE} transactions"
+        )
+
+    # Batch items are scored inline, so callback_url does not apply to them
+    result = await process_transaction_batch([
+        request.dict(exclude_none=True, exclude={"callback_url"}) for request in requests
+    ])
+
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["error"])
+
+    return result
+
+@router.post("/lookup", response_model=TransactionLookupResponse)
+async def lookup_transactions_batch(request: TransactionLookupRequest):
+    """
+    Resolve many transaction ids or transaction numbers in one request
+    """
+    if not request.ids:
+        raise HTTPException(status_code=400, detail="Lookup must contain at least one id")
+    
+    if len(request.ids) > settings.LOOKUP_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lookup too large. Maximum is {settings.LOOKUP_MAX_IDS} ids"
+        )
+    
+    result = await lookup_transactions(request.ids)
+    
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["error"])
+    
+    return result
+
+@router.get("/export")
+async def export_transactions_stream(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by transaction status"),
+    created_from: Optional[datetime] = Query(None, description="Only transactions created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only transactions created before this time"),
+    batch_size: int = Query(settings.EXPORT_BATCH_SIZE, ge=1, le=10000, description="Documents fetched per cursor batch")
+):
+    """
+    Stream all matching transactions as NDJSON or CSV
+    """
+    if status and status not in [e.value for e in TransactionStatus]:
+        valid_statuses = ", ".join([e.value for e in TransactionStatus])
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid status. Must be one of: {valid_statuses}"
+        )
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"transactions.{format}"
+    return StreamingResponse(
+        export_transactions(format, status, created_from, created_to, batch_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/stream")
+async def transaction_event_stream(
+    request: Request,
+    status: Optional[str] = Query(None, description="Comma-separated statuses to receive, e.g. flagged"),
+    min_amount: Optional[float] = Query(None, ge=0, description="Only transactions of at least this amount"),
+    category: Optional[str] = Query(None, description="Only transactions in this merchant category"),
+    state: Optional[str] = Query(None, description="Only transactions in this state"),
+    queue_size: int = Query(settings.EVENT_FEED_QUEUE_SIZE, ge=1, le=settings.EVENT_FEED_QUEUE_SIZE,
+                            description="Events buffered for this subscriber before the overflow policy applies"),
+    overflow: str = Query(settings.EVENT_FEED_OVERFLOW_POLICY, pattern="^(drop_oldest|drop_newest|disconnect)$",
+                          description="What to do when the buffer is full: drop_oldest, drop_newest or disconnect")
+):
+    """
+    Server-Sent Events feed of transaction status changes
+    """
+    statuses = [value.strip() for value in status.split(",") if value.strip()] if status else None
+    valid = [e.value for e in TransactionStatus]
+    if statuses and any(value not in valid for value in statuses):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {', '.join(valid)}"
+        )
+    
+    subscription = event_hub.subscribe(
+        statuses=statuses, min_amount=min_amount, category=category, state=state,
+        queue_size=queue_size, overflow=overflow
+    )
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many event feed subscribers", headers={"Retry-After": "5"})
+    
+    return StreamingResponse(
+        stream_transaction_events(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{id}", response_model=TransactionDetailResponse)
-async def get_transaction_by_id(id: str = Path(..., description="Transaction ID")):
+async def get_transaction_by_id(
+    id: str = Path(..., description="Transaction ID"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """
     Get details of a specific transaction by ID
     """
-    result = await get_transaction(id)
+    requested_fields = _parse_fields(fields)
+    result = await get_transaction(id, requested_fields)
     
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["error"])
     
-    return result["transaction"]
+    # Fast path: serialize the trusted document directly, skipping response_model validation
+    if settings.FAST_SERIALIZATION_ENABLED:
+        return ORJSONResponse(transaction_detail_dict(result["transaction"], requested_fields))
+    
+    # Sparse fieldset: only the requested fields are returned
+    if requested_fields:
+        partial = TransactionPartialResponse(**transaction_detail_dict(result["transaction"], requested_fields))
+        return JSONResponse(partial.model_dump(mode="json", exclude_unset=True))
+    
+    # Stored documents keep is_nighttime as the submitted int; the response declares a string
+    return transaction_detail_dict(result["transaction"])
 
 @router.get("/", response_model=PaginatedTransactions)
 async def list_transactions(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
-    status: Optional[str] = Query(None, description="Filter by transaction status")
+    status: Optional[str] = Query(None, description="Filter by transaction status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Whether to compute the total number of matching transactions"),
+    exact_total: bool = Query(False, description="Count matching documents exactly instead of using maintained counters"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     List all transactions with pagination and optional filtering
@@ -59,10 +245,29 @@ async def list_transactions(
             status_code=400, 
             detail=f"Invalid status. Must be one of: {valid_statuses}"
         )
+    
+    if not cursor and (page - 1) * limit > settings.PAGINATION_MAX_OFFSET:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Page offset exceeds {settings.PAGINATION_MAX_OFFSET}. Use cursor pagination for deep pages"
+        )
         
-    result = await get_transactions(page, limit, status)
+    requested_fields = _parse_fields(fields)
+    fast = settings.FAST_SERIALIZATION_ENABLED
+    result = await get_transactions(
+        page, limit, status, cursor, include_total, exact_total, raw=fast, fields=requested_fields
+    )
     
     if not result["success"]:
-        raise HTTPException(status_code=500, detail=result["error"])
+        raise HTTPException(status_code=result.get("status_code", 500), detail=result["error"])
+    
+    # Fast path: build the page straight from Mongo documents and encode with orjson
+    if fast:
+        return ORJSONResponse(paginated_dict(result, requested_fields))
+    
+    # Sparse fieldset: only the requested fields are returned for each transaction
+    if requested_fields:
+        partial = PaginatedPartialTransactions(**paginated_dict(result, requested_fields))
+        return JSONResponse(partial.model_dump(mode="json", exclude_unset=True))
     
     return result
\ No newline at end of file
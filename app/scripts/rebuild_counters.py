@@ -0,0 +1,29 @@
+"""Rebuild the per-status transaction counters used for list totals.
+
+    python -m app.scripts.rebuild_counters
+
+The counters are seeded on first start and maintained incrementally by the write
+path; run this to repair drift, ideally while writers are quiet.
+"""
+import asyncio
+import logging
+
+from app.db.counters import rebuild_status_counts
+from app.db.transactions import close_mongodb_connection, get_database
+
+
+async def _run() -> None:
+    try:
+        counts = await rebuild_status_counts(await get_database())
+        print(f"Rebuilt status counters: {counts}")
+    finally:
+        await close_mongodb_connection()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
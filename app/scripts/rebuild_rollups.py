@@ -0,0 +1,38 @@
+"""Backfill or rebuild the analytics rollups from the transactions collection.
+
+    python -m app.scripts.rebuild_rollups                      # everything
+    python -m app.scripts.rebuild_rollups --since 2024-01-01   # from that day on
+
+Rollups are normally maintained incrementally by the create path; run this
+after enabling them on an existing database or to repair drift.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+
+from app.db.analytics import rebuild_rollups
+from app.db.transactions import close_mongodb_connection
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        result = await rebuild_rollups(args.since, args.batch_size)
+        print(f"Rebuilt {result['buckets']} rollup buckets from {result['transactions']} transactions")
+    finally:
+        await close_mongodb_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild transaction analytics rollups")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None,
+                        help="Only rebuild buckets from this date on (ISO format)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Re-score stored transactions through the fraud service and write the new results back.
+
+    python -m app.scripts.rescore                                  # transactions marked needs_rescore
+    python -m app.scripts.rescore --select pending                 # left pending by failed checks
+    python -m app.scripts.rescore --select all --since 2024-01-01 --job model-v2 --rate 50
+    python -m app.scripts.rescore --select all --dry-run --output report.json
+
+Transactions are read in _id order in batches and scored with bounded concurrency,
+at most --rate checks per second. Each batch is written with one bulk_write and the
+job's checkpoint is saved after it, so rerunning the same --job after a crash
+continues where it stopped (--restart starts over). A run that finishes clears
+its checkpoint, so the next run of the job starts from the beginning. Only
+successful, non-degraded results are written; failed checks keep needs_rescore
+for a later run. A dry run writes nothing and reports how the decisions would
+change.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config.config import settings
+from app.config.logging_config import setup_logging
+from app.db.outbox import enqueue_notifications_bulk
+from app.db.rescore import (
+    RESCORE_SELECTIONS,
+    apply_rescore_updates,
+    delete_checkpoint,
+    fetch_rescore_batch,
+    load_checkpoint,
+    rescore_filters,
+    save_checkpoint
+)
+from app.db.transactions import close_mongodb_connection
+from app.models.schemas import TransactionStatus
+from app.services.fraud_service import fraud_service
+
+logger = logging.getLogger(__name__)
+
+
+# Token bucket limiting how many fraud checks are started per second
+class TokenBucket:
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+# Fields written back for a successful fraud result
+def _rescore_update(fraud_result: Dict[str, Any]) -> Dict[str, Any]:
+    is_fraud = fraud_result.get("is_fraud", False)
+    return {
+        "fraud_check_result": fraud_result,
+        "is_fraud": is_fraud,
+        "fraud_probability": fraud_result.get("fraud_probability", 0.0),
+        "status": TransactionStatus.FLAGGED if is_fraud else TransactionStatus.APPROVED
+    }
+
+
+# Running totals of a job, stored in its checkpoint and printed as the report
+class RescoreReport:
+
+    def __init__(self, totals: Optional[Dict[str, Any]] = None, max_samples: int = 20):
+        totals = totals or {}
+        self.scored = totals.get("scored", 0)
+        self.failed = totals.get("failed", 0)
+        self.written = totals.get("written", 0)
+        self.skipped = totals.get("skipped", 0)
+        self.changed = totals.get("changed", 0)
+        self.transitions = Counter(totals.get("transitions", {}))
+        self.probability_delta_sum = totals.get("probability_delta_sum", 0.0)
+        self.samples: List[Dict[str, Any]] = totals.get("samples", [])
+        self.max_samples = max_samples
+
+    def record(self, transaction: Dict[str, Any], update: Dict[str, Any]) -> None:
+        self.scored += 1
+        old_status = _status_value(transaction.get("status"))
+        new_status = _status_value(update["status"])
+        self.transitions[f"{old_status}->{new_status}"] += 1
+        self.probability_delta_sum += update["fraud_probability"] - (transaction.get("fraud_probability") or 0.0)
+        if old_status != new_status:
+            self.changed += 1
+            if len(self.samples) < self.max_samples:
+                self.samples.append({
+                    "transaction_number": transaction.get("transaction_number"),
+                    "old_status": old_status,
+                    "new_status": new_status,
+                    "old_probability": transaction.get("fraud_probability"),
+                    "new_probability": update["fraud_probability"]
+                })
+
+    def totals(self) -> Dict[str, Any]:
+        return {
+            "scored": self.scored,
+            "failed": self.failed,
+            "written": self.written,
+            "skipped": self.skipped,
+            "changed": self.changed,
+            "transitions": dict(self.transitions),
+            "probability_delta_sum": self.probability_delta_sum,
+            "samples": self.samples
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.totals(),
+            "avg_probability_delta": self.probability_delta_sum / self.scored if self.scored else 0.0
+        }
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    filters = rescore_filters(args.select, args.since, args.until, args.min_age)
+
+    # Resume from the job's checkpoint unless starting over; dry runs never checkpoint
+    checkpoint = None
+    if not args.dry_run and not args.restart:
+        checkpoint = await load_checkpoint(args.job)
+    if checkpoint is not None:
+        if checkpoint.get("select") != args.select:
+            raise SystemExit(f"Job {args.job} was started with --select {checkpoint.get('select')}, "
+                             f"use the same selection or --restart")
+        logger.info("Resuming job %s after transaction %s", args.job, checkpoint.get("last_id"))
+
+    after_id = checkpoint.get("last_id") if checkpoint else None
+    report = RescoreReport(checkpoint.get("totals") if checkpoint else None)
+    limiter = TokenBucket(args.rate, max(1, args.concurrency))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def score(transaction: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            await limiter.acquire()
+            return await fraud_service.check_transaction(transaction)
+
+    processed = 0
+    started_at = checkpoint.get("started_at") if checkpoint else datetime.now()
+    while args.limit is None or processed < args.limit:
+        batch_size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - processed)
+        batch = await fetch_rescore_batch(filters, after_id, batch_size)
+        if not batch:
+            break
+
+        results = await asyncio.gather(*(score(transaction) for transaction in batch))
+        changes = []
+        for transaction, fraud_result in zip(batch, results):
+            if not fraud_result.get("success", False) or fraud_result.get("degraded", False):
+                report.failed += 1
+                continue
+            update = _rescore_update(fraud_result)
+            report.record(transaction, update)
+            changes.append((transaction, update, fraud_result))
+
+        if not args.dry_run:
+            # Newly flagged transactions get their notification through the outbox,
+            # written before the status like the create path does (the worker owns
+            # notification_sent, so the status write leaves it alone)
+            if args.notify and settings.NOTIFICATION_OUTBOX_ENABLED:
+                flagged = [
+                    (transaction, fraud_result) for transaction, update, fraud_result in changes
+                    if update["status"] == TransactionStatus.FLAGGED
+                    and _status_value(transaction.get("status")) != TransactionStatus.FLAGGED.value
+                ]
+                await enqueue_notifications_bulk([
+                    (str(transaction["_id"]), transaction, fraud_result) for transaction, fraud_result in flagged
+                ])
+
+            written = await apply_rescore_updates([(transaction, update) for transaction, update, _ in changes])
+            report.written += written
+            report.skipped += len(changes) - written
+
+        after_id = str(batch[-1]["_id"])
+        processed += len(batch)
+        if not args.dry_run:
+            await save_checkpoint(args.job, {
+                "select": args.select,
+                "last_id": after_id,
+                "started_at": started_at,
+                "totals": report.totals()
+            })
+        logger.info("Re-scored %s transactions (%s failed, %s decisions changed)",
+                    report.scored + report.failed, report.failed, report.changed)
+
+    # A finished job clears its checkpoint so the next run of the same job starts over;
+    # only a run stopped early (crash or --limit) leaves one to resume from
+    finished = args.limit is None or processed < args.limit
+    if not args.dry_run and finished:
+        await delete_checkpoint(args.job)
+    return report.summary()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    await fraud_service.start()
+    try:
+        summary = await _run(args)
+    finally:
+        await fraud_service.close()
+        await close_mongodb_connection()
+
+    mode = "Dry run" if args.dry_run else "Re-scored"
+    print(f"{mode}: {summary['scored']} scored, {summary['failed']} failed, "
+          f"{summary['changed']} decisions changed, {summary['written']} written")
+    for transition, count in sorted(summary["transitions"].items()):
+        print(f"  {transition}: {count}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score stored transactions through the fraud service")
+    parser.add_argument("--select", choices=RESCORE_SELECTIONS, default="needs_rescore",
+                        help="Transactions marked needs_rescore, left pending, or all of them")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None,
+                        help="Only transactions created from this date on (ISO format)")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None,
+                        help="Only transactions created before this date (ISO format)")
+    parser.add_argument("--min-age", type=float, default=300.0,
+                        help="Skip transactions younger than this many seconds (still being processed)")
+    parser.add_argument("--job", default=None, help="Checkpoint name, defaults to rescore-<select>")
+    parser.add_argument("--restart", action="store_true", help="Ignore the job's checkpoint and start over")
+    parser.add_argument("--dry-run", action="store_true", help="Score without writing and report the changes")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=20.0, help="Maximum fraud checks per second")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many transactions")
+    parser.add_argument("--notify", action="store_true",
+                        help="Queue fraud notifications for transactions that become flagged")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the report")
+    args = parser.parse_args()
+    args.job = args.job or f"rescore-{args.select}"
+
+    setup_logging()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
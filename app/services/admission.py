@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config.config import settings
+from app.services.metrics import admission_in_flight, admission_queue_depth, admission_rejections
+
+# Waiter priorities, lower is admitted first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+# Raised when a request is shed instead of admitted
+class AdmissionRejected(Exception):
+
+    def __init__(self, name: str, reason: str, status_code: int, retry_after: int):
+        super().__init__(f"{name} overloaded: {reason}")
+        self.name = name
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# Bounded concurrency with a bounded, deadline-limited priority wait queue.
+# Used in front of the create path and as a bulkhead around downstream dependencies.
+class AdmissionController:
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 enabled: bool = True):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.enabled = enabled
+        self._active = 0
+        self._waiters: List[tuple] = []  # (priority, sequence, future)
+        self._queued = 0
+        self._sequence = itertools.count()
+
+        # Average time a slot is held, used to estimate Retry-After
+        self._hold_time = 0.0
+
+        # Admission counters
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.peak_queue = 0
+
+    # Hold a slot for the duration of the block, waiting in the queue if all slots are busy
+    @asynccontextmanager
+    async def admit(self, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._hold_time = elapsed if not self._hold_time else 0.9 * self._hold_time + 0.1 * elapsed
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self.max_concurrency and not self._queued:
+            self._take()
+            return
+
+        # Shed immediately rather than queue without bound
+        if self._queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            admission_rejections.inc(controller=self.name, reason="queue_full")
+            raise AdmissionRejected(self.name, "queue full", 429, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._queued += 1
+        self.queued_total += 1
+        self.peak_queue = max(self.peak_queue, self._queued)
+        admission_queue_depth.set(self._queued, controller=self.name)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self.rejected_timeout += 1
+            admission_rejections.inc(controller=self.name, reason="queue_timeout")
+            raise AdmissionRejected(self.name, "queue timeout", 503, self.retry_after())
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+    # Leave the queue after a timeout or cancellation
+    def _abandon(self, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # Handed a slot just as the wait ended, pass it on
+            self._release()
+            return
+        future.cancel()
+        self._queued -= 1
+        admission_queue_depth.set(self._queued, controller=self.name)
+
+    def _take(self) -> None:
+        self._active += 1
+        self.admitted_total += 1
+        admission_in_flight.set(self._active, controller=self.name)
+
+    # Free a slot, handing it straight to the highest priority live waiter
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._queued -= 1
+            admission_queue_depth.set(self._queued, controller=self.name)
+            self._take()
+            future.set_result(None)
+            return
+        admission_in_flight.set(self._active, controller=self.name)
+
+    # Seconds a rejected client should wait: roughly the time to drain the current queue
+    def retry_after(self) -> int:
+        hold_time = self._hold_time or 1.0
+        estimate = hold_time * (self._queued + 1) / max(1, self.max_concurrency)
+        return int(min(30, max(1, math.ceil(estimate))))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self._active,
+            "queued": self._queued,
+            "peak_queue": self.peak_queue,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_hold_seconds": self._hold_time
+        }
+
+
+# Priority for a create request: large transactions jump the queue when configured
+def transaction_priority(transaction_data: Dict[str, Any]) -> int:
+    threshold: Optional[float] = settings.ADMISSION_PRIORITY_AMOUNT or None
+    if threshold is not None and (transaction_data.get("transaction_amount") or 0.0) >= threshold:
+        return PRIORITY_HIGH
+    return PRIORITY_NORMAL
+
+
+create_admission = AdmissionController(
+    "create",
+    settings.ADMISSION_MAX_CONCURRENCY,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    enabled=settings.ADMISSION_ENABLED
+)
+fraud_bulkhead = AdmissionController(
+    "fraud",
+    settings.FRAUD_BULKHEAD_MAX_CONCURRENCY,
+    settings.FRAUD_BULKHEAD_MAX_QUEUE,
+    settings.FRAUD_BULKHEAD_QUEUE_TIMEOUT_SECONDS,
+    enabled=settings.ADMISSION_ENABLED
+)
@@ -0,0 +1,206 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Bounded in-process cache with least-recently-used eviction and per-entry expiry
+class LRUTTLCache:
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Cache counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Redis-compatible cache backend, shared between service instances
+class RedisCache:
+
+    def __init__(self, url: str, ttl: float, prefix: str):
+        import redis.asyncio as redis  # Optional dependency
+        from bson import json_util
+
+        self._redis = redis.from_url(url)
+        self._json = json_util
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._redis.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.error("Redis cache get failed: %s", e)
+            return None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self._redis.set(
+                self.prefix + key,
+                self._json.dumps(value),
+                px=int((ttl if ttl is not None else self.ttl) * 1000)
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.error("Redis cache set failed: %s", e)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._redis.delete(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.error("Redis cache delete failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+# Create the configured backend, falling back to memory if Redis is unavailable
+def create_cache(name: str, max_size: int, ttl: float):
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCache(settings.REDIS_URL, ttl, f"transaction_service:{name}:")
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the 'redis' package is not installed, using memory for %s", name)
+    return LRUTTLCache(max_size, ttl)
+
+
+# Read-through cache of transaction documents, addressable by _id or transaction_number
+class TransactionCache:
+
+    # How many recent invalidations are remembered to guard read-through puts
+    INVALIDATION_WINDOW = 10000
+
+    def __init__(self):
+        self.enabled = settings.CACHE_ENABLED
+        self.backend = create_cache("transactions", settings.CACHE_MAX_SIZE, settings.CACHE_TTL_SECONDS)
+
+        # Invalidation sequence: the last sequence number per recently invalidated id, and
+        # the newest sequence number that has been forgotten from that window
+        self._sequence = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten = 0
+        self.stale_puts_skipped = 0
+
+    # Look up a transaction by _id or transaction_number
+    async def get(self, id: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        # Documents are stored once under their _id, transaction numbers are aliases to it
+        transaction = await self.backend.get(f"id:{id}") if len(id) == 24 else None
+        if transaction is None:
+            alias = await self.backend.get(f"num:{id}")
+            if alias is not None:
+                transaction = await self.backend.get(f"id:{alias}")
+
+        # Callers may add fields to the result, so never hand out the cached dict itself
+        return dict(transaction) if transaction is not None else None
+
+    # Token taken before reading from Mongo, handed back to put()
+    def read_token(self) -> int:
+        return self._sequence
+
+    # Cache a transaction read from Mongo. With the token taken before the read, the put is
+    # skipped if the transaction was invalidated meanwhile: the document read may predate
+    # that write and would otherwise be served stale for the full TTL.
+    async def put(self, transaction: Dict[str, Any], token: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+
+        id = str(transaction["_id"])
+        if token is not None:
+            invalidated_at = self._invalidated.get(id, self._forgotten)
+            if invalidated_at > token:
+                self.stale_puts_skipped += 1
+                return
+        await self.backend.set(f"id:{id}", dict(transaction))
+        if transaction.get("transaction_number"):
+            await self.backend.set(f"num:{transaction['transaction_number']}", id)
+
+    # Drop a transaction after it has been written
+    async def invalidate(self, id: str) -> None:
+        if not self.enabled:
+            return
+
+        self._sequence += 1
+        self._invalidated[id] = self._sequence
+        self._invalidated.move_to_end(id)
+        while len(self._invalidated) > self.INVALIDATION_WINDOW:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+        await self.backend.delete(f"id:{id}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "stale_puts_skipped": self.stale_puts_skipped, **self.backend.stats()}
+
+
+transaction_cache = TransactionCache()
+notification_status_cache = create_cache(
+    "notification_status",
+    settings.CACHE_MAX_SIZE,
+    settings.NOTIFICATION_STATUS_CACHE_TTL_SECONDS
+)
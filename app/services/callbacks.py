@@ -0,0 +1,53 @@
+import asyncio
+import ipaddress
+import socket
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.config.config import settings
+
+
+def _allowed_hosts() -> List[str]:
+    return [host.strip().lower() for host in settings.SCORING_CALLBACK_ALLOWED_HOSTS.split(",") if host.strip()]
+
+
+# Reason a callback URL may not be used without resolving it, None if it passes.
+# An empty allow-list disables callbacks entirely.
+def callback_url_error(url: str) -> Optional[str]:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "callback_url must be an absolute http(s) URL"
+    if parsed.hostname.lower() not in _allowed_hosts():
+        return f"callback_url host {parsed.hostname} is not allowed"
+    return None
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast
+                or ip.is_reserved or ip.is_unspecified)
+
+
+# Full check before a callback is accepted or sent: the allow-list, then every address
+# the host resolves to must be public (no loopback, RFC1918, link-local or metadata
+# addresses, even behind an allowed name)
+async def check_callback_url(url: str) -> Optional[str]:
+    error = callback_url_error(url)
+    if error is not None:
+        return error
+
+    parsed = urlparse(url)
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80),
+            type=socket.SOCK_STREAM
+        )
+    except socket.gaierror:
+        return f"callback_url host {parsed.hostname} does not resolve"
+
+    for *_, sockaddr in addresses:
+        if not _is_public(sockaddr[0]):
+            return f"callback_url host {parsed.hostname} resolves to a non-public address"
+    return None
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# What a subscription does when its queue is full
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+# Transaction fields copied into every event, when known
+EVENT_FIELDS = ["transaction_number", "is_fraud", "fraud_probability", "transaction_amount", "category", "state"]
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+# Build a status change event from whatever is known about the transaction
+def transaction_event(id: str, document: Dict[str, Any], previous_status=None) -> Dict[str, Any]:
+    event = {
+        "type": "status_changed",
+        "transaction_id": str(id),
+        "status": _status_value(document.get("status")),
+        "previous_status": _status_value(previous_status),
+        "timestamp": datetime.now().isoformat()
+    }
+    for field in EVENT_FIELDS:
+        if field in document:
+            event[field] = document[field]
+    return event
+
+
+# One subscriber's filters and bounded event queue
+class Subscription:
+
+    def __init__(self, statuses: Optional[Iterable[str]] = None, min_amount: Optional[float] = None,
+                 category: Optional[str] = None, state: Optional[str] = None,
+                 queue_size: int = 256, overflow: str = "drop_oldest"):
+        self.statuses: Optional[Set[str]] = set(statuses) if statuses else None
+        self.min_amount = min_amount
+        self.category = category
+        self.state = state
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.closed = False
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+
+        # Delivery counters
+        self.delivered = 0
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.statuses is not None and event.get("status") not in self.statuses:
+            return False
+        if self.min_amount is not None and (event.get("transaction_amount") or 0.0) < self.min_amount:
+            return False
+        if self.category is not None and event.get("category") != self.category:
+            return False
+        if self.state is not None and event.get("state") != self.state:
+            return False
+        return True
+
+    # Queue an event without blocking the publisher; full queues apply the overflow policy
+    def offer(self, event: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            if self.overflow == "disconnect":
+                self.close()
+                return
+            self._queue.popleft()
+        self._queue.append(event)
+        self._ready.set()
+
+    # Next queued event, or None after `timeout` seconds or once closed and drained
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        if not self._queue and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self._queue:
+            return None
+        self.delivered += 1
+        return self._queue.popleft()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+
+# In-process broadcast hub for transaction status changes. Events are published
+# by the write path (local source) or read from a Mongo change stream so every
+# instance sees changes made by the others (change_stream source).
+class EventHub:
+
+    def __init__(self):
+        self.source = settings.EVENT_FEED_SOURCE
+        self.max_subscribers = settings.EVENT_FEED_MAX_SUBSCRIBERS
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._sequence = 0
+
+        # Fan-out counters
+        self.published_total = 0
+        self.disconnected_total = 0
+
+    # Start the change stream reader if configured (called from the app startup event)
+    async def start(self) -> None:
+        if self.source == "change_stream" and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+            logger.info("Event feed reading from the Mongo change stream")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+    # Register a subscriber, None when the subscriber limit is reached
+    def subscribe(self, **filters: Any) -> Optional[Subscription]:
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(**filters)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self._subscribers.discard(subscription)
+
+    # Fan an event out to every matching subscriber; never blocks
+    def publish(self, event: Dict[str, Any]) -> None:
+        if not self._subscribers:
+            return
+        self._sequence += 1
+        event["sequence"] = self._sequence
+        self.published_total += 1
+        for subscription in list(self._subscribers):
+            if subscription.matches(event):
+                subscription.offer(event)
+                if subscription.closed:
+                    self.disconnected_total += 1
+                    self._subscribers.discard(subscription)
+
+    # Publish a status write made by this instance (no-op with the change stream source)
+    def publish_status_change(self, id: str, document: Dict[str, Any], previous_status=None) -> None:
+        if self.source != "local" or not self._subscribers:
+            return
+        self.publish(transaction_event(id, document, previous_status))
+
+    async def _watch(self) -> None:
+        # Imported here because the write path in app.db.transactions publishes to this hub
+        from app.db.transactions import get_database
+
+        pipeline = [{"$match": {"$or": [
+            {"operationType": "insert", "fullDocument.status": {"$ne": "pending"}},
+            {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}}
+        ]}}]
+        resume_token = None
+        while True:
+            try:
+                db = await get_database()
+                async with db.transactions.watch(pipeline, full_document="updateLookup",
+                                                 resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = change["_id"]
+                        document = change.get("fullDocument")
+                        if document and self._subscribers:
+                            self.publish(transaction_event(document["_id"], document))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event feed change stream failed, retrying: %s", e)
+                await asyncio.sleep(1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "subscribers": len(self._subscribers),
+            "published_total": self.published_total,
+            "disconnected_total": self.disconnected_total,
+            "dropped_total": sum(subscription.dropped for subscription in self._subscribers),
+            "queued": sum(len(subscription._queue) for subscription in self._subscribers)
+        }
+
+
+event_hub = EventHub()
@@ -1,7 +1,274 @@
-import httpx 
-import logging 
-from typing import Dict, Optional, Any 
+import asyncio
+import httpx
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Awaitable, Deque, Dict, List, Optional, Any, Tuple
 from app.config.config import settings
+from app.services.http_client import PooledHTTPClient
+from app.services.admission import AdmissionRejected, fraud_bulkhead
+from app.services.local_scorer import LocalFraudScorer
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+# Result returned when a fraud check could not be completed
+def _error_result(error_msg: str) -> Dict[str, Any]:
+    return {"success": False, "error": error_msg, "is_fraud": False, "fraud_probability": 0.0}
+
+
+# Map a raw /predict result to the shape used by the rest of the service
+def _parse_prediction(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "is_fraud": result.get("is_fraud", False),
+        "fraud_probability": result.get("fraud_probability", 0.0),
+        "label": result.get("label", "Unknown"),
+        "timestamp": result.get("timestamp", None)
+    }
+
+
+# Rolling sample of recent successful call latencies
+class LatencyTracker:
+
+    # Percentiles are read on every call, so the sorted copy is only refreshed every few samples
+    RESORT_EVERY = 20
+
+    def __init__(self, max_samples: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._sorted: List[float] = []
+        self._adds_since_sort = 0
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._adds_since_sort += 1
+
+    def ready(self) -> bool:
+        return len(self._samples) >= self.min_samples
+
+    def percentile(self, percentile: float) -> float:
+        if not self._samples:
+            return 0.0
+        if not self._sorted or self._adds_since_sort >= self.RESORT_EVERY:
+            self._sorted = sorted(self._samples)
+            self._adds_since_sort = 0
+        ordered = self._sorted
+        index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100.0 * len(ordered)) - 1))
+        return ordered[index]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        }
+
+
+# Circuit breaker with error-rate and slow-call-rate thresholds over a sliding time window
+class CircuitBreaker:
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window_seconds: float, min_requests: int, error_rate: float,
+                 slow_call_seconds: float, slow_call_rate: float, open_seconds: float,
+                 half_open_calls: int):
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = self.CLOSED
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()  # (time, failed, slow)
+        self._failures = 0
+        self._slow_calls = 0
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+
+        # Breaker counters
+        self.times_opened = 0
+        self.rejected = 0
+
+    # Whether a call may be sent now; half-open only lets a few trial calls through
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trials_in_flight = 0
+            self._trial_successes = 0
+            logger.info("Fraud API circuit breaker half-open")
+
+        if self.state == self.HALF_OPEN:
+            if self._trials_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._trials_in_flight += 1
+
+        return True
+
+    # Give back a half-open trial slot for a call that ended without an outcome (cancelled)
+    def release(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._trials_in_flight = max(0, self._trials_in_flight - 1)
+
+    # Record the outcome of a call
+    def record(self, success: bool, latency: float) -> None:
+        now = time.monotonic()
+        slow = latency > self.slow_call_seconds
+
+        if self.state == self.HALF_OPEN:
+            self._trials_in_flight = max(0, self._trials_in_flight - 1)
+            if not success or slow:
+                self._open(now)
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._close()
+            return
+
+        # Late results from calls sent before the breaker opened
+        if self.state == self.OPEN:
+            return
+
+        self._outcomes.append((now, not success, slow))
+        self._failures += not success
+        self._slow_calls += slow
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            _, failed, was_slow = self._outcomes.popleft()
+            self._failures -= failed
+            self._slow_calls -= was_slow
+
+        total = len(self._outcomes)
+        if total >= self.min_requests and (
+            self._failures / total >= self.error_rate or self._slow_calls / total >= self.slow_call_rate
+        ):
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = self.OPEN
+        self._opened_at = now
+        self.times_opened += 1
+        self._reset_window()
+        logger.error("Fraud API circuit breaker opened for %ss", self.open_seconds)
+
+    def _close(self) -> None:
+        self.state = self.CLOSED
+        self._reset_window()
+        logger.info("Fraud API circuit breaker closed")
+
+    def _reset_window(self) -> None:
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow_calls = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_requests": total,
+            "window_error_rate": self._failures / total if total else 0.0,
+            "window_slow_call_rate": self._slow_calls / total if total else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+
+# Queues concurrent fraud checks for a short window and sends them as one batch
+class FraudBatchCoalescer:
+
+    def __init__(self, send_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                 window_ms: float, max_batch_size: int):
+        self.send_batch = send_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        # Batch size metrics
+        self.batches_sent = 0
+        self.items_sent = 0
+        self.max_batch_seen = 0
+        self.size_buckets = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.size_buckets_overflow = 0
+
+    # Queue a request and wait for its own result
+    async def submit(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request_data, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    # Hand the queued requests to a background dispatch task
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        self.record_batch(len(batch))
+        try:
+            results = await self.send_batch([request_data for request_data, _ in batch])
+        except Exception as e:
+            results = [_error_result(f"Unexpected error in batched fraud check: {str(e)}") for _ in batch]
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def record_batch(self, size: int) -> None:
+        self.batches_sent += 1
+        self.items_sent += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.size_buckets[bucket] += 1
+                return
+        self.size_buckets_overflow += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Achieved batch sizes since startup"""
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "avg_batch_size": self.items_sent / self.batches_sent if self.batches_sent else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "queued": len(self._pending),
+            "batch_size_histogram": {
+                **{f"le_{bucket}": count for bucket, count in self.size_buckets.items()},
+                "overflow": self.size_buckets_overflow
+            }
+        }
 
 
 # Service to interact with the fraud detection API
@@ -10,69 +277,352 @@ class FraudService:
     # Initialize the service with API
     def __init__(self):
         self.api_url = settings.FRAUD_API_URL
-        # Increase timeout from 10.0 to 60.0 seconds
-        self.timeout = 60.0  # Changed from 10.0 seconds
-        logging.info(f"Fraud service initialized with URL: {self.api_url}, timeout: {self.timeout}s")
+        # Upper bound for the adaptive timeout
+        self.timeout = settings.FRAUD_TIMEOUT_SECONDS
+        self.client = PooledHTTPClient("fraud", self.timeout)
+
+        # Circuit breaker and latency tracking for adaptive timeouts and hedging
+        self.breaker_enabled = settings.FRAUD_BREAKER_ENABLED
+        self.breaker = CircuitBreaker(
+            settings.FRAUD_BREAKER_WINDOW_SECONDS,
+            settings.FRAUD_BREAKER_MIN_REQUESTS,
+            settings.FRAUD_BREAKER_ERROR_RATE,
+            settings.FRAUD_BREAKER_SLOW_CALL_SECONDS,
+            settings.FRAUD_BREAKER_SLOW_CALL_RATE,
+            settings.FRAUD_BREAKER_OPEN_SECONDS,
+            settings.FRAUD_BREAKER_HALF_OPEN_CALLS
+        )
+        self.latency = LatencyTracker(settings.FRAUD_LATENCY_WINDOW, settings.FRAUD_LATENCY_MIN_SAMPLES)
+        self.batch_latency = LatencyTracker(settings.FRAUD_LATENCY_WINDOW, settings.FRAUD_LATENCY_MIN_SAMPLES)
+        self.hedging_enabled = settings.FRAUD_HEDGING_ENABLED
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+        # In-process scorer that settles clear-cut transactions and covers remote outages
+        self.local_scorer = LocalFraudScorer(settings.LOCAL_SCORER_MODEL_PATH)
+        self.local_decisions = 0
+        self.local_fallbacks = 0
+
+        # Optional micro-batching of concurrent /predict calls
+        self.batching_enabled = settings.FRAUD_BATCHING_ENABLED
+        self.batch_fallback = settings.FRAUD_BATCH_FALLBACK
+        self.batch_fallbacks = 0
+        self.coalescer = FraudBatchCoalescer(
+            self._predict_batch,
+            settings.FRAUD_BATCH_WINDOW_MS,
+            settings.FRAUD_BATCH_MAX_SIZE
+        )
+        logger.info("Fraud service initialized with URL: %s, timeout: %ss", self.api_url, self.timeout)
+
+    # Open the shared connection pool
+    async def start(self):
+        await self.client.start()
+
+    # Close the shared connection pool
+    async def close(self):
+        await self.client.close()
+
+    # Map transaction data to the expected API format, with velocity features when computed
+    def _build_request(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "transaction_amount": transaction_data["transaction_amount"],
+            "is_nighttime": transaction_data["is_nighttime"],
+            "category": transaction_data["category"],
+            "transaction_location": transaction_data["transaction_location"],
+            "job": transaction_data["job"],
+            "state": transaction_data["state"],
+            "transaction_number": transaction_data["transaction_number"],
+            **(transaction_data.get("velocity_features") or {})
+        }
+
 
-    
-    # Check if a transaction is fraudulent 
+    # Check if a transaction is fraudulent
     async def check_transaction(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            # Map transaction data to the expected API format
-            request_data = {
-                "transaction_amount": transaction_data["transaction_amount"],
-                "is_nighttime": transaction_data["is_nighttime"],
-                "category": transaction_data["category"],
-                "transaction_location": transaction_data["transaction_location"],
-                "job": transaction_data["job"],
-                "state": transaction_data["state"],
-                "transaction_number": transaction_data["transaction_number"]
-            }
+            request_data = self._build_request(transaction_data)
+        except Exception as e:
+            error_msg = f"Unexpected error in fraud check: {str(e)}"
+            logger.error(error_msg)
+            return _error_result(error_msg)
+
+        # Settle clearly low-risk (or clearly fraudulent) transactions locally
+        local_probability = None
+        if self.local_scorer.loaded:
+            local_probability = self.local_scorer.score(request_data)
+            if self.local_scorer.decide(local_probability) is not None:
+                self.local_decisions += 1
+                return self.local_scorer.result(local_probability)
 
-            logging.info(f"Sending fraud check request for transaction {transaction_data['transaction_number']}")
-
-            # Make API call to fraud service with increased timeout
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/predict",  # Removed 'fraud/' prefix since it's already in the URL
-                    json=request_data,
-                    timeout=self.timeout
-                )
-
-                # Check for successful response 
-                if response.status_code == 200:
-                    result = response.json()
-                    logging.info(f"Fraud check result: {result}")
-
-                    return {
-                        "success": True,
-                        "is_fraud": result.get("is_fraud", False),
-                        "fraud_probability": result.get("fraud_probability", 0.0),
-                        "label": result.get("label", "Unknown"),
-                        "timestamp": result.get("timestamp", None)
-                    }
+        # The bulkhead bounds concurrent remote checks; when it is full the check fails fast
+        # and follows the usual fallback instead of queueing on the fraud API
+        try:
+            async with fraud_bulkhead.admit():
+                if self.batching_enabled:
+                    result = await self.coalescer.submit(request_data)
                 else:
-                    error_detail = response.json().get("detail", "Unknown error")
-                    logging.error(f"Fraud API error: {response.status_code} - {error_detail}")
-
-                    return {
-                        "success": False,
-                        "error": f"Fraud API returned {response.status_code}: {error_detail}"
-                    }
-        
+                    result = await self._predict_single(request_data)
+        except AdmissionRejected as e:
+            result = _error_result(f"Fraud API bulkhead rejected the check: {e.reason}")
+
+        return self._with_local_fallback(result, local_probability)
+
+    # Replace a failed remote result with a degraded local decision when possible
+    def _with_local_fallback(self, result: Dict[str, Any], local_probability: Optional[float]) -> Dict[str, Any]:
+        if result.get("success", False) or local_probability is None or not settings.LOCAL_SCORER_FALLBACK:
+            return result
+
+        self.local_fallbacks += 1
+        fallback = self.local_scorer.result(local_probability, degraded=True)
+        fallback["remote_error"] = result.get("error")
+        return fallback
+
+    # Timeout derived from recent latency, clamped to the configured bounds
+    def _adaptive_timeout(self, tracker: LatencyTracker) -> float:
+        if not tracker.ready():
+            return self.timeout
+        timeout = tracker.percentile(settings.FRAUD_TIMEOUT_PERCENTILE) * settings.FRAUD_TIMEOUT_MULTIPLIER
+        return min(self.timeout, max(settings.FRAUD_TIMEOUT_MIN_SECONDS, timeout))
+
+    # Result used when the circuit breaker rejects a call
+    def _circuit_open_result(self) -> Dict[str, Any]:
+        result = _error_result("Fraud API circuit breaker is open")
+        result["circuit_open"] = True
+        return result
+
+    # POST to the fraud API, recording the outcome on the breaker and latency tracker
+    async def _post(self, path: str, payload: Any, timeout: float, tracker: LatencyTracker) -> httpx.Response:
+        operation = "predict_batch" if tracker is self.batch_latency else "predict"
+        started = time.monotonic()
+        success = None
+        try:
+            response = await self.client.post(
+                f"{self.api_url}{path}", json=payload, timeout=timeout, operation=operation
+            )
+            success = response.status_code < 500
+        except Exception:
+            success = False
+            raise
+        finally:
+            # A cancelled call (client disconnect, shutdown, lost hedge) has no outcome,
+            # but must still free its half-open trial slot. A disabled breaker records
+            # nothing: it could open, but would never be asked to half-open again.
+            if self.breaker_enabled:
+                if success is None:
+                    self.breaker.release()
+                else:
+                    self.breaker.record(success, time.monotonic() - started)
+
+        if success:
+            tracker.add(time.monotonic() - started)
+        return response
+
+    # Send /predict, hedging with a duplicate call if the first is slower than the hedge percentile
+    async def _send_predict(self, request_data: Dict[str, Any], timeout: float) -> httpx.Response:
+        breaker_closed = not self.breaker_enabled or self.breaker.state == CircuitBreaker.CLOSED
+        if not self.hedging_enabled or not self.latency.ready() or not breaker_closed:
+            return await self._post("/predict", request_data, timeout, self.latency)
+
+        hedge_delay = self.latency.percentile(settings.FRAUD_HEDGE_PERCENTILE)
+        primary = asyncio.ensure_future(self._post("/predict", request_data, timeout, self.latency))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.hedges_sent += 1
+        hedge = asyncio.ensure_future(self._post("/predict", request_data, timeout, self.latency))
+        pending = {primary, hedge}
+        last_response, last_error = None, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    last_response = task.result()
+                    if last_response.status_code < 500:
+                        if task is hedge:
+                            self.hedges_won += 1
+                        return last_response
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    # Send a single transaction to /predict
+    async def _predict_single(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        if self.breaker_enabled and not self.breaker.allow_request():
+            return self._circuit_open_result()
+
+        timeout = self._adaptive_timeout(self.latency)
+        try:
+            logger.info("Sending fraud check request for transaction %s", request_data['transaction_number'])
+
+            # Make API call to fraud service through the shared connection pool
+            response = await self._send_predict(request_data, timeout)
+
+            # Check for successful response
+            if response.status_code == 200:
+                result = response.json()
+                logger.info("Fraud check result: %s", result)
+
+                return _parse_prediction(result)
+            else:
+                error_detail = response.json().get("detail", "Unknown error")
+                logger.error("Fraud API error: %s - %s", response.status_code, error_detail)
+
+                return {
+                    "success": False,
+                    "error": f"Fraud API returned {response.status_code}: {error_detail}"
+                }
+
         except httpx.TimeoutException:
-            error_msg = f"Timeout connecting to Fraud API ({self.timeout}s)"
-            logging.error(error_msg)
-            return {"success": False, "error": error_msg, "is_fraud": False, "fraud_probability": 0.0}
-            
+            error_msg = f"Timeout connecting to Fraud API ({timeout:.2f}s)"
+            logger.error(error_msg)
+            return _error_result(error_msg)
+
         except httpx.RequestError as e:
             error_msg = f"Error connecting to Fraud API: {str(e)}"
-            logging.error(error_msg)
-            return {"success": False, "error": error_msg, "is_fraud": False, "fraud_probability": 0.0}
-            
+            logger.error(error_msg)
+            return _error_result(error_msg)
+
         except Exception as e:
             error_msg = f"Unexpected error in fraud check: {str(e)}"
-            logging.error(error_msg)
-            return {"success": False, "error": error_msg, "is_fraud": False, "fraud_probability": 0.0}
+            logger.error(error_msg)
+            return _error_result(error_msg)
+
+    # Send many transactions to the batch endpoint, falling back to single calls if it fails
+    async def _predict_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.breaker_enabled and not self.breaker.allow_request():
+            return [self._circuit_open_result() for _ in requests]
+
+        error_msg = None
+        timeout = self._adaptive_timeout(self.batch_latency)
+        try:
+            logger.info("Sending batched fraud check request for %s transactions", len(requests))
+
+            response = await self._post(
+                settings.FRAUD_BATCH_PATH,
+                {"transactions": requests},
+                timeout,
+                self.batch_latency
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                predictions = result if isinstance(result, list) else result.get("predictions", [])
+                if len(predictions) == len(requests):
+                    return [_parse_prediction(prediction) for prediction in predictions]
+                error_msg = f"Fraud API batch returned {len(predictions)} results for {len(requests)} transactions"
+            else:
+                error_msg = f"Fraud API batch returned {response.status_code}"
+
+        except httpx.TimeoutException:
+            error_msg = f"Timeout connecting to Fraud API ({timeout:.2f}s)"
+        except httpx.RequestError as e:
+            error_msg = f"Error connecting to Fraud API: {str(e)}"
+        except Exception as e:
+            error_msg = f"Unexpected error in batched fraud check: {str(e)}"
+
+        logger.error(error_msg)
+        if not self.batch_fallback or (self.breaker_enabled and self.breaker.state == CircuitBreaker.OPEN):
+            return [_error_result(error_msg) for _ in requests]
+
+        # Fall back to one /predict call per transaction
+        self.batch_fallbacks += 1
+        return await self._predict_concurrently(requests)
+
+    # Send transactions to /predict one at a time with bounded concurrency
+    async def _predict_concurrently(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(settings.BATCH_FRAUD_CONCURRENCY)
+
+        async def predict_one(request_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._predict_single(request_data)
+
+        return await asyncio.gather(*(predict_one(request_data) for request_data in requests))
+
+    # Check many transactions, returning results in input order
+    async def check_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        requests = [self._build_request(transaction_data) for transaction_data in transactions]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        probabilities: List[Optional[float]] = [None] * len(requests)
+        remote_indexes = list(range(len(requests)))
+
+        # Score the whole batch locally and only send the uncertain band to the remote model
+        if self.local_scorer.loaded:
+            probabilities = self.local_scorer.score_batch(requests)
+            remote_indexes = []
+            for index, probability in enumerate(probabilities):
+                if self.local_scorer.decide(probability) is not None:
+                    self.local_decisions += 1
+                    results[index] = self.local_scorer.result(probability)
+                else:
+                    remote_indexes.append(index)
+
+        remote_results = await self._check_remote(
+            [requests[index] for index in remote_indexes]
+        )
+        for index, result in zip(remote_indexes, remote_results):
+            results[index] = self._with_local_fallback(result, probabilities[index])
+
+        return results
+
+    # Run a remote call inside the fraud bulkhead; rejected calls fail fast like single checks
+    async def _admitted(self, call: Callable[[], Awaitable[Any]], count: Optional[int] = None) -> Any:
+        try:
+            async with fraud_bulkhead.admit():
+                return await call()
+        except AdmissionRejected as e:
+            error_msg = f"Fraud API bulkhead rejected the check: {e.reason}"
+            if count is None:
+                return _error_result(error_msg)
+            return [_error_result(error_msg) for _ in range(count)]
+
+    # Send transactions to the remote model, batched when micro-batching is enabled.
+    # Every remote call (one transaction, or one chunk) holds a fraud bulkhead slot.
+    async def _check_remote(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not requests:
+            return []
+
+        if not self.batching_enabled:
+            semaphore = asyncio.Semaphore(settings.BATCH_FRAUD_CONCURRENCY)
+
+            async def predict_one(request_data: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._admitted(lambda: self._predict_single(request_data))
+
+            return await asyncio.gather(*(predict_one(request_data) for request_data in requests))
+
+        # Send the batch directly in max-size chunks, bypassing the coalescing window
+        size = self.coalescer.max_batch_size
+        chunks = [requests[i:i + size] for i in range(0, len(requests), size)]
+        for chunk in chunks:
+            self.coalescer.record_batch(len(chunk))
+        chunk_results = await asyncio.gather(*(
+            self._admitted(lambda chunk=chunk: self._predict_batch(chunk), len(chunk)) for chunk in chunks
+        ))
+        return [result for results in chunk_results for result in results]
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state, latency, hedging and micro-batching statistics"""
+        return {
+            "circuit_breaker": {"enabled": self.breaker_enabled, **self.breaker.stats()},
+            "latency": self.latency.stats(),
+            "current_timeout": self._adaptive_timeout(self.latency),
+            "hedging_enabled": self.hedging_enabled,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "local_scorer_loaded": self.local_scorer.loaded,
+            "local_decisions": self.local_decisions,
+            "local_fallbacks": self.local_fallbacks,
+            "batching_enabled": self.batching_enabled,
+            "batch_fallback": self.batch_fallback,
+            "batch_fallbacks": self.batch_fallbacks,
+            "batching": self.coalescer.stats()
+        }
 
-fraud_service = FraudService()
\ No newline at end of file
+fraud_service = FraudService()
@@ -0,0 +1,122 @@
+import httpx
+import logging
+from typing import Dict, Optional, Any
+from app.config.config import settings
+from app.config.logging_config import correlation_id
+from app.services.metrics import dependency, dependency_errors
+
+logger = logging.getLogger(__name__)
+
+
+# Long-lived, pooled HTTP client shared by every call to one downstream service
+class PooledHTTPClient:
+
+    # Initialize the pool configuration, the client itself is created in start()
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.max_connections = settings.HTTP_POOL_MAX_CONNECTIONS
+        self.max_keepalive_connections = settings.HTTP_POOL_MAX_KEEPALIVE
+        self.keepalive_expiry = settings.HTTP_POOL_KEEPALIVE_EXPIRY
+        self.http2 = settings.HTTP2_ENABLED
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Request counters used to size the pool
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    # Create the underlying client (called from the app startup event)
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested for %s but 'h2' is not installed, using HTTP/1.1", self.name)
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout, http2=http2)
+        logger.info(
+            "HTTP client for %s started (max_connections=%s, max_keepalive=%s, http2=%s)",
+            self.name, self.max_connections, self.max_keepalive_connections, http2
+        )
+
+    # Close the underlying client (called from the app shutdown event)
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("HTTP client for %s closed", self.name)
+
+    # Send a request through the shared pool; operation names the call in the metrics
+    async def request(self, method: str, url: str, operation: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+        # Lazily start the client if the app startup event has not run (e.g. scripts)
+        if self._client is None:
+            await self.start()
+
+        # Forward the request's correlation id so downstream logs can be joined with ours
+        request_id = correlation_id.get()
+        if request_id != "-":
+            kwargs["headers"] = {"X-Request-ID": request_id, **(kwargs.get("headers") or {})}
+
+        operation = operation or method.lower()
+        self.requests_total += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            with dependency(self.name, operation):
+                response = await self._client.request(method, url, **kwargs)
+            if response.status_code >= 500:
+                dependency_errors.inc(dependency=self.name, operation=operation)
+            return response
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool configuration, request counters and current connection usage"""
+        stats = {
+            "started": self._client is not None,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "http2": self.http2,
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight
+        }
+
+        # httpx does not expose pool internals publicly, so read them defensively
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            idle = sum(1 for conn in connections if conn.is_idle())
+            stats["connections_open"] = len(connections)
+            stats["connections_idle"] = idle
+            stats["connections_active"] = len(connections) - idle
+        pending = getattr(pool, "_requests", None)
+        if pending is not None:
+            stats["requests_queued"] = sum(
+                1 for req in pending if getattr(req, "connection", True) is None
+            )
+
+        return stats
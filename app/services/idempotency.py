@@ -0,0 +1,66 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.config.config import settings
+
+
+# Recently completed create results and in-flight creates, keyed by idempotency key
+# (the Idempotency-Key header or the transaction_number). Answers retry storms
+# without a Mongo read; the unique indexes remain the source of truth.
+class IdempotencyIndex:
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        # Replay counters
+        self.memory_replays = 0
+        self.in_flight_replays = 0
+        self.stored_replays = 0
+
+    # Stored response for a completed create, if still remembered
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return response
+
+    def remember(self, key: str, response: Dict[str, Any]) -> None:
+        self._results[key] = (time.monotonic() + self.ttl, response)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    # Future of a create already running for this key, if any
+    def in_flight(self, key: str) -> Optional[asyncio.Future]:
+        return self._in_flight.get(key)
+
+    def begin(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        return future
+
+    def finish(self, key: str, future: asyncio.Future, result: Dict[str, Any]) -> None:
+        self._in_flight.pop(key, None)
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "remembered": len(self._results),
+            "in_flight": len(self._in_flight),
+            "memory_replays": self.memory_replays,
+            "in_flight_replays": self.in_flight_replays,
+            "stored_replays": self.stored_replays
+        }
+
+
+idempotency_index = IdempotencyIndex(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
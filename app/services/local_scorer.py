@@ -0,0 +1,136 @@
+import json
+import logging
+import math
+from typing import Any, Dict, List, Optional
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # Batches are scored one at a time without numpy
+    np = None
+
+
+# Logistic function that never overflows: exp() only sees non-positive arguments
+def _sigmoid(logit: float) -> float:
+    if logit >= 0.0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    z = math.exp(logit)
+    return z / (1.0 + z)
+
+
+# In-process logistic fraud scorer over the TransactionRequest features.
+#
+# The model file is JSON:
+#   {
+#     "intercept": -4.2,
+#     "weights": {"transaction_amount": 0.0004, "log_amount": 0.35, "is_nighttime": 1.1},
+#     "category": {"shopping_net": 0.9, "grocery_pos": -0.2},
+#     "state": {"CA": 0.1},
+#     "job": {"Naval architect": 0.05}
+#   }
+# Categorical values missing from a table contribute 0.
+class LocalFraudScorer:
+
+    def __init__(self, model_path: str = ""):
+        self.model_path = model_path
+        self.loaded = False
+        self.intercept = 0.0
+        self.amount_weight = 0.0
+        self.log_amount_weight = 0.0
+        self.nighttime_weight = 0.0
+        self.category_weights: Dict[str, float] = {}
+        self.state_weights: Dict[str, float] = {}
+        self.job_weights: Dict[str, float] = {}
+
+        if model_path:
+            self.load(model_path)
+
+    # Load model weights from a JSON file
+    def load(self, model_path: str) -> None:
+        try:
+            with open(model_path) as f:
+                model = json.load(f)
+
+            weights = model.get("weights", {})
+            self.intercept = float(model.get("intercept", 0.0))
+            self.amount_weight = float(weights.get("transaction_amount", 0.0))
+            self.log_amount_weight = float(weights.get("log_amount", 0.0))
+            self.nighttime_weight = float(weights.get("is_nighttime", 0.0))
+            self.category_weights = {k: float(v) for k, v in model.get("category", {}).items()}
+            self.state_weights = {k: float(v) for k, v in model.get("state", {}).items()}
+            self.job_weights = {k: float(v) for k, v in model.get("job", {}).items()}
+            self.model_path = model_path
+            self.loaded = True
+            logger.info("Local fraud scorer loaded from %s", model_path)
+        except Exception as e:
+            self.loaded = False
+            logger.error("Failed to load local fraud scorer from %s: %s", model_path, e)
+
+    # Fraud probability for one transaction
+    def score(self, transaction: Dict[str, Any]) -> float:
+        amount = float(transaction["transaction_amount"])
+        logit = (
+            self.intercept
+            + self.amount_weight * amount
+            + self.log_amount_weight * math.log1p(max(amount, 0.0))
+            + self.nighttime_weight * float(transaction["is_nighttime"])
+            + self.category_weights.get(transaction["category"], 0.0)
+            + self.state_weights.get(transaction["state"], 0.0)
+            + self.job_weights.get(transaction["job"], 0.0)
+        )
+        return _sigmoid(logit)
+
+    # Fraud probabilities for many transactions, vectorized with numpy when available
+    def score_batch(self, transactions: List[Dict[str, Any]]) -> List[float]:
+        if np is None:
+            return [self.score(transaction) for transaction in transactions]
+        if not transactions:
+            return []
+
+        count = len(transactions)
+        amounts = np.fromiter((float(t["transaction_amount"]) for t in transactions), dtype=np.float64, count=count)
+        nighttime = np.fromiter((float(t["is_nighttime"]) for t in transactions), dtype=np.float64, count=count)
+        categorical = np.fromiter(
+            (
+                self.category_weights.get(t["category"], 0.0)
+                + self.state_weights.get(t["state"], 0.0)
+                + self.job_weights.get(t["job"], 0.0)
+                for t in transactions
+            ),
+            dtype=np.float64,
+            count=count
+        )
+
+        logits = (
+            self.intercept
+            + self.amount_weight * amounts
+            + self.log_amount_weight * np.log1p(np.maximum(amounts, 0.0))
+            + self.nighttime_weight * nighttime
+            + categorical
+        )
+        return (1.0 / (1.0 + np.exp(-logits))).tolist()
+
+    # Decision taken locally without the remote model, or None when the score is uncertain
+    def decide(self, probability: float) -> Optional[bool]:
+        if probability < settings.LOCAL_SCORER_APPROVE_BELOW:
+            return False
+        if probability >= settings.LOCAL_SCORER_FLAG_ABOVE:
+            return True
+        return None
+
+    # Build a fraud result from a local score
+    def result(self, probability: float, degraded: bool = False) -> Dict[str, Any]:
+        is_fraud = probability >= settings.FRAUD_THRESHOLD if degraded else bool(self.decide(probability))
+        result = {
+            "success": True,
+            "is_fraud": is_fraud,
+            "fraud_probability": probability,
+            "label": "Fraud" if is_fraud else "Not Fraud",
+            "timestamp": None,
+            "source": "local"
+        }
+        if degraded:
+            result["degraded"] = True
+        return result
@@ -0,0 +1,192 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond Mongo calls up to slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage timings of the current request, rendered into the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last)], sum, count
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+# Request metrics
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+
+# Stages of the transaction pipeline
+stage_duration = Histogram(
+    "transaction_stage_duration_seconds", "Latency of each transaction pipeline stage", ("stage",)
+)
+stage_errors = Counter("transaction_stage_errors_total", "Transaction pipeline stage errors", ("stage",))
+
+# Downstream dependencies (mongo, fraud, notification)
+dependency_duration = Histogram(
+    "dependency_request_duration_seconds", "Latency of calls to downstream dependencies", ("dependency", "operation")
+)
+dependency_errors = Counter(
+    "dependency_errors_total", "Failed calls to downstream dependencies", ("dependency", "operation")
+)
+dependency_in_flight = Gauge(
+    "dependency_requests_in_flight", "Calls to downstream dependencies in progress", ("dependency",)
+)
+
+# Fraud decisions
+fraud_decisions = Counter("fraud_decisions_total", "Final transaction status decisions", ("status",))
+
+# Admission control and bulkheads
+admission_in_flight = Gauge("admission_in_flight", "Requests holding an admission slot", ("controller",))
+admission_queue_depth = Gauge("admission_queue_depth", "Requests waiting for an admission slot", ("controller",))
+admission_rejections = Counter(
+    "admission_rejections_total", "Requests shed by admission control", ("controller", "reason")
+)
+
+REGISTRY = [
+    http_request_duration,
+    http_requests_in_flight,
+    stage_duration,
+    stage_errors,
+    dependency_duration,
+    dependency_errors,
+    dependency_in_flight,
+    fraud_decisions,
+    admission_in_flight,
+    admission_queue_depth,
+    admission_rejections
+]
+
+
+# Time one stage of the transaction pipeline
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_duration.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+# Time one call to a downstream dependency
+@contextmanager
+def dependency(name: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    dependency_in_flight.inc(dependency=name)
+    try:
+        yield
+    except Exception:
+        dependency_errors.inc(dependency=name, operation=operation)
+        raise
+    finally:
+        dependency_in_flight.dec(dependency=name)
+        dependency_duration.observe(time.perf_counter() - started, dependency=name, operation=operation)
+
+
+def record_decision(status) -> None:
+    fraud_decisions.inc(status=getattr(status, "value", status))
+
+
+# Start collecting stage timings for the current request
+def start_request_timing() -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+
+# Format collected timings as a Server-Timing header value
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    entries = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in timings]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+# Render every metric in the Prometheus text exposition format
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
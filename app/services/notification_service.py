@@ -2,6 +2,10 @@ import httpx
 import logging 
 from typing import Dict, Optional, Any
 from app.config.config import settings
+from app.services.cache import notification_status_cache
+from app.services.http_client import PooledHTTPClient
+
+logger = logging.getLogger(__name__)
 
 
 # Service to interact with the notification API
@@ -11,6 +15,15 @@ class NotificationService:
     def __init__(self):
         self.api_url = settings.NOTIFY_API_URL
         self.timeout = 60.0
+        self.client = PooledHTTPClient("notification", self.timeout)
+
+    # Open the shared connection pool
+    async def start(self):
+        await self.client.start()
+
+    # Close the shared connection pool
+    async def close(self):
+        await self.client.close()
 
     
     # Send a fraud notification 
@@ -38,75 +51,82 @@ class NotificationService:
                 "state": transaction_data["state"]
             }
             
-            logging.info(f"Sending fraud notification for transaction {notification_data['transaction_number']}")
+            logger.info("Sending fraud notification for transaction %s", notification_data['transaction_number'])
+            
+            # Make API call to notification service through the shared connection pool
+            response = await self.client.post(
+                f"{self.api_url}/send", 
+                json=notification_data,
+                timeout=self.timeout,
+                operation="send"
+            )
             
-            # Make API call to notification service
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/send", 
-                    json=notification_data,
-                    timeout=self.timeout
-                )
+            # Check for successful response
+            if response.status_code in (200, 201):
+                result = response.json()
+                logger.info("Notification sent: %s", result)
+                return {
+                    "success": True,
+                    "notification_number": result.get("_id"),
+                    "status": result.get("status"),
+                    "message": "Fraud notification sent successfully",
+                    "notification_sent": True
+                }
+            else:
+                error_detail = response.json().get("detail", "Unknown error")
+                logger.error("Notification API error: %s - %s", response.status_code, error_detail)
+                return {
+                    "success": False,
+                    "error": f"Notification API returned {response.status_code}: {error_detail}",
+                    "notification_sent": False
+                }
                 
-                # Check for successful response
-                if response.status_code in (200, 201):
-                    result = response.json()
-                    logging.info(f"Notification sent: {result}")
-                    return {
-                        "success": True,
-                        "notification_number": result.get("_id"),
-                        "status": result.get("status"),
-                        "message": "Fraud notification sent successfully",
-                        "notification_sent": True
-                    }
-                else:
-                    error_detail = response.json().get("detail", "Unknown error")
-                    logging.error(f"Notification API error: {response.status_code} - {error_detail}")
-                    return {
-                        "success": False,
-                        "error": f"Notification API returned {response.status_code}: {error_detail}",
-                        "notification_sent": False
-                    }
-                    
         except httpx.TimeoutException:
             error_msg = f"Timeout connecting to Notification API ({self.timeout}s)"
-            logging.error(error_msg)
+            logger.error(error_msg)
             return {"success": False, "error": error_msg, "notification_sent": False}
             
         except httpx.RequestError as e:
             error_msg = f"Error connecting to Notification API: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             return {"success": False, "error": error_msg, "notification_sent": False}
             
         except Exception as e:
             error_msg = f"Unexpected error sending notification: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             return {"success": False, "error": error_msg, "notification_sent": False}
             
     async def check_notification_status(self, transaction_id: str) -> Dict[str, Any]:
         """Check the status of a notification for a transaction"""
+        cached = await notification_status_cache.get(transaction_id)
+        if cached is not None:
+            return cached
+        
         try:
-            # Make API call to notification service
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/notifications/status/{transaction_id}",
-                    timeout=self.timeout
-                )
+            # Make API call to notification service through the shared connection pool
+            response = await self.client.get(
+                f"{self.api_url}/notifications/status/{transaction_id}",
+                timeout=self.timeout,
+                operation="status"
+            )
+            
+            if response.status_code in (200, 404):
+                result = {
+                    "success": True,
+                    "notification": response.json() if response.status_code == 200 else None
+                }
+                await notification_status_cache.set(transaction_id, result)
+                return result
+            else:
+                error_detail = response.json().get("detail", "Unknown error")
+                return {
+                    "success": False,
+                    "error": f"Notification API returned {response.status_code}: {error_detail}"
+                }
                 
-                if response.status_code == 200:
-                    return {"success": True, "notification": response.json()}
-                elif response.status_code == 404:
-                    return {"success": True, "notification": None}
-                else:
-                    error_detail = response.json().get("detail", "Unknown error")
-                    return {
-                        "success": False,
-                        "error": f"Notification API returned {response.status_code}: {error_detail}"
-                    }
-                    
         except Exception as e:
             error_msg = f"Error checking notification status: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             return {"success": False, "error": error_msg}
 
 notification_service = NotificationService()
\ No newline at end of file
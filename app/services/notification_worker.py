@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config.config import settings
+from app.db.outbox import (
+    claim_notifications,
+    mark_notification_sent,
+    mark_notification_retry
+)
+from app.db.transactions import update_transaction
+from app.services.notification_service import notification_service
+
+logger = logging.getLogger(__name__)
+
+
+# Background worker pool that drains the notification outbox
+class NotificationOutboxWorker:
+
+    def __init__(self):
+        self.concurrency = settings.NOTIFICATION_WORKERS
+        self.batch_size = settings.NOTIFICATION_BATCH_SIZE
+        self.max_attempts = settings.NOTIFICATION_MAX_ATTEMPTS
+        self.backoff_base = settings.NOTIFICATION_BACKOFF_BASE
+        self.backoff_max = settings.NOTIFICATION_BACKOFF_MAX
+        self.poll_interval = settings.NOTIFICATION_POLL_INTERVAL
+        self.lease_seconds = settings.NOTIFICATION_LEASE_SECONDS
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        # Delivery counters
+        self.sent_total = 0
+        self.retries_total = 0
+        self.failed_total = 0
+
+    # Start the worker tasks (called from the app startup event)
+    async def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(worker_id)) for worker_id in range(self.concurrency)
+        ]
+        logger.info("Notification outbox worker started with %s workers", self.concurrency)
+
+    # Stop the worker tasks, leased entries are picked up again after restart
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Notification outbox worker stopped")
+
+    # Wake idle workers after a new entry has been written
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, worker_id: int) -> None:
+        while not self._stopping:
+            try:
+                entries = await claim_notifications(self.batch_size, self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Notification worker %s failed to claim outbox entries: %s", worker_id, e)
+                entries = []
+
+            if entries:
+                results = await asyncio.gather(*(self._deliver(entry) for entry in entries), return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error("Notification worker %s failed to deliver outbox entry: %s", worker_id, result)
+                continue
+
+            # Nothing due, wait for a new entry or the next poll
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, entry: Dict[str, Any]) -> None:
+        try:
+            result = await notification_service.send_fraud_notification(
+                entry["transaction"], entry["fraud_result"]
+            )
+        except Exception as e:
+            result = {"success": False, "error": str(e), "notification_sent": False}
+
+        if result.get("notification_sent", False):
+            await update_transaction(entry["transaction_id"], {
+                "notification_sent": True,
+                "notification_result": result
+            })
+            await mark_notification_sent(entry["_id"])
+            self.sent_total += 1
+            return
+
+        attempts = entry.get("attempts", 0) + 1
+        error = result.get("error", "Unknown error")
+        if attempts >= self.max_attempts:
+            logger.error(
+                "Giving up on fraud notification for transaction %s after %s attempts: %s",
+                entry["transaction_number"], attempts, error
+            )
+            await update_transaction(entry["transaction_id"], {
+                "notification_sent": False,
+                "notification_result": result
+            })
+            await mark_notification_retry(entry["_id"], error, datetime.now(), give_up=True)
+            self.failed_total += 1
+            return
+
+        # Exponential backoff with jitter
+        delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+        delay = delay * random.uniform(0.5, 1.0)
+        await mark_notification_retry(entry["_id"], error, datetime.now() + timedelta(seconds=delay))
+        self.retries_total += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker pool configuration and delivery counters"""
+        return {
+            "workers": len(self._tasks),
+            "batch_size": self.batch_size,
+            "max_attempts": self.max_attempts,
+            "sent_total": self.sent_total,
+            "retries_total": self.retries_total,
+            "failed_total": self.failed_total
+        }
+
+notification_worker = NotificationOutboxWorker()
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config.config import settings
+from app.controllers.transaction_controller import complete_scored_transaction
+from app.db.scoring_queue import claim_scoring, mark_scoring_retry
+from app.services.fraud_service import fraud_service
+from app.services.callbacks import check_callback_url
+from app.services.http_client import PooledHTTPClient
+
+logger = logging.getLogger(__name__)
+
+
+# Background worker pool that scores transactions accepted with 202 and writes their final status
+class ScoringWorker:
+
+    def __init__(self):
+        self.concurrency = settings.SCORING_WORKERS
+        self.batch_size = settings.SCORING_BATCH_SIZE
+        self.max_attempts = settings.SCORING_MAX_ATTEMPTS
+        self.backoff_base = settings.SCORING_BACKOFF_BASE
+        self.backoff_max = settings.SCORING_BACKOFF_MAX
+        self.poll_interval = settings.SCORING_POLL_INTERVAL
+        self.lease_seconds = settings.SCORING_LEASE_SECONDS
+        self.callback_client = PooledHTTPClient("callback", settings.SCORING_CALLBACK_TIMEOUT)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        # Scoring counters
+        self.scored_total = 0
+        self.retries_total = 0
+        self.fallbacks_total = 0
+        self.callbacks_sent = 0
+        self.callbacks_failed = 0
+
+    # Start the worker tasks (called from the app startup event)
+    async def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        await self.callback_client.start()
+        self._tasks = [
+            asyncio.create_task(self._run(worker_id)) for worker_id in range(self.concurrency)
+        ]
+        logger.info("Scoring worker started with %s workers", self.concurrency)
+
+    # Stop the worker tasks, leased transactions are picked up again after restart
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.callback_client.close()
+        logger.info("Scoring worker stopped")
+
+    # Wake idle workers after a transaction has been accepted
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, worker_id: int) -> None:
+        while not self._stopping:
+            try:
+                transactions = await claim_scoring(self.batch_size, self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Scoring worker %s failed to claim transactions: %s", worker_id, e)
+                transactions = []
+
+            if transactions:
+                results = await asyncio.gather(*(self._score(transaction) for transaction in transactions),
+                                               return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error("Scoring worker %s failed to score transaction: %s", worker_id, result)
+                continue
+
+            # Nothing due, wait for a new transaction or the next poll
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _score(self, transaction: Dict[str, Any]) -> None:
+        fraud_result = await fraud_service.check_transaction(transaction)
+
+        # Retry failed checks with backoff; the last attempt falls through to the fallback policy
+        attempts = transaction.get("scoring_attempts", 0) + 1
+        if not fraud_result.get("success", False) and attempts < self.max_attempts:
+            delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+            delay = delay * random.uniform(0.5, 1.0)
+            await mark_scoring_retry(transaction, fraud_result.get("error", "Unknown error"),
+                                     datetime.now() + timedelta(seconds=delay))
+            self.retries_total += 1
+            return
+        if not fraud_result.get("success", False):
+            self.fallbacks_total += 1
+
+        response = await complete_scored_transaction(transaction, fraud_result)
+        if response is None:
+            return
+        self.scored_total += 1
+
+        if transaction.get("callback_url"):
+            await self._send_callback(transaction["callback_url"], response)
+
+    # Best-effort POST of the final result to the client's callback URL
+    async def _send_callback(self, url: str, response: Dict[str, Any]) -> None:
+        # Checked again at send time: the allow-list may have changed and DNS may now point elsewhere
+        error = await check_callback_url(url)
+        if error is not None:
+            self.callbacks_failed += 1
+            logger.warning("Callback for transaction %s refused: %s", response.get("transaction_number"), error)
+            return
+
+        payload = {**response, "status": getattr(response["status"], "value", response["status"])}
+        for attempt in range(1, settings.SCORING_CALLBACK_MAX_ATTEMPTS + 1):
+            try:
+                result = await self.callback_client.post(url, json=payload, operation="callback")
+                if result.status_code < 400:
+                    self.callbacks_sent += 1
+                    return
+                error = f"HTTP {result.status_code}"
+            except Exception as e:
+                error = str(e)
+            if attempt < settings.SCORING_CALLBACK_MAX_ATTEMPTS:
+                await asyncio.sleep(min(self.backoff_base * (2 ** (attempt - 1)), self.backoff_max))
+
+        self.callbacks_failed += 1
+        logger.warning("Callback for transaction %s to %s failed: %s", response.get('transaction_number'), url, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker pool configuration and scoring counters"""
+        return {
+            "workers": len(self._tasks),
+            "batch_size": self.batch_size,
+            "max_attempts": self.max_attempts,
+            "scored_total": self.scored_total,
+            "retries_total": self.retries_total,
+            "fallbacks_total": self.fallbacks_total,
+            "callbacks_sent": self.callbacks_sent,
+            "callbacks_failed": self.callbacks_failed
+        }
+
+
+scoring_worker = ScoringWorker()
@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.config import settings
+
+# Transaction fields velocity is tracked by, and the prefix of their feature names
+VELOCITY_DIMENSIONS: List[Tuple[str, str]] = [
+    ("state", "state"),
+    ("transaction_location", "location"),
+    ("category", "category")
+]
+
+
+# Count and amount sum over a sliding time window, kept in a ring of fixed-size
+# time buckets with running totals. Adding and reading are O(1) (amortized over
+# the buckets that expire); the window covers between buckets-1 and buckets
+# bucket widths of history.
+class SlidingWindow:
+
+    __slots__ = ("bucket_seconds", "counts", "sums", "head", "count", "total")
+
+    def __init__(self, window_seconds: float, buckets: int):
+        self.bucket_seconds = window_seconds / buckets
+        self.counts = [0] * buckets
+        self.sums = [0.0] * buckets
+        self.head: Optional[int] = None  # Absolute index of the newest bucket
+        self.count = 0
+        self.total = 0.0
+
+    # Expire the buckets that fell out of the window since the last call
+    def _advance(self, now: float) -> None:
+        bucket = int(now // self.bucket_seconds)
+        if self.head is None:
+            self.head = bucket
+            return
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+
+        size = len(self.counts)
+        if steps >= size:
+            self.counts = [0] * size
+            self.sums = [0.0] * size
+            self.count = 0
+            self.total = 0.0
+        else:
+            for offset in range(1, steps + 1):
+                index = (self.head + offset) % size
+                self.count -= self.counts[index]
+                self.total -= self.sums[index]
+                self.counts[index] = 0
+                self.sums[index] = 0.0
+        self.head = bucket
+
+    def add(self, now: float, amount: float) -> None:
+        self._advance(now)
+        index = self.head % len(self.counts)
+        self.counts[index] += 1
+        self.sums[index] += amount
+        self.count += 1
+        self.total += amount
+
+
+# In-process velocity counters per state, location and merchant category, used to
+# enrich the /predict payload with recent activity ("transactions for this location
+# in the last 60s"). Each dimension keeps at most max_keys keys; the least recently
+# seen key is evicted first. Counts are per instance, not shared across replicas.
+class VelocityEngine:
+
+    def __init__(self, windows: List[float], buckets: int, max_keys: int, enabled: bool = True):
+        self.windows = windows
+        self.buckets = buckets
+        self.max_keys = max_keys
+        self.enabled = enabled
+        self._keys: Dict[str, "OrderedDict[str, List[SlidingWindow]]"] = {
+            dimension: OrderedDict() for dimension, _ in VELOCITY_DIMENSIONS
+        }
+
+        # Engine counters
+        self.observed_total = 0
+        self.evictions = 0
+
+    def _windows_for(self, dimension: str, value: str) -> List[SlidingWindow]:
+        keys = self._keys[dimension]
+        windows = keys.get(value)
+        if windows is not None:
+            keys.move_to_end(value)
+            return windows
+
+        if len(keys) >= self.max_keys:
+            keys.popitem(last=False)
+            self.evictions += 1
+        windows = [SlidingWindow(seconds, self.buckets) for seconds in self.windows]
+        keys[value] = windows
+        return windows
+
+    # Count a transaction and return the velocity features including it
+    def observe(self, transaction: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        amount = float(transaction.get("transaction_amount") or 0.0)
+        self.observed_total += 1
+
+        features: Dict[str, Any] = {}
+        for dimension, prefix in VELOCITY_DIMENSIONS:
+            value = transaction.get(dimension)
+            if value is None:
+                continue
+            for seconds, window in zip(self.windows, self._windows_for(dimension, str(value))):
+                window.add(now, amount)
+                features[f"{prefix}_txn_count_{seconds:g}s"] = window.count
+                features[f"{prefix}_amount_sum_{seconds:g}s"] = round(window.total, 2)
+        return features
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "windows_seconds": self.windows,
+            "buckets": self.buckets,
+            "max_keys": self.max_keys,
+            "keys": {dimension: len(keys) for dimension, keys in self._keys.items()},
+            "observed_total": self.observed_total,
+            "evictions": self.evictions
+        }
+
+
+def _parse_windows(value: str) -> List[float]:
+    return sorted({float(part) for part in value.split(",") if part.strip()})
+
+
+velocity_engine = VelocityEngine(
+    _parse_windows(settings.VELOCITY_WINDOWS),
+    settings.VELOCITY_BUCKETS,
+    settings.VELOCITY_MAX_KEYS,
+    enabled=settings.VELOCITY_FEATURES_ENABLED
+)
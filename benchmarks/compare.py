@@ -0,0 +1,41 @@
+"""Compare two benchmark reports written by benchmarks/run.py.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import json
+import sys
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print("Usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        baseline = json.load(f)
+    with open(sys.argv[2]) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline.get('commit')}")
+    print(f"candidate {candidate.get('commit')}")
+    for name, after in candidate["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        print(f"\n{name}")
+        print(f"  throughput  {before['throughput_rps']:>10} -> {after['throughput_rps']:>10} req/s  "
+              f"({_change(before['throughput_rps'], after['throughput_rps'])})")
+        for percentile in ["p50", "p95", "p99"]:
+            b, a = before["latency_ms"][percentile], after["latency_ms"][percentile]
+            print(f"  {percentile:<10}  {b:>10} -> {a:>10} ms     ({_change(b, a)})")
+        print(f"  errors      {before['errors']:>10} -> {after['errors']:>10}")
+
+
+if __name__ == "__main__":
+    main()
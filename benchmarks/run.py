@@ -0,0 +1,240 @@
+"""Reproducible load benchmark for the transaction service.
+
+Starts local fraud and notification stubs (benchmarks/stubs.py) and the
+FastAPI app in subprocesses, drives /transactions/create, /transactions/{id}
+and /transactions/ at a fixed concurrency and writes throughput and latency
+percentiles to JSON so runs can be compared across commits:
+
+    python -m benchmarks.run --concurrency 50 --requests 5000 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+
+By default Mongo is replaced by an in-memory database (mongomock://, install
+benchmarks/requirements.txt for the pinned driver versions it works with); pass
+--mongo-uri to run against a local mongod. The run exits non-zero if any scenario
+saw errors.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+CATEGORIES = ["shopping_pos", "shopping_net", "grocery_pos", "gas_transport", "misc_net", "entertainment"]
+STATES = ["CA", "NY", "TX", "FL", "WA", "IL"]
+JOBS = ["Naval architect", "Teacher", "Engineer", "Nurse", "Accountant"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def _start_server(target: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env={**os.environ, **env}
+    )
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def _transaction() -> Dict[str, Any]:
+    return {
+        "transaction_amount": round(random.lognormvariate(4.0, 1.0), 2),
+        "is_nighttime": random.randint(0, 1),
+        "category": random.choice(CATEGORIES),
+        "transaction_location": f"{random.uniform(-120, -70):.4f}, {random.uniform(25, 48):.4f}",
+        "job": random.choice(JOBS),
+        "state": random.choice(STATES),
+        "transaction_number": f"bench_{uuid.uuid4().hex}"
+    }
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+# Send `total` requests built by `make_request` with `concurrency` workers
+async def _drive(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = make_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(_percentile(ordered, 50) * 1000, 3),
+            "p95": round(_percentile(ordered, 95) * 1000, 3),
+            "p99": round(_percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0
+        }
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    fraud_port, notify_port, app_port = _free_port(), _free_port(), _free_port()
+    fraud_env = {
+        "STUB_LATENCY_MS": str(args.fraud_latency_ms),
+        "STUB_LATENCY_SIGMA": str(args.latency_sigma),
+        "STUB_ERROR_RATE": str(args.fraud_error_rate),
+        "STUB_FRAUD_RATE": str(args.fraud_rate)
+    }
+    notify_env = {
+        "STUB_LATENCY_MS": str(args.notify_latency_ms),
+        "STUB_LATENCY_SIGMA": str(args.latency_sigma),
+        "STUB_ERROR_RATE": str(args.notify_error_rate)
+    }
+    app_env = {
+        "MONGODB_URI": args.mongo_uri,
+        "MONGODB_DB": args.mongo_db,
+        "FRAUD_API_URL": f"http://127.0.0.1:{fraud_port}/fraud",
+        "NOTIFY_API_URL": f"http://127.0.0.1:{notify_port}/notifications"
+    }
+
+    processes = [
+        _start_server("benchmarks.stubs:fraud_app", fraud_port, fraud_env),
+        _start_server("benchmarks.stubs:notify_app", notify_port, notify_env),
+        _start_server("app.main:app", app_port, app_env)
+    ]
+    try:
+        base_url = f"http://127.0.0.1:{app_port}"
+        await _wait_ready(f"http://127.0.0.1:{fraud_port}/health")
+        await _wait_ready(f"http://127.0.0.1:{notify_port}/health")
+        await _wait_ready(f"{base_url}/health")
+
+        results: Dict[str, Any] = {}
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            # Warm up connections and seed documents for the read scenarios
+            created: List[str] = []
+            for _ in range(args.seed):
+                body = _transaction()
+                response = await client.post("/transactions/create", json=body)
+                if response.status_code == 200:
+                    created.append(body["transaction_number"])
+
+            if "create" in args.scenarios:
+                results["create"] = await _drive(
+                    client, lambda: ("POST", "/transactions/create", _transaction()),
+                    args.requests, args.concurrency
+                )
+            if "get" in args.scenarios and created:
+                results["get"] = await _drive(
+                    client, lambda: ("GET", f"/transactions/{random.choice(created)}", None),
+                    args.requests, args.concurrency
+                )
+            if "list" in args.scenarios:
+                results["list"] = await _drive(
+                    client, lambda: ("GET", f"/transactions/?page=1&limit={args.page_size}", None),
+                    args.requests, args.concurrency
+                )
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "scenarios": results
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load benchmark for the transaction service")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--scenarios", default="create,get,list", help="Comma-separated: create,get,list")
+    parser.add_argument("--seed", type=int, default=200, help="Transactions created before measuring")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--mongo-uri", default="mongomock://", help="mongomock:// for in-memory, or a mongod URI")
+    parser.add_argument("--mongo-db", default="transaction_service_bench")
+    parser.add_argument("--fraud-latency-ms", type=float, default=20.0)
+    parser.add_argument("--fraud-error-rate", type=float, default=0.0)
+    parser.add_argument("--fraud-rate", type=float, default=0.05)
+    parser.add_argument("--notify-latency-ms", type=float, default=10.0)
+    parser.add_argument("--notify-error-rate", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+
+    report = asyncio.run(run_benchmark(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(f"{name:>8}: {result['throughput_rps']:>9} req/s  p50 {latency['p50']}ms  "
+              f"p95 {latency['p95']}ms  p99 {latency['p99']}ms  errors {result['errors']}")
+    print(f"Results written to {args.output}")
+
+    # Numbers from failing requests are not comparable, so any error fails the run
+    failed = [name for name, result in report["scenarios"].items() if result["errors"]]
+    missing = [name for name in args.scenarios if name not in report["scenarios"]]
+    if failed or missing:
+        problems = [f"{name} ({report['scenarios'][name]['errors']} errors)" for name in failed]
+        problems += [f"{name} (not run)" for name in missing]
+        raise SystemExit(f"Benchmark failed: {', '.join(problems)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""CPU cost of serializing one page of GET /transactions/.
+
+Compares the default path (per-item _id / is_nighttime rewrite, validation
+against PaginatedTransactions, FastAPI's jsonable_encoder and json.dumps)
+with the fast path enabled by FAST_SERIALIZATION_ENABLED (dicts built
+straight from the Mongo documents, encoded with orjson):
+
+    python -m benchmarks.serialization --page-size 100 --iterations 2000
+
+No servers or database are needed; documents are generated in memory.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.models.schemas import PaginatedTransactions, TransactionStatus
+from app.models.serializers import paginated_dict
+from benchmarks.run import CATEGORIES, JOBS, STATES
+
+
+def _documents(count: int) -> List[Dict[str, Any]]:
+    now = datetime.now()
+    return [
+        {
+            "_id": ObjectId(),
+            "transaction_number": f"bench_{i}",
+            "transaction_amount": round(random.lognormvariate(4.0, 1.0), 2),
+            "is_nighttime": random.randint(0, 1),
+            "category": random.choice(CATEGORIES),
+            "transaction_location": f"{random.uniform(-120, -70):.4f}, {random.uniform(25, 48):.4f}",
+            "job": random.choice(JOBS),
+            "state": random.choice(STATES),
+            "status": random.choice([TransactionStatus.APPROVED.value, TransactionStatus.FLAGGED.value]),
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now - timedelta(seconds=i),
+            "is_fraud": False,
+            "fraud_probability": random.random(),
+            "notification_sent": False
+        }
+        for i in range(count)
+    ]
+
+
+def _result(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "transactions": transactions,
+        "page": 1,
+        "limit": len(transactions),
+        "total": 10000,
+        "pages": 10000 // max(1, len(transactions)),
+        "total_exact": False,
+        "next_cursor": None
+    }
+
+
+# Current path: list_transactions' conversion loop, then response_model validation and encoding
+def default_path(documents: List[Dict[str, Any]]) -> bytes:
+    transactions = [dict(doc) for doc in documents]
+    for transaction in transactions:
+        transaction["_id"] = str(transaction["_id"])
+        if "is_nighttime" in transaction:
+            transaction["is_nighttime"] = str(transaction["is_nighttime"])
+    validated = PaginatedTransactions.model_validate(_result(transactions))
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+# Fast path: raw documents, response dicts built directly, orjson encoding
+def fast_path(documents: List[Dict[str, Any]]) -> bytes:
+    return orjson.dumps(paginated_dict(_result(documents)))
+
+
+# CPU seconds per call, best of `repeats` runs of `iterations` calls
+def _measure(fn: Callable[[List[Dict[str, Any]]], bytes], documents: List[Dict[str, Any]],
+             iterations: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.process_time()
+        for _ in range(iterations):
+            fn(documents)
+        best = min(best, (time.process_time() - started) / iterations)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serialization cost per transaction list page")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    random.seed(0)
+    documents = _documents(args.page_size)
+
+    # Both paths must produce the same JSON document
+    if json.loads(default_path(documents)) != json.loads(fast_path(documents)):
+        raise SystemExit("Fast path output differs from the default path")
+
+    default_cpu = _measure(default_path, documents, args.iterations, args.repeats)
+    fast_cpu = _measure(fast_path, documents, args.iterations, args.repeats)
+    report = {
+        "page_size": args.page_size,
+        "default_cpu_ms_per_page": round(default_cpu * 1000, 4),
+        "fast_cpu_ms_per_page": round(fast_cpu * 1000, 4),
+        "speedup": round(default_cpu / fast_cpu, 2) if fast_cpu else None
+    }
+
+    print(f" default: {report['default_cpu_ms_per_page']} ms CPU per page")
+    print(f"    fast: {report['fast_cpu_ms_per_page']} ms CPU per page ({report['speedup']}x)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Local stand-ins for the fraud and notification services.
+
+Both stubs implement the same contracts the transaction service calls
+(/predict, /predict/batch, /send, /notifications/status/{id}) and are
+configured through environment variables:
+
+    STUB_LATENCY_MS      median response latency (default 20)
+    STUB_LATENCY_SIGMA   log-normal spread of the latency (default 0.5, 0 = fixed)
+    STUB_ERROR_RATE      fraction of requests answered with a 503 (default 0)
+    STUB_FRAUD_RATE      fraction of transactions predicted as fraud (default 0.05)
+
+Run with e.g. `uvicorn benchmarks.stubs:fraud_app --port 5004`.
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", 20.0))
+LATENCY_SIGMA = float(os.getenv("STUB_LATENCY_SIGMA", 0.5))
+ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", 0.0))
+FRAUD_RATE = float(os.getenv("STUB_FRAUD_RATE", 0.05))
+
+
+# Sleep for a log-normally distributed latency and fail a configured fraction of calls
+async def _simulate() -> None:
+    latency = LATENCY_MS
+    if LATENCY_SIGMA > 0:
+        latency = random.lognormvariate(0.0, LATENCY_SIGMA) * LATENCY_MS
+    await asyncio.sleep(latency / 1000.0)
+
+    if random.random() < ERROR_RATE:
+        raise HTTPException(status_code=503, detail="Injected stub failure")
+
+
+def _prediction() -> Dict[str, Any]:
+    is_fraud = random.random() < FRAUD_RATE
+    probability = random.uniform(0.5, 1.0) if is_fraud else random.uniform(0.0, 0.5)
+    return {
+        "is_fraud": is_fraud,
+        "fraud_probability": probability,
+        "label": "Fraud" if is_fraud else "Not Fraud",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+fraud_app = FastAPI(title="Fraud API stub")
+
+
+@fraud_app.get("/health")
+async def fraud_health():
+    return {"status": "ok"}
+
+
+@fraud_app.post("/fraud/predict")
+async def predict(transaction: Dict[str, Any]):
+    await _simulate()
+    return _prediction()
+
+
+@fraud_app.post("/fraud/predict/batch")
+async def predict_batch(body: Dict[str, List[Dict[str, Any]]]):
+    await _simulate()
+    return {"predictions": [_prediction() for _ in body.get("transactions", [])]}
+
+
+notify_app = FastAPI(title="Notification API stub")
+_sent: Dict[str, Dict[str, Any]] = {}
+
+
+@notify_app.get("/health")
+async def notify_health():
+    return {"status": "ok"}
+
+
+@notify_app.post("/notifications/send", status_code=201)
+async def send(notification: Dict[str, Any]):
+    await _simulate()
+    record = {"_id": uuid.uuid4().hex, "status": "sent", **notification}
+    _sent[notification.get("transaction_number", record["_id"])] = record
+    return record
+
+
+@notify_app.get("/notifications/notifications/status/{transaction_id}")
+async def status(transaction_id: str):
+    await _simulate()
+    record = _sent.get(transaction_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return record
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List
+
+import pytest
+from bson import ObjectId
+from pymongo.results import BulkWriteResult
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents[:length] if length else list(self.documents)
+
+
+# Just enough of a Motor collection for the bulk write paths: equality and $in
+# filters, $set/$unset updates
+class FakeCollection:
+
+    def __init__(self):
+        self.documents: Dict[ObjectId, Dict[str, Any]] = {}
+        self.bulk_writes = 0
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self.documents[document["_id"]] = dict(document)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+        modified = 0
+        for operation in operations:
+            for document in self.documents.values():
+                if _matches(document, operation._filter):
+                    document.update(operation._doc.get("$set", {}))
+                    for field in operation._doc.get("$unset", {}):
+                        document.pop(field, None)
+                    modified += 1
+                    break
+        return BulkWriteResult({"nModified": modified, "nMatched": modified}, True)
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(document) for document in self.documents.values() if _matches(document, query)])
+
+
+class FakeDatabase:
+
+    def __init__(self):
+        self.transactions = FakeCollection()
+
+
+# Monotonic clock the tests move by hand
+class FakeClock:
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+# Fake database behind app.db.transactions; status counter increments are recorded
+# in fake_db.counter_deltas instead of written
+@pytest.fixture
+def fake_db(monkeypatch):
+    from app.db import transactions
+
+    database = FakeDatabase()
+    database.counter_deltas = []
+
+    async def increment_status_counts(db, deltas):
+        database.counter_deltas.append(dict(deltas))
+
+    monkeypatch.setattr(transactions, "db", database)
+    monkeypatch.setattr(transactions, "increment_status_counts", increment_status_counts)
+    return database
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.routers import transaction_routes
+from app.services.admission import PRIORITY_HIGH, PRIORITY_NORMAL, AdmissionController, AdmissionRejected
+
+TRANSACTION = {
+    "transaction_amount": 150.55,
+    "is_nighttime": 1,
+    "category": "shopping_pos",
+    "transaction_location": "-95.7923, 36.1499",
+    "job": "Naval architect",
+    "state": "CA",
+    "transaction_number": "TX123456789"
+}
+
+
+async def _hold(controller, release, priority=PRIORITY_NORMAL, order=None, name=None):
+    async with controller.admit(priority):
+        if order is not None:
+            order.append(name)
+        await release.wait()
+
+
+def test_admits_up_to_max_concurrency_then_queues():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=2, max_queue=5, queue_timeout=1.0)
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(_hold(controller, release)) for _ in range(3)]
+        await asyncio.sleep(0)
+        stats = controller.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats, controller.stats()
+
+    during, after = asyncio.run(run())
+    assert (during["in_flight"], during["queued"]) == (2, 1)
+    assert (after["in_flight"], after["queued"], after["admitted_total"]) == (0, 0, 3)
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=5, queue_timeout=1.0)
+        order = []
+        gate, release = asyncio.Event(), asyncio.Event()
+        first = asyncio.ensure_future(_hold(controller, gate))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(_hold(controller, release, PRIORITY_NORMAL, order, "normal-1")),
+            asyncio.ensure_future(_hold(controller, release, PRIORITY_HIGH, order, "high")),
+            asyncio.ensure_future(_hold(controller, release, PRIORITY_NORMAL, order, "normal-2"))
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        gate.set()
+        await asyncio.gather(first, *waiters)
+        return order
+
+    assert asyncio.run(run()) == ["high", "normal-1", "normal-2"]
+
+
+def test_full_queue_is_rejected_with_429():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=1, queue_timeout=1.0)
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(_hold(controller, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.admit():
+                    pass
+        finally:
+            release.set()
+            await asyncio.gather(*tasks)
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert rejected.retry_after >= 1
+    assert controller.rejected_queue_full == 1
+
+
+def test_queue_timeout_is_rejected_with_503_and_leaves_the_queue():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=5, queue_timeout=0.01)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.admit():
+                    pass
+            queued = controller.stats()["queued"]
+        finally:
+            release.set()
+            await holder
+        # The abandoned waiter must not swallow the freed slot
+        async with controller.admit():
+            pass
+        return rejected.value, queued, controller
+
+    rejected, queued, controller = asyncio.run(run())
+    assert rejected.status_code == 503
+    assert queued == 0
+    assert controller.rejected_timeout == 1
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=5, queue_timeout=1.0)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queued = controller.stats()["queued"]
+        release.set()
+        await holder
+        return queued, controller.stats()
+
+    queued, stats = asyncio.run(run())
+    assert queued == 0
+    assert stats["in_flight"] == 0
+
+
+def test_disabled_controller_admits_everything():
+    async def run():
+        controller = AdmissionController("test", max_concurrency=0, max_queue=0, queue_timeout=0.0, enabled=False)
+        async with controller.admit():
+            return controller.stats()
+
+    assert asyncio.run(run())["admitted_total"] == 0
+
+
+@pytest.mark.parametrize("reason, status_code", [("queue full", 429), ("queue timeout", 503)])
+def test_create_route_returns_rejections_with_retry_after(monkeypatch, reason, status_code):
+    controller = AdmissionController("create", max_concurrency=1, max_queue=1, queue_timeout=1.0)
+
+    async def reject(priority):
+        raise AdmissionRejected("create", reason, status_code, 7)
+
+    monkeypatch.setattr(controller, "_acquire", reject)
+    monkeypatch.setattr(transaction_routes, "create_admission", controller)
+
+    from app.main import app
+    response = TestClient(app).post("/transactions/create", json=TRANSACTION)
+
+    assert response.status_code == status_code
+    assert response.headers["Retry-After"] == "7"
+    assert reason in response.json()["detail"]
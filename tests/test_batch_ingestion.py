@@ -0,0 +1,46 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.config.config import settings
+from app.controllers import transaction_controller
+from app.models.schemas import TransactionStatus
+
+
+def test_only_written_results_are_applied_counted_and_rolled_up(monkeypatch):
+    monkeypatch.setattr(transaction_controller.velocity_engine, "enabled", False)
+    monkeypatch.setattr(settings, "ANALYTICS_ROLLUPS_ENABLED", True)
+    monkeypatch.setattr(settings, "NOTIFICATION_OUTBOX_ENABLED", True)
+    decisions, rolled_up = [], []
+
+    async def save_bulk(transactions):
+        for transaction in transactions:
+            transaction["_id"] = ObjectId()
+        return [{"success": True, "transaction": transaction} for transaction in transactions]
+
+    async def check(transactions):
+        return [{"success": True, "is_fraud": False, "fraud_probability": 0.1} for _ in transactions]
+
+    async def bulk_update(updates, previous_status=None, documents=None):
+        # The second transaction changed status concurrently, so its guarded update missed
+        return [True, False]
+
+    async def rollups(transactions, sign=1):
+        rolled_up.extend(transaction["transaction_number"] for transaction in transactions)
+
+    monkeypatch.setattr(transaction_controller, "save_transactions_bulk", save_bulk)
+    monkeypatch.setattr(transaction_controller.fraud_service, "check_transactions", check)
+    monkeypatch.setattr(transaction_controller, "bulk_update_transactions", bulk_update)
+    monkeypatch.setattr(transaction_controller, "record_transaction_rollups", rollups)
+    monkeypatch.setattr(transaction_controller, "record_decision", decisions.append)
+    monkeypatch.setattr(transaction_controller.notification_worker, "notify", lambda: None)
+
+    result = asyncio.run(transaction_controller.process_transaction_batch([
+        {"transaction_number": "TX1", "transaction_amount": 10.0},
+        {"transaction_number": "TX2", "transaction_amount": 20.0}
+    ]))
+
+    statuses = [item["transaction"]["status"] for item in result["results"]]
+    assert statuses == [TransactionStatus.APPROVED, TransactionStatus.PENDING]
+    assert decisions == [TransactionStatus.APPROVED]
+    assert rolled_up == ["TX1"]
@@ -0,0 +1,85 @@
+import asyncio
+import socket
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config.config import settings
+from app.services import callbacks
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_CALLBACK_ALLOWED_HOSTS", "hooks.example.com, Partner.example.org")
+    addresses = {}
+
+    async def getaddrinfo(self, host, port, type=0):
+        if host not in addresses:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_STREAM, 6, "",
+                 (address, port)) for address in addresses[host]]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", getaddrinfo)
+    return addresses
+
+
+def _check(url):
+    return asyncio.run(callbacks.check_callback_url(url))
+
+
+def test_allowed_host_resolving_to_public_addresses_passes(resolve):
+    resolve["hooks.example.com"] = ["93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"]
+    assert _check("https://hooks.example.com/scored") is None
+
+
+def test_allow_list_is_case_insensitive(resolve):
+    resolve["partner.example.org"] = ["93.184.216.34"]
+    assert _check("https://PARTNER.example.org/scored") is None
+
+
+@pytest.mark.parametrize("url", ["ftp://hooks.example.com/x", "/relative/path", "https://"])
+def test_non_http_urls_are_refused(resolve, url):
+    assert "absolute http(s) URL" in _check(url)
+
+
+def test_hosts_outside_the_allow_list_are_refused(resolve):
+    resolve["evil.example.net"] = ["93.184.216.34"]
+    assert "not allowed" in _check("https://evil.example.net/scored")
+
+
+def test_empty_allow_list_disables_callbacks(resolve, monkeypatch):
+    monkeypatch.setattr(settings, "SCORING_CALLBACK_ALLOWED_HOSTS", "")
+    resolve["hooks.example.com"] = ["93.184.216.34"]
+    assert "not allowed" in _check("https://hooks.example.com/scored")
+
+
+@pytest.mark.parametrize("address", [
+    "127.0.0.1",        # loopback
+    "10.1.2.3",         # RFC1918
+    "192.168.0.10",     # RFC1918
+    "169.254.169.254",  # cloud metadata (link-local)
+    "0.0.0.0",
+    "::1",
+    "fe80::1%eth0",
+    "::ffff:127.0.0.1"  # IPv4-mapped loopback
+])
+def test_allowed_host_resolving_to_non_public_address_is_refused(resolve, address):
+    resolve["hooks.example.com"] = ["93.184.216.34", address]
+    assert "non-public address" in _check("https://hooks.example.com/scored")
+
+
+def test_unresolvable_host_is_refused(resolve):
+    assert "does not resolve" in _check("https://hooks.example.com/scored")
+
+
+def test_create_route_rejects_a_refused_callback_with_400(resolve):
+    from app.main import app
+    resolve["hooks.example.com"] = ["169.254.169.254"]
+    response = TestClient(app).post("/transactions/create", json={
+        "transaction_amount": 150.55, "is_nighttime": 1, "category": "shopping_pos",
+        "transaction_location": "-95.7923, 36.1499", "job": "Naval architect", "state": "CA",
+        "transaction_number": "TX123456789",
+        "callback_url": "https://hooks.example.com/scored"
+    })
+    assert response.status_code == 400
+    assert "non-public address" in response.json()["detail"]
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.fraud_service import CircuitBreaker, FraudService
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(time, "monotonic", clock)
+    return CircuitBreaker(window_seconds=10.0, min_requests=4, error_rate=0.5, slow_call_seconds=1.0,
+                          slow_call_rate=0.5, open_seconds=5.0, half_open_calls=2)
+
+
+def _trip(breaker):
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record(False, 0.1)
+
+
+def test_opens_once_the_error_rate_is_reached(breaker):
+    for success in (True, False, True):
+        breaker.allow_request()
+        breaker.record(success, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+
+
+def test_slow_calls_open_the_breaker(breaker):
+    for _ in range(4):
+        breaker.allow_request()
+        breaker.record(True, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_outcomes_outside_the_window_are_forgotten(breaker, clock):
+    for _ in range(3):
+        breaker.allow_request()
+        breaker.record(False, 0.1)
+    clock.advance(11.0)
+    breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["window_requests"] == 1
+
+
+def test_half_open_limits_trials_and_closes_after_successes(breaker, clock):
+    _trip(breaker)
+    clock.advance(5.0)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens(breaker, clock):
+    _trip(breaker)
+    clock.advance(5.0)
+
+    assert breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow_request()
+
+
+def test_released_trial_slot_can_be_reused(breaker, clock):
+    _trip(breaker)
+    clock.advance(5.0)
+
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_cancelled_call_frees_its_half_open_slot():
+    service = FraudService()
+    service.breaker_enabled = True
+    service.breaker = CircuitBreaker(window_seconds=10.0, min_requests=1, error_rate=0.5, slow_call_seconds=1.0,
+                                     slow_call_rate=0.5, open_seconds=0.0, half_open_calls=1)
+    service.breaker.record(False, 0.1)
+    assert service.breaker.state == CircuitBreaker.OPEN
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    service.client.post = hang
+
+    async def run():
+        assert service.breaker.allow_request()
+        call = asyncio.ensure_future(service._post("/predict", {}, 1.0, service.latency))
+        await asyncio.sleep(0)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(run())
+    assert service.breaker.state == CircuitBreaker.HALF_OPEN
+    assert service.breaker.allow_request()
+
+
+def test_disabled_breaker_records_nothing_and_batches_still_fall_back():
+    service = FraudService()
+    service.breaker_enabled = False
+    service.batch_fallback = True
+    service.breaker = CircuitBreaker(window_seconds=10.0, min_requests=1, error_rate=0.5, slow_call_seconds=1.0,
+                                     slow_call_rate=0.5, open_seconds=5.0, half_open_calls=1)
+
+    async def post(url, json=None, **kwargs):
+        if "batch" in url:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"is_fraud": False, "fraud_probability": 0.1})
+
+    service.client.post = post
+    requests = [{"transaction_number": f"TX{n}"} for n in range(3)]
+
+    for _ in range(3):
+        results = asyncio.run(service._predict_batch(requests))
+        assert all(result["success"] for result in results)
+
+    assert service.breaker.state == CircuitBreaker.CLOSED
+    assert service.breaker.times_opened == 0
+    assert service.batch_fallbacks == 3
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from app.db import transactions
+from app.db.transactions import decode_cursor, encode_cursor
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2024, 3, 1, 12, 30, 45, 123456)
+    id = ObjectId()
+
+    cursor = encode_cursor(created_at, str(id))
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(datetime(2024, 1, 1), "nope")])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_list_route_rejects_malformed_cursor_with_400():
+    from app.main import app
+    response = TestClient(app).get("/transactions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_pages_cover_every_document_once_across_timestamp_ties(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(transactions, "db", db)
+    start = datetime(2024, 1, 1)
+    # Pairs of documents share a created_at, so pages must break ties on _id
+    documents = [{"_id": ObjectId(), "transaction_number": f"TX{n}", "created_at": start + timedelta(seconds=n // 2)}
+                 for n in range(7)]
+
+    async def run():
+        await db.transactions.insert_many(documents)
+        seen, after = [], None
+        while True:
+            page = await transactions.list_transactions(limit=3, after=after, include_total=False)
+            seen += [transaction["transaction_number"] for transaction in page["transactions"]]
+            if page["next_cursor"] is None:
+                return seen
+            after = decode_cursor(page["next_cursor"])
+
+    seen = asyncio.run(run())
+    expected = [document["transaction_number"] for document in
+                sorted(documents, key=lambda d: (d["created_at"], d["_id"]), reverse=True)]
+    assert seen == expected
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.services.fraud_service import FraudBatchCoalescer
+
+
+def test_concurrent_requests_share_one_batch():
+    batches = []
+
+    async def send_batch(requests):
+        batches.append([request["n"] for request in requests])
+        return [{"success": True, "n": request["n"]} for request in requests]
+
+    async def run():
+        coalescer = FraudBatchCoalescer(send_batch, window_ms=5, max_batch_size=10)
+        return await asyncio.gather(*(coalescer.submit({"n": n}) for n in range(3))), coalescer
+
+    results, coalescer = asyncio.run(run())
+    assert batches == [[0, 1, 2]]
+    # Every caller gets its own result back
+    assert [result["n"] for result in results] == [0, 1, 2]
+    assert coalescer.stats()["batches_sent"] == 1
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    batches = []
+
+    async def send_batch(requests):
+        batches.append(len(requests))
+        return [{"success": True} for _ in requests]
+
+    async def run():
+        coalescer = FraudBatchCoalescer(send_batch, window_ms=60_000, max_batch_size=2)
+        await asyncio.wait_for(asyncio.gather(*(coalescer.submit({}) for _ in range(4))), 1.0)
+
+    asyncio.run(run())
+    assert batches == [2, 2]
+
+
+def test_failed_batch_returns_an_error_result_to_each_caller():
+    async def send_batch(requests):
+        raise RuntimeError("connection reset")
+
+    async def run():
+        coalescer = FraudBatchCoalescer(send_batch, window_ms=5, max_batch_size=10)
+        return await asyncio.gather(*(coalescer.submit({}) for _ in range(2)))
+
+    results = asyncio.run(run())
+    assert len(results) == 2
+    for result in results:
+        assert result["success"] is False
+        assert "connection reset" in result["error"]
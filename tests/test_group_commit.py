@@ -0,0 +1,90 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.db.transactions import GroupCommitBuffer, bulk_update_applied
+
+
+def _insert(fake_db, **fields):
+    id = ObjectId()
+    fake_db.transactions.documents[id] = {"_id": id, **fields}
+    return str(id)
+
+
+def test_inserts_are_committed_as_one_group(fake_db):
+    async def run():
+        buffer = GroupCommitBuffer(max_ops=100, interval_ms=5)
+        return await asyncio.gather(*(buffer.insert({"status": "pending", "n": n}) for n in range(3))), buffer
+
+    ids, buffer = asyncio.run(run())
+
+    assert len(set(ids)) == 3
+    assert buffer.flushes == 1
+    assert fake_db.counter_deltas == [{"pending": 3}]
+
+
+def test_update_matching_nothing_resolves_false(fake_db):
+    first = _insert(fake_db, status="pending")
+    second = _insert(fake_db, status="approved")
+
+    async def run():
+        buffer = GroupCommitBuffer(max_ops=100, interval_ms=5)
+        return await asyncio.gather(
+            buffer.update(first, {"_id": ObjectId(first), "status": "pending"},
+                          {"status": "approved"}, {"pending": -1, "approved": 1}),
+            # Guarded on a status the document no longer has
+            buffer.update(second, {"_id": ObjectId(second), "status": "pending"},
+                          {"status": "flagged"}, {"pending": -1, "flagged": 1}),
+            # No such document
+            buffer.update(str(ObjectId()), {"_id": ObjectId(), "status": "pending"},
+                          {"status": "approved"}, {"pending": -1, "approved": 1})
+        )
+
+    assert asyncio.run(run()) == [True, False, False]
+    assert fake_db.transactions.documents[ObjectId(second)]["status"] == "approved"
+    # Only the applied update moves the counters
+    assert fake_db.counter_deltas == [{"pending": -1, "approved": 1}]
+
+
+def test_flushes_when_max_ops_is_reached(fake_db):
+    async def run():
+        buffer = GroupCommitBuffer(max_ops=2, interval_ms=60_000)
+        await asyncio.wait_for(
+            asyncio.gather(buffer.insert({"status": "pending"}), buffer.insert({"status": "pending"})), 1.0
+        )
+        return buffer
+
+    assert asyncio.run(run()).flushes == 1
+
+
+def test_failed_commit_fails_every_waiter(fake_db):
+    async def broken_bulk_write(operations, ordered=True):
+        raise RuntimeError("connection reset")
+
+    fake_db.transactions.bulk_write = broken_bulk_write
+    id = _insert(fake_db, status="pending")
+
+    async def run():
+        buffer = GroupCommitBuffer(max_ops=100, interval_ms=5)
+        return await asyncio.gather(
+            buffer.update(id, {"_id": ObjectId(id)}, {"status": "approved"}, {"pending": -1, "approved": 1}),
+            buffer.update(id, {"_id": ObjectId(id)}, {"status": "flagged"}, {"pending": -1, "flagged": 1}),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert fake_db.counter_deltas == []
+
+
+def test_updates_to_the_same_id_are_sent_in_separate_rounds(fake_db):
+    id = _insert(fake_db, status="pending")
+
+    applied = asyncio.run(bulk_update_applied([
+        (id, {"_id": ObjectId(id), "status": "pending"}, {"$set": {"status": "approved"}}),
+        (id, {"_id": ObjectId(id), "status": "pending"}, {"$set": {"status": "flagged"}})
+    ]))
+
+    assert applied == [True, False]
+    assert fake_db.transactions.bulk_writes == 2
+    assert fake_db.transactions.documents[ObjectId(id)]["status"] == "approved"
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.controllers import transaction_controller
+from app.models.schemas import TransactionStatus
+from app.services.idempotency import IdempotencyIndex
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(transaction_controller, "idempotency_index", IdempotencyIndex(max_size=100, ttl=600.0))
+    monkeypatch.setattr(transaction_controller.velocity_engine, "enabled", False)
+    calls = []
+
+    async def process(transaction_data):
+        calls.append(transaction_data["transaction_number"])
+        await asyncio.sleep(0.01)
+        return {"success": True, "transaction": {"transaction_number": transaction_data["transaction_number"],
+                                                  "status": TransactionStatus.APPROVED}}
+
+    monkeypatch.setattr(transaction_controller, "_process_new_transaction", process)
+    return calls
+
+
+def test_retry_is_answered_from_memory(pipeline):
+    async def run():
+        first = await transaction_controller.process_transaction({"transaction_number": "TX1"})
+        retry = await transaction_controller.process_transaction({"transaction_number": "TX1"})
+        return first, retry
+
+    first, retry = asyncio.run(run())
+    assert pipeline == ["TX1"]
+    assert retry == {**first, "replayed": True}
+    assert transaction_controller.idempotency_index.memory_replays == 1
+
+
+def test_idempotency_key_takes_precedence_over_transaction_number(pipeline):
+    async def run():
+        await transaction_controller.process_transaction({"transaction_number": "TX1"}, "key-1")
+        return await transaction_controller.process_transaction({"transaction_number": "TX2"}, "key-1")
+
+    retry = asyncio.run(run())
+    assert pipeline == ["TX1"]
+    assert retry["transaction"]["transaction_number"] == "TX1"
+
+
+def test_concurrent_retry_waits_for_the_running_create(pipeline):
+    async def run():
+        return await asyncio.gather(
+            transaction_controller.process_transaction({"transaction_number": "TX1"}),
+            transaction_controller.process_transaction({"transaction_number": "TX1"})
+        )
+
+    first, retry = asyncio.run(run())
+    assert pipeline == ["TX1"]
+    assert "replayed" not in first
+    assert retry["replayed"] is True
+    assert retry["transaction"] == first["transaction"]
+    assert transaction_controller.idempotency_index.in_flight_replays == 1
+
+
+def test_duplicate_insert_replays_the_stored_document(monkeypatch, pipeline):
+    async def duplicate(transaction_data):
+        raise DuplicateKeyError("E11000 duplicate key", 11000)
+
+    async def stored(id, fields=None):
+        return {"transaction_number": id, "status": TransactionStatus.FLAGGED, "is_fraud": True,
+                "created_at": datetime(2024, 1, 1)}
+
+    monkeypatch.setattr(transaction_controller, "_process_new_transaction", duplicate)
+    monkeypatch.setattr(transaction_controller, "get_transaction_by_id", stored)
+
+    result = asyncio.run(transaction_controller.process_transaction({"transaction_number": "TX1"}))
+    assert result["replayed"] is True
+    assert result["transaction"]["status"] == TransactionStatus.FLAGGED
+    assert result["transaction"]["is_fraud"] is True
+    assert transaction_controller.idempotency_index.stored_replays == 1
+
+
+def test_failed_create_is_not_remembered(monkeypatch, pipeline):
+    async def fail(transaction_data):
+        raise RuntimeError("fraud service down")
+
+    monkeypatch.setattr(transaction_controller, "_process_new_transaction", fail)
+
+    result = asyncio.run(transaction_controller.process_transaction({"transaction_number": "TX1"}))
+    assert result["success"] is False
+    assert transaction_controller.idempotency_index.get("txn:TX1") is None
+
+
+def test_pending_response_is_not_remembered(monkeypatch, pipeline):
+    stored = {}
+
+    async def accept(transaction_data):
+        stored[transaction_data["transaction_number"]] = {**transaction_data, "status": TransactionStatus.PENDING}
+        return {"success": True, "transaction": {"transaction_number": transaction_data["transaction_number"],
+                                                  "status": TransactionStatus.PENDING}}
+
+    async def accept_again(transaction_data):
+        raise DuplicateKeyError("E11000 duplicate key", 11000)
+
+    async def get_stored(id, fields=None):
+        return stored.get(id)
+
+    monkeypatch.setattr(transaction_controller, "_accept_for_scoring", accept)
+    monkeypatch.setattr(transaction_controller, "get_transaction_by_id", get_stored)
+
+    async def run():
+        first = await transaction_controller.process_transaction({"transaction_number": "TX1"}, async_scoring=True)
+        # The scoring worker finishes before the client retries
+        stored["TX1"]["status"] = TransactionStatus.APPROVED
+        monkeypatch.setattr(transaction_controller, "_accept_for_scoring", accept_again)
+        retry = await transaction_controller.process_transaction({"transaction_number": "TX1"}, async_scoring=True)
+        return first, retry
+
+    first, retry = asyncio.run(run())
+    assert first["transaction"]["status"] == TransactionStatus.PENDING
+    assert retry["replayed"] is True
+    assert retry["transaction"]["status"] == TransactionStatus.APPROVED
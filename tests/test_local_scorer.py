@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.services.local_scorer import LocalFraudScorer
+
+MODEL = {
+    "intercept": -4.2,
+    "weights": {"transaction_amount": 0.0004, "log_amount": 0.35, "is_nighttime": 1.1},
+    "category": {"shopping_net": 0.9, "grocery_pos": -0.2},
+    "state": {"CA": 0.1},
+    "job": {"Naval architect": 0.05}
+}
+
+
+@pytest.fixture
+def scorer(tmp_path):
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(MODEL))
+    return LocalFraudScorer(str(path))
+
+
+def _transaction(amount):
+    return {"transaction_amount": amount, "is_nighttime": 1, "category": "shopping_net",
+            "state": "CA", "job": "Naval architect"}
+
+
+def test_single_and_batch_scores_agree(scorer):
+    transactions = [_transaction(amount) for amount in (5.0, 150.55, 9000.0)]
+    assert scorer.score_batch(transactions) == pytest.approx([scorer.score(t) for t in transactions])
+
+
+@pytest.mark.parametrize("amount, expected", [(-3e6, 0.0), (3e6, 1.0)])
+def test_extreme_logits_saturate_instead_of_overflowing(scorer, amount, expected):
+    assert scorer.score(_transaction(amount)) == pytest.approx(expected)
@@ -0,0 +1,19 @@
+import asyncio
+
+from app.config.config import settings
+from app.controllers import transaction_controller
+from app.models.schemas import TransactionStatus
+
+
+def test_outbox_result_update_leaves_notification_sent_to_the_worker(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_OUTBOX_ENABLED", True)
+
+    update, use_outbox = asyncio.run(transaction_controller._build_result_update(
+        {"transaction_number": "TX1"}, {"success": True, "is_fraud": True, "fraud_probability": 0.9}
+    ))
+
+    assert use_outbox
+    assert update["status"] == TransactionStatus.FLAGGED
+    # The worker may already have marked the notification sent; the status write must not undo it
+    assert "notification_sent" not in update
+    assert transaction_controller._build_transaction_response({**update})["notification_sent"] is False
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.services.cache import LRUTTLCache, TransactionCache
+
+
+@pytest.fixture
+def cache():
+    cache = TransactionCache()
+    cache.enabled = True
+    cache.backend = LRUTTLCache(max_size=100, ttl=60.0)
+    return cache
+
+
+def _transaction(status="pending"):
+    return {"_id": "65f1c0ffee0000000000000a", "transaction_number": "TX1", "status": status}
+
+
+def test_put_is_readable_by_id_and_transaction_number(cache):
+    async def run():
+        await cache.put(_transaction(), cache.read_token())
+        return await cache.get("65f1c0ffee0000000000000a"), await cache.get("TX1")
+
+    by_id, by_number = asyncio.run(run())
+    assert by_id == by_number == _transaction()
+
+
+def test_put_raced_by_an_invalidation_is_skipped(cache):
+    async def run():
+        token = cache.read_token()
+        stale = _transaction("pending")
+        # The status update lands between the Mongo read and the cache put
+        await cache.invalidate("65f1c0ffee0000000000000a")
+        await cache.put(stale, token)
+        return await cache.get("TX1")
+
+    assert asyncio.run(run()) is None
+    assert cache.stale_puts_skipped == 1
+
+
+def test_put_read_after_the_invalidation_is_kept(cache):
+    async def run():
+        await cache.invalidate("65f1c0ffee0000000000000a")
+        await cache.put(_transaction("approved"), cache.read_token())
+        return await cache.get("TX1")
+
+    assert asyncio.run(run())["status"] == "approved"
+
+
+def test_invalidations_of_other_ids_do_not_block_puts(cache):
+    async def run():
+        token = cache.read_token()
+        await cache.invalidate("65f1c0ffee0000000000000b")
+        await cache.put(_transaction(), token)
+        return await cache.get("TX1")
+
+    assert asyncio.run(run()) is not None
+
+
+def test_puts_are_skipped_conservatively_once_the_invalidation_is_forgotten(cache):
+    cache.INVALIDATION_WINDOW = 2
+
+    async def run():
+        token = cache.read_token()
+        await cache.invalidate("65f1c0ffee0000000000000a")
+        for suffix in "bcd":
+            await cache.invalidate(f"65f1c0ffee000000000000{suffix}0")
+        await cache.put(_transaction(), token)
+        return await cache.get("TX1")
+
+    assert asyncio.run(run()) is None
+
+
+def test_get_returns_a_copy(cache):
+    async def run():
+        await cache.put(_transaction(), cache.read_token())
+        (await cache.get("TX1"))["status"] = "mutated"
+        return await cache.get("TX1")
+
+    assert asyncio.run(run())["status"] == "pending"
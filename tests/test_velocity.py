@@ -0,0 +1,55 @@
+import pytest
+
+from app.services.velocity import SlidingWindow, VelocityEngine
+
+
+def test_counts_and_sums_within_the_window():
+    window = SlidingWindow(window_seconds=60.0, buckets=6)
+    window.add(100.0, 10.0)
+    window.add(105.0, 5.5)
+    assert (window.count, window.total) == (2, 15.5)
+
+
+def test_expired_buckets_leave_the_totals():
+    window = SlidingWindow(window_seconds=60.0, buckets=6)
+    window.add(100.0, 10.0)
+    window.add(135.0, 5.0)
+    # 100s falls in bucket 10, which expires once bucket 16 is the newest
+    window.add(165.0, 1.0)
+    assert (window.count, window.total) == (2, 6.0)
+
+
+def test_idle_longer_than_the_window_resets():
+    window = SlidingWindow(window_seconds=60.0, buckets=6)
+    window.add(100.0, 10.0)
+    window.add(105.0, 10.0)
+    window.add(1000.0, 1.0)
+    assert (window.count, window.total) == (1, 1.0)
+
+
+def test_out_of_order_time_counts_in_the_newest_bucket():
+    window = SlidingWindow(window_seconds=60.0, buckets=6)
+    window.add(100.0, 1.0)
+    window.add(95.0, 1.0)
+    assert window.count == 2
+
+
+def test_engine_features_include_the_observed_transaction():
+    engine = VelocityEngine([60.0, 300.0], buckets=6, max_keys=10)
+    engine.observe({"state": "CA", "transaction_amount": 10.0}, now=100.0)
+    features = engine.observe({"state": "CA", "transaction_amount": 2.5}, now=110.0)
+    assert features["state_txn_count_60s"] == 2
+    assert features["state_amount_sum_300s"] == pytest.approx(12.5)
+    assert not any(name.startswith("category_") for name in features)
+
+
+def test_engine_evicts_the_least_recently_seen_key():
+    engine = VelocityEngine([60.0], buckets=6, max_keys=2)
+    engine.observe({"state": "CA"}, now=100.0)
+    engine.observe({"state": "NY"}, now=100.0)
+    engine.observe({"state": "CA"}, now=101.0)
+    engine.observe({"state": "TX"}, now=102.0)
+    assert engine.evictions == 1
+    # NY was evicted, so it starts counting again
+    assert engine.observe({"state": "NY"}, now=103.0)["state_txn_count_60s"] == 1
+    assert engine.observe({"state": "CA"}, now=104.0)["state_txn_count_60s"] == 1